@@ -16,6 +16,7 @@ l'administració segura i eficient de bases de dades en entorns distribuïts.
 import warnings
 from abc import ABC, abstractmethod
 from .ssh_tunnel import SSHTunnel, get_free_port
+from .tunnel_process import ProcessSSHTunnel
 from typing import Optional, Any, Union
 from paramiko.client import SSHClient
 from paramiko import WarningPolicy
@@ -53,6 +54,13 @@ def _format_multiple_tunnels(mt: dict) -> dict:
     return res
 
 
+def _tunnel_key(ssh, port, user) -> tuple:
+    """Construeix la clau (ssh, port, user) de `GABDSSHTunnel._servers`. Una llista de bastions es converteix en tupla."""
+    if isinstance(ssh, list):
+        ssh = tuple(tuple(h) if isinstance(h, list) else h for h in ssh)
+    return ssh, int(port), user
+
+
 class GABDSSHTunnel:
     """
       Classe per gestionar túnels SSH per a connexions a bases de dades.
@@ -60,7 +68,7 @@ class GABDSSHTunnel:
     _servers = {}  # clau = (ssh, port, user), valor = sshTunnel
     _num_connections = 0
 
-    __slots__ = ['_hostname', '_port', '_ssh_data', '_local_port', '_mt', '_context_mode']
+    __slots__ = ['_hostname', '_port', '_ssh_data', '_local_port', '_mt', '_context_mode', '_fw_opts']
 
     def __init__(self, hostname, port, ssh_data=None, **kwargs):
         """
@@ -73,7 +81,15 @@ class GABDSSHTunnel:
             port : int
                 Port del servidor SSH.
             ssh_data : dict, opcional
-                Informació d'autenticació SSH.
+                Informació d'autenticació SSH. `'ssh'` pot ser un servidor o una llista de bastions equivalents
+                (`"host"`, `"host:port"` o `(host, port)`): es farà servir el més ràpid i, si cau, el següent.
+                Si conté `'process': True`, el transport i els forwards s'executen en un procés fill (vegeu
+                `ProcessSSHTunnel`). Amb `'max_rate'` (bytes/s) es limita la velocitat de tot el transport i amb
+                `'max_channels'`, el nombre de canals oberts alhora.
+            forward_options : dict, opcional
+                Opcions de cada forward indexades pel port local, p. ex. `{1521: {'priority': 'interactive'},
+                27017: {'priority': 'bulk', 'rate_limit': 5e6, 'max_connections': 4}}`. Vegeu
+                `SSHTunnel.add_forward`.
         """
 
         self._context_mode = None  # "tunnel" o "session"
@@ -86,6 +102,7 @@ class GABDSSHTunnel:
         self._port = port
 
         self._ssh_data = ssh_data
+        self._fw_opts = {int(k): dict(v) for k, v in (kwargs.pop('forward_options', None) or {}).items()}
         if 'multiple_tunnels' in kwargs:
             self._mt = a = _format_multiple_tunnels(kwargs['multiple_tunnels'].copy())
             try:
@@ -171,7 +188,7 @@ class GABDSSHTunnel:
 
 
         ssh_data = self._ssh_data
-        key = (ssh_data["ssh"], int(ssh_data["port"]), ssh_data["user"])
+        key = _tunnel_key(ssh_data["ssh"], ssh_data["port"], ssh_data["user"])
 
         # Configurar els binds remots i locals
         if getattr(self, "_mt", None) is not None:
@@ -184,29 +201,29 @@ class GABDSSHTunnel:
 
         # Comprovar si ja existeix el túnel per aquest host
         if key not in GABDSSHTunnel._servers:
+            tunnel_kwargs = dict(
+                ssh_port=int(ssh_data['port']),
+                ssh_username=ssh_data["user"],
+                remote_bind_addresses=[],
+                local_bind_addresses=[],
+                max_rate=ssh_data.get("max_rate"),
+                max_channels=ssh_data.get("max_channels"),
+                health_interval=ssh_data.get("health_interval", 5.0),
+                rerank_interval=ssh_data.get("rerank_interval", 300.0)
+            )
             # Autenticació
             if "id_key" in ssh_data:
-                tunnel = SSHTunnel(
-                    ssh_data["ssh"],
-                    ssh_port=int(ssh_data['port']),
-                    ssh_username=ssh_data["user"],
-                    ssh_pkey=ssh_data["id_key"],
-                    remote_bind_addresses=[],
-                    local_bind_addresses=[]
-                )
+                tunnel_kwargs['ssh_pkey'] = ssh_data["id_key"]
             else:
                 if "pwd" not in ssh_data or not ssh_data["pwd"]:
                     ssh_data["pwd"] = getpass(
                         prompt=f"Password de l'usuari {ssh_data['user']} a {ssh_data['ssh']}: "
                     )
-                tunnel = SSHTunnel(
-                    ssh_data["ssh"],
-                    ssh_port=int(ssh_data['port']),
-                    ssh_username=ssh_data["user"],
-                    ssh_password=ssh_data["pwd"],
-                    remote_bind_addresses=[],
-                    local_bind_addresses=[]
-                )
+                tunnel_kwargs['ssh_password'] = ssh_data["pwd"]
+
+            # Amb 'process' el transport i els forwards s'executen en un procés fill, fora del GIL de l'aplicació
+            tunnel_class = ProcessSSHTunnel if ssh_data.get("process", False) else SSHTunnel
+            tunnel = tunnel_class(ssh_data["ssh"], **tunnel_kwargs)
 
             # Crear connexió SSH
             try:
@@ -220,8 +237,9 @@ class GABDSSHTunnel:
 
         # Afegir forwards (tant si és túnel nou com si ja existia)
         tunnel = GABDSSHTunnel._servers[key]
+        fw_opts = getattr(self, "_fw_opts", None) or {}
         for r, l in zip(remote_binds, local_binds):
-            tunnel.add_forward(*r, *l)
+            tunnel.add_forward(*r, *l, **fw_opts.get(l[1], {}))
 
         # Missatge d'info
         if self._mt is not None:
@@ -276,7 +294,7 @@ class GABDSSHTunnel:
             return False
 
         ssh_data = self._ssh_data
-        key = (ssh_data["ssh"], int(ssh_data["port"]), ssh_data["user"])
+        key = _tunnel_key(ssh_data["ssh"], ssh_data["port"], ssh_data["user"])
 
         tunnel = GABDSSHTunnel._servers.get(key)
         return tunnel.is_active() if tunnel else False
@@ -286,11 +304,7 @@ class GABDSSHTunnel:
         if self._ssh_data is None:
             print("[WARN] No hi ha dades SSH per construir la clau")
             return None
-        return (
-            self._ssh_data["ssh"],
-            int(self._ssh_data["port"]),
-            self._ssh_data["user"],
-        )
+        return _tunnel_key(self._ssh_data["ssh"], self._ssh_data["port"], self._ssh_data["user"])
 
     def get_tunnel(self):
         """Retorna el túnel associat a self._ssh_data, si existeix."""
@@ -302,7 +316,7 @@ class GABDSSHTunnel:
     @classmethod
     def get(cls, ssh: str, port: int, user: str):
         """Accedeix al túnel actiu amb clau (ssh, port, user)."""
-        key = (ssh, int(port), user)
+        key = _tunnel_key(ssh, port, user)
         return cls._servers.get(key)
 
 
@@ -315,7 +329,7 @@ class GABDSSHTunnel:
         if not isinstance(key, tuple) or len(key) != 3:
             raise KeyError("La clau ha de ser (ssh, port, user)")
         ssh, port, user = key
-        GABDSSHTunnel._servers.pop((ssh, int(port), user), None)
+        GABDSSHTunnel._servers.pop(_tunnel_key(ssh, port, user), None)
 
     def __contains__(self, key):
         """
@@ -324,7 +338,7 @@ class GABDSSHTunnel:
         if not isinstance(key, tuple) or len(key) != 3:
             return False
         ssh, port, user = key
-        return (ssh, int(port), user) in GABDSSHTunnel._servers
+        return _tunnel_key(ssh, port, user) in GABDSSHTunnel._servers
 
     def __getitem__(self, key):
         if isinstance(key, int):
@@ -333,7 +347,7 @@ class GABDSSHTunnel:
         elif isinstance(key, tuple) and len(key) == 3:
             # Accés per clau (ssh, port, user)
             ssh, port, user = key
-            return self._servers.get((ssh, int(port), user))
+            return self._servers.get(_tunnel_key(ssh, port, user))
         else:
             raise KeyError("Ús invàlid: utilitza un int o una tupla (ssh, port, user)")
 
@@ -349,13 +363,13 @@ class GABDSSHTunnel:
     def pop(cls, item):
         """
         Elimina un túnel de _servers.
-        :param item: SSHTunnel o clau (ssh, port, user)
+        :param item: SSHTunnel, ProcessSSHTunnel o clau (ssh, port, user)
         :return: el túnel eliminat o None si no existeix
         """
         key = None
 
         # Si és una instància de SSHTunnel, trobem la clau corresponent
-        if isinstance(item, SSHTunnel):
+        if isinstance(item, (SSHTunnel, ProcessSSHTunnel)):
             for k, v in cls._servers.items():
                 if v is item:
                     key = k
@@ -365,10 +379,10 @@ class GABDSSHTunnel:
 
         # Si és una tupla, la fem servir com a clau
         elif isinstance(item, tuple) and len(item) == 3:
-            key = (item[0], int(item[1]), item[2])
+            key = _tunnel_key(*item)
 
         else:
-            raise ValueError("El paràmetre ha de ser SSHTunnel o clau (ssh, port, user)")
+            raise ValueError("El paràmetre ha de ser SSHTunnel, ProcessSSHTunnel o clau (ssh, port, user)")
 
         # Eliminar i decrementar el comptador
         removed: Union[Any, None] = cls._servers.pop(key, None)
@@ -418,6 +432,7 @@ class AbsConnection(ABC, GABDSSHTunnel):
             self._hostname = hostname
             self._port = port
             self._ssh_data = None
+            self._fw_opts = {}
 
     @property
     def conn(self):
@@ -434,7 +449,7 @@ class AbsConnection(ABC, GABDSSHTunnel):
             return None
 
         ssh_data = self._ssh_data
-        key = (ssh_data["ssh"], int(ssh_data["port"]), ssh_data["user"])
+        key = _tunnel_key(ssh_data["ssh"], ssh_data["port"], ssh_data["user"])
         return self._servers[key] if key in self._servers else None
 
     @property
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Aquest script forma part del material didàctic de l'assignatura de Gestió i Administració de Bases de Dades (GABD) de la
+Universitat Autònoma de Barcelona. La classe `AsyncOracleConnection` és la versió asíncrona d'`oracleConnection`,
+construïda sobre l'API asyncio d'oracledb (`connect_async` i `create_pool_async`). Un sol bucle d'esdeveniments pot
+atendre centenars de consultes concurrents sense necessitat d'un fil per consulta.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from oracledb import *
+
+from .AbsConnection import AbsConnection
+from .oracleConnection import _pool_kwargs
+from .oracle_lob import aiter_lob, awrite_lob
+from .oracle_pipeline import StatementPipeline
+
+
+class AsyncOracleConnection(AbsConnection):
+    """
+    Classe per gestionar la connexió asíncrona a una base de dades Oracle.
+
+    Accepta els mateixos paràmetres que `oracleConnection` (incloent `ssh_data`, `mode` i `pool`). Amb `pool`, cada
+    crida a `execute` i `fetch*` fa servir una sessió del pool, de manera que es poden llançar moltes consultes en
+    paral·lel amb `asyncio.gather`.
+
+        async with AsyncOracleConnection(user=..., passwd=..., hostname=..., ssh_data=..., pool={'max': 8}) as db:
+            rows = await asyncio.gather(*(db.fetchall(sql, [i]) for i in range(100)))
+
+    Atributs:
+    ----------
+    _serviceName : str
+        Nom del servei de la base de dades.
+    _pool : oracledb.AsyncConnectionPool
+        Pool de sessions, si la connexió s'ha creat amb el paràmetre `pool`.
+    """
+
+    __slots__ = ['_serviceName', '_con_params', '_pool_params', '_pool']
+
+    def __init__(self, **params):
+        """
+        Constructor per inicialitzar la connexió Oracle asíncrona.
+
+        Paràmetres:
+        ---------
+        **params: dict
+            Paràmetres de connexió, els mateixos que els d'`oracleConnection`.
+        """
+
+        self._pool_params = params.pop('pool', None)
+        self._pool = None
+        self._serviceName = params.pop('serviceName', 'orcl')
+        params['port'] = params.pop('port', 1521)
+
+        AbsConnection.__init__(self, **params)
+        if params['ssh_data'] is None:
+            self._dsn = f"{self.user}/{self.pwd}@{self.hostname}:{self.port}/{self._serviceName}"
+        else:
+            self._dsn = f"{self.user}/{self.pwd}@localhost:{self._local_port}/{self._serviceName}"
+
+        mode = SYSDBA if params.pop('mode', '').strip().lower() in ['sysdba', 'dba'] else None
+
+        self._con_params = {'mode': mode} if mode is not None else dict()
+
+    async def open(self, **con_params):
+        """
+        Obre el túnel SSH (si cal) i la sessió Oracle o el pool de sessions.
+
+        Retorna:
+        --------
+        self
+        """
+        # Obrir el túnel és bloquejant: ho fem fora del bucle d'esdeveniments
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, AbsConnection.open, self)
+        if not self._success:
+            raise RuntimeError(f"Could not open the SSH tunnel {self.server}. Check the connection parameters and its "
+                               f"status.")
+
+        con_params_to_use = {**self._con_params, **con_params}
+
+        try:
+            if self._pool_params is not None:
+                if self._pool is None:
+                    self._pool = create_pool_async(self.dsn, **_pool_kwargs(self._pool_params), **con_params_to_use)
+                self.conn = await self._pool.acquire()
+            else:
+                self.conn = await connect_async(self.dsn, **con_params_to_use)
+        except DatabaseError as e:
+            self.is_open = False
+            logging.error(
+                f"Could not open the connection with dsn: {self._dsn}. Check the connection parameters and its status." +
+                f" Tunnel: {self.server}")
+            logging.error(f"Error: {e}")
+        finally:
+            self._context_mode = "session"
+        return self
+
+    async def close_session(self) -> None:
+        """
+        Tanca la sessió (i el pool, si n'hi ha) i manté els túnels SSH oberts.
+        """
+        try:
+            if self.conn is not None:
+                await self.conn.close()
+        except DatabaseError:
+            logging.warning('Database connection already closed')
+        finally:
+            self._conn = None
+            self.is_open = False
+
+        if self._pool is not None:
+            try:
+                await self._pool.close(force=True)
+            except DatabaseError:
+                logging.warning('Connection pool already closed')
+            finally:
+                self._pool = None
+
+    async def close(self) -> None:
+        """
+        Tanca la sessió, el pool i el túnel SSH associat.
+        """
+        await self.close_session()
+        if self._ssh_data is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.closetunnel)
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Retorna True si la sessió està oberta. No fa cap viatge d'anada i tornada al servidor.
+        """
+        conn = self._conn
+        if conn is None:
+            return False
+        try:
+            return conn.is_healthy()
+        except Exception:
+            return False
+
+    @is_open.setter
+    def is_open(self, valor: bool) -> None:
+        self._is_open = valor
+
+    @property
+    def pool(self):
+        """Pool de sessions o None si la connexió no és en mode pool."""
+        return self._pool
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Obté una sessió del pool i la retorna en sortir del context.
+
+            async with db.acquire() as conn:
+                await conn.execute(...)
+        """
+        if self._pool is None:
+            raise RuntimeError("La connexió no és en mode pool o el pool no està obert")
+        conn = await self._pool.acquire()
+        try:
+            yield conn
+        finally:
+            await self._pool.release(conn)
+
+    @asynccontextmanager
+    async def _session(self):
+        """Sessió per a una crida: una del pool si n'hi ha o la sessió principal."""
+        if self._pool is not None:
+            async with self.acquire() as conn:
+                yield conn
+        else:
+            if self.conn is None:
+                raise RuntimeError("La sessió Oracle no està oberta")
+            yield self.conn
+
+    def cursor(self) -> AsyncCursor:
+        """
+        Retorna un cursor asíncron de la sessió principal.
+        """
+        return self.conn.cursor()
+
+    async def execute(self, sql: str, parameters: Any = None, commit: bool = False) -> None:
+        """
+        Executa una sentència.
+
+        Paràmetres:
+        -----------
+        sql : str
+            Sentència SQL o bloc PL/SQL.
+        parameters : list, tuple o dict, opcional
+            Valors de les variables d'enllaç.
+        commit : bool
+            Si és True, fa commit a la mateixa sessió. En mode pool cal per fer persistents els canvis, ja que la
+            sessió torna al pool en acabar la crida.
+        """
+        async with self._session() as conn:
+            await conn.execute(sql, parameters)
+            if commit:
+                await conn.commit()
+
+    async def executemany(self, sql: str, parameters: Any, commit: bool = False) -> None:
+        """
+        Executa una sentència per a cada fila de `parameters`. Vegeu `execute`.
+        """
+        async with self._session() as conn:
+            await conn.executemany(sql, parameters)
+            if commit:
+                await conn.commit()
+
+    async def fetchone(self, sql: str, parameters: Any = None) -> Optional[Any]:
+        """Executa una consulta i en retorna la primera fila."""
+        async with self._session() as conn:
+            return await conn.fetchone(sql, parameters)
+
+    async def fetchmany(self, sql: str, parameters: Any = None, num_rows: Optional[int] = None) -> List[Any]:
+        """Executa una consulta i en retorna com a molt `num_rows` files."""
+        async with self._session() as conn:
+            return await conn.fetchmany(sql, parameters, num_rows)
+
+    async def fetchall(self, sql: str, parameters: Any = None) -> List[Any]:
+        """Executa una consulta i en retorna totes les files."""
+        async with self._session() as conn:
+            return await conn.fetchall(sql, parameters)
+
+    @asynccontextmanager
+    async def pipeline(self, continue_on_error: bool = False):
+        """
+        Context on s'encuen sentències independents que s'envien totes juntes, amb `run_pipeline`, en sortir.
+
+            async with db.pipeline() as p:
+                p.execute("INSERT INTO log VALUES (:1)", ["a"])
+                recintes = p.fetchall("SELECT * FROM recintes")
+                p.commit()
+            print(recintes.rows)
+
+        Amb servidors anteriors a Oracle 23ai, oracledb executa les operacions una a una.
+        """
+        p = StatementPipeline(continue_on_error)
+        yield p
+        if not len(p):
+            return
+        async with self._session() as conn:
+            p.set_results(await conn.run_pipeline(p.to_oracledb(), continue_on_error))
+
+    async def iter_lob(self, sql: str, parameters: Any = None,
+                       chunk_size: Optional[int] = None) -> AsyncIterator[Union[str, bytes]]:
+        """
+        Executa una consulta que retorna un LOB (primera columna de la primera fila) i el retorna per trossos, sense
+        tenir-lo mai sencer a memòria.
+
+            async for tros in db.iter_lob("SELECT contingut FROM documents WHERE id = :1", [7]):
+                out.write(tros)
+        """
+        async with self._session() as conn:
+            row = await conn.fetchone(sql, parameters, fetch_lobs=True)
+            if row is None or row[0] is None:
+                raise ValueError("La consulta no ha retornat cap LOB")
+            async for chunk in aiter_lob(row[0], chunk_size):
+                yield chunk
+
+    async def write_lob(self, sql: str, parameters: Any, stream: Any, chunk_size: Optional[int] = None,
+                        commit: bool = False) -> int:
+        """
+        Escriu `stream` al LOB que retorna la consulta (amb `FOR UPDATE`), per trossos. Vegeu
+        `oracleConnection.write_lob`.
+        """
+        async with self._session() as conn:
+            row = await conn.fetchone(sql, parameters, fetch_lobs=True)
+            if row is None or row[0] is None:
+                raise ValueError("La consulta no ha retornat cap LOB")
+            await row[0].trim()
+            written = await awrite_lob(row[0], stream, chunk_size)
+            if commit:
+                await conn.commit()
+            return written
+
+    async def commit(self) -> None:
+        """
+        Fa un commit de la transacció de la sessió principal.
+        """
+        await self.conn.commit()
+
+    async def test_connection(self) -> bool:
+        """
+        Prova la connexió a la base de dades Oracle.
+
+        Retorna:
+        --------
+        bool
+            True si la connexió és correcta, False en cas contrari.
+        """
+        try:
+            res = await self.fetchone("""SELECT sys_context('USERENV','SESSION_USER')  as "CURRENT USER" ,
+                      sys_context('USERENV', 'CURRENT_SCHEMA') as "CURRENT SCHEMA"
+                      FROM dual""")
+            print("Current user: {}, Current schema: {}".format(res[0], res[1]))
+            return True
+        except Exception:
+            logging.error("Database is not open. Check the connection parameters and its status.")
+            return False
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Retorna les sessions obertes i ocupades del pool i la seva configuració.
+        """
+        if self._pool is None:
+            return {}
+        return {
+            'opened': self._pool.opened,
+            'busy': self._pool.busy,
+            'min': self._pool.min,
+            'max': self._pool.max,
+            'increment': self._pool.increment,
+        }
+
+    def __enter__(self):
+        raise TypeError("AsyncOracleConnection s'ha de fer servir amb `async with`")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def __aenter__(self):
+        try:
+            await self.open()
+            if not self.is_open:
+                raise RuntimeError("No s'ha pogut obrir la connexió Oracle")
+        except BaseException:
+            # Si `__aenter__` falla no es crida `__aexit__`: es tanquen aquí el pool (si s'ha arribat a crear) i el
+            # túnel, i es propaga l'error original
+            try:
+                await self.close()
+            except Exception as e:
+                logging.warning(f"Could not clean up after a failed open: {e}")
+            raise
+        self._context_mode = "tunnel"
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        self._context_mode = None
@@ -1,4 +1,5 @@
 from .oracleConnection import oracleConnection
+from .AsyncOracleConnection import AsyncOracleConnection
 from .mongoConnection import mongoConnection
 from .AbsConnection import GABDSSHTunnel
 from .ssh_tunnel import get_free_port
@@ -13,11 +13,249 @@ de connexions a bases de dades Oracle, incloent la configuració i manteniment d
 essencial per a l'administració segura i eficient de bases de dades Oracle en entorns distribuïts.
 """
 
+import datetime
+import decimal
 import logging
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 
 from oracledb import *
 
 from .AbsConnection import AbsConnection
+from .oracle_binds import LiteralNormalizer
+from .oracle_balancer import BalancedPool, ListenerBalancer, connect_descriptor, parse_endpoint
+from .oracle_cache import ResultCache, dml_tables, query_tables
+from .oracle_collections import ArrayBind, TypeCache, array_length, bind_value, chunk_bounds
+from .oracle_cursor import CursorPool, PooledCursor
+from .oracle_export import FORMATS, CsvBatchWriter, ParquetBatchWriter, read_lobs, write_batches
+from .oracle_lob import LobReader, write_lob
+from .oracle_metadata import MetadataCache, TableInfo, input_size
+from .oracle_pipeline import StatementPipeline
+from .oracle_plan import ExecutionPlan, add_hint, cursor_plan, explain_plan, last_statement, monitor_report
+from .oracle_profiler import StatementProfiler
+from .oracle_stats import SCOPES, SOURCES, StatsSnapshot, accessible_sources
+from .oracle_parallel import rowid_chunks, key_chunks, run_chunks
+
+# Modes d'obtenció de sessions del pool, pel nom que es pot fer servir al paràmetre `pool`
+_POOL_GETMODES = {
+    'wait': POOL_GETMODE_WAIT,
+    'nowait': POOL_GETMODE_NOWAIT,
+    'forceget': POOL_GETMODE_FORCEGET,
+    'timedwait': POOL_GETMODE_TIMEDWAIT,
+}
+
+
+def _pool_kwargs(pool: Dict[str, Any]) -> Dict[str, Any]:
+    """Tradueix el diccionari del paràmetre `pool` als arguments de `oracledb.create_pool`."""
+    kwargs = {'min': 1, 'max': 4, 'increment': 1, **pool}
+    getmode = kwargs.get('getmode')
+    if isinstance(getmode, str):
+        try:
+            kwargs['getmode'] = _POOL_GETMODES[getmode.strip().lower()]
+        except KeyError:
+            raise ValueError(f"getmode '{getmode}' no vàlid. Ha de ser un de {list(_POOL_GETMODES)}")
+    return kwargs
+
+
+_QUERY = re.compile(r"^\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+
+# Mida aproximada (en bytes) dels lots de `stream` quan no se n'indica el nombre de files
+_STREAM_BATCH_BYTES = 2 ** 20
+_STREAM_MIN_ROWS = 100
+_STREAM_MAX_ROWS = 50000
+
+# Mida aproximada (en bytes, sense comprimir) dels grups de files de `export` en Parquet
+_EXPORT_ROW_GROUP_BYTES = 64 * 2 ** 20
+_TABLE_NAME = re.compile(r'^\s*(?:"[^"]+"|[\w$#]+)(?:\s*\.\s*(?:"[^"]+"|[\w$#]+))?(?:@[\w$#.]+)?\s*$')
+
+
+def _row_width(description) -> int:
+    """Estimació de l'amplada en bytes d'una fila a partir de la descripció del cursor."""
+    width = 0
+    for col in description:
+        if col.type in (DB_TYPE_CLOB, DB_TYPE_NCLOB, DB_TYPE_BLOB, DB_TYPE_BFILE):
+            width += 4000  # Localitzador i, si es demana, el contingut del LOB
+        else:
+            width += col.internal_size or 22
+    return width + 4 * len(description)
+
+
+def _rowfactory(description, rowtype: Optional[str]):
+    """Funció per a `Cursor.rowfactory` que converteix cada fila a diccionari o namedtuple."""
+    if rowtype is None or rowtype == 'tuple':
+        return None
+    names = [col.name for col in description]
+    if rowtype == 'dict':
+        return lambda *values: dict(zip(names, values))
+    if rowtype == 'namedtuple':
+        return namedtuple('Row', names, rename=True)
+    raise ValueError(f"rowtype '{rowtype}' no vàlid. Ha de ser 'tuple', 'dict' o 'namedtuple'")
+
+
+def _import_pyarrow(required: bool = True):
+    """Importa pyarrow, que és opcional. Retorna None si no hi és i no és imprescindible."""
+    try:
+        import pyarrow
+    except ImportError:
+        if required:
+            raise ImportError("Cal instal·lar pyarrow per obtenir resultats en format Arrow: pip install pyarrow")
+        return None
+    return pyarrow
+
+
+def _apply_dtypes(df, types: Dict[str, str], dtypes: Optional[Dict[str, Any]]):
+    """
+    Aplica `dtypes` a un DataFrame. Les claus poden ser noms de columna o noms de tipus d'Oracle ('NUMBER',
+    'DATE', 'TIMESTAMP', ...), que s'apliquen a totes les columnes d'aquell tipus.
+    """
+    if not dtypes:
+        return df
+    mapping = {}
+    for col, oracle_type in types.items():
+        if col in dtypes:
+            mapping[col] = dtypes[col]
+        elif oracle_type in dtypes:
+            mapping[col] = dtypes[oracle_type]
+    return df.astype(mapping) if mapping else df
+
+
+def _fetch_batches(curs, batch_size: int) -> Iterator[List[Any]]:
+    """Llegeix les files pendents d'un cursor en lots de `batch_size`."""
+    while True:
+        rows = curs.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+
+
+def _oracle_type_names(description) -> Dict[str, str]:
+    """{columna: tipus d'Oracle} ('NUMBER', 'VARCHAR', 'DATE', ...) a partir de la descripció d'un cursor."""
+    return {col.name: col.type.name.replace('DB_TYPE_', '') for col in description}
+
+
+def _is_dataframe(rows: Any) -> bool:
+    """Detecta un DataFrame de pandas sense importar pandas."""
+    return hasattr(rows, 'itertuples') and hasattr(rows, 'iloc') and hasattr(rows, 'columns')
+
+
+def _iter_batches(rows: Any, batch_size: int) -> Iterator[List[Any]]:
+    """
+    Divideix `rows` (qualsevol iterable de files o un DataFrame) en llistes de com a molt `batch_size` files, sense
+    materialitzar-lo sencer.
+    """
+    if _is_dataframe(rows):
+        for start in range(0, len(rows), batch_size):
+            chunk = rows.iloc[start:start + batch_size]
+            # NaN/NaT -> None perquè arribin a Oracle com a NULL
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            yield list(chunk.itertuples(index=False, name=None))
+        return
+
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _bind_type(values: Iterable[Any]) -> Any:
+    """
+    Tipus (o mida) per a `setinputsizes` a partir dels valors d'una columna del lot: la longitud màxima per a les
+    cadenes i els bytes, i el tipus d'Oracle del primer valor no nul per a la resta. None si no es pot deduir.
+    """
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    first = values[0]
+    if isinstance(first, str):
+        return max(len(v) for v in values if isinstance(v, str)) or 1
+    if isinstance(first, (bytes, bytearray)):
+        return DB_TYPE_RAW if all(len(v) <= 2000 for v in values) else DB_TYPE_BLOB
+    if isinstance(first, bool):
+        return DB_TYPE_BOOLEAN
+    if isinstance(first, (int, float, decimal.Decimal)):
+        return DB_TYPE_NUMBER
+    if isinstance(first, datetime.datetime):
+        return DB_TYPE_TIMESTAMP
+    if isinstance(first, datetime.date):
+        return DB_TYPE_DATE
+    return None
+
+
+def _chain_first(first: Any, rest: Iterator[Any]) -> Iterator[Any]:
+    yield first
+    yield from rest
+
+
+def _input_sizes(batch: List[Any]):
+    """Arguments posicionals o amb nom per a `Cursor.setinputsizes` d'un lot de files."""
+    first = batch[0]
+    if isinstance(first, dict):
+        return (), {k: _bind_type(row.get(k) for row in batch) for k in first}
+    return tuple(_bind_type(row[i] for row in batch) for i in range(len(first))), {}
+
+
+def _batch_input_sizes(input_sizes: Any) -> Callable[[List[Any]], Optional[tuple]]:
+    """
+    Funció que retorna els arguments (posicionals, amb nom) de `setinputsizes` per a un lot de `bulk_execute`, o
+    None si no cal cridar-lo. Vegeu el paràmetre `input_sizes` de `bulk_execute`.
+    """
+    if isinstance(input_sizes, dict):
+        return lambda batch: ((), input_sizes)
+    if isinstance(input_sizes, (list, tuple)):
+        fixed = tuple(input_sizes)
+        return lambda batch: (fixed, {})
+    if input_sizes:
+        return _input_sizes
+    return lambda batch: None
+
+
+def _execute_batch(curs, sql: str, batch: List[Any], sizes: Optional[tuple], result: Dict[str, Any]) -> None:
+    """Executa un lot de `bulk_execute` i n'afegeix les files, les files afectades i els errors a `result`."""
+    if sizes is not None:
+        curs.setinputsizes(*sizes[0], **sizes[1])
+    curs.executemany(sql, batch, batcherrors=True)
+    for err in curs.getbatcherrors():
+        result['errors'].append({'row': result['rows'] + err.offset, 'code': err.full_code, 'message': err.message})
+    result['rows'] += len(batch)
+    result['rowcount'] += curs.rowcount
+    result['batches'] += 1
+
+
+def _export_query(query_or_table: str) -> str:
+    """Consulta d'`export`: la mateixa si ja ho és, o `SELECT * FROM` si és un nom de taula."""
+    if _QUERY.match(query_or_table):
+        return query_or_table
+    if not _TABLE_NAME.match(query_or_table):
+        raise ValueError(f"'{query_or_table}' no és una consulta ni un nom de taula")
+    return f"SELECT * FROM {query_or_table.strip()}"
+
+
+def _export_writer(path: str, format: str, description, batch_size: int, compression: Optional[str],
+                   row_group_size: Optional[int], csv_options: Dict[str, Any]):
+    """Escriptor d'`export` per al format indicat."""
+    if format == 'csv':
+        return CsvBatchWriter(path, description, compression=compression, **csv_options)
+    if row_group_size is None:
+        row_group_size = max(batch_size, _EXPORT_ROW_GROUP_BYTES // _row_width(description))
+    return ParquetBatchWriter(path, description, compression='snappy' if compression is None else compression,
+                              row_group_size=row_group_size)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
 
 
 class oracleConnection(AbsConnection):
@@ -26,15 +264,22 @@ class oracleConnection(AbsConnection):
 
     Atributs:
     ----------
-    _cursor : oracledb.Cursor
-        Cursor per executar procediments i consultes.
+    _cursor : PooledCursor
+        Darrer cursor retornat per `cursor()`.
+    _cursors : CursorPool
+        Cursors de la sessió que es reutilitzen entre crides a `cursor()`.
     _serviceName : str
         Nom del servei de la base de dades.
     _dsn : str
         Data Source Name per a la connexió a la base de dades.
+    _pool : oracledb.ConnectionPool
+        Pool de sessions, si la connexió s'ha creat amb el paràmetre `pool`.
     """
 
-    __slots__ = ['_cursor', '_serviceName', '_con_params']
+    __slots__ = ['_cursor', '_cursors', '_cursor_pool_size', '_dbms_output', '_output_enabled', '_serviceName',
+                 '_liveness_interval', '_last_alive', '_listeners', '_result_cache', '_profiler',
+                 '_fetch_lobs', '_metadata', '_metadata_ttl', '_stats_sources', '_types', '_normalizer', '_load_balance',
+                 '_balancer', '_endpoint', '_con_params', '_pool_params', '_pool', '_pool_lock', '_pool_waits']
 
     def __init__(self, **params):
         """
@@ -43,12 +288,59 @@ class oracleConnection(AbsConnection):
         Paràmetres:
         ---------
         **params: dict
-            Paràmetres de connexió, incloent `serviceName` i `port`.
+            Paràmetres de connexió, incloent `serviceName` i `port`. Amb `pool` (un diccionari amb `min`, `max`,
+            `increment`, `getmode`, `timeout`, ... de `oracledb.create_pool`) les sessions s'obtenen d'un pool.
+            `dbms_output` (per defecte True) indica si `cursor()` ha d'activar DBMS_OUTPUT, un cop per sessió.
+            `stmtcachesize` és la mida de la memòria cau de sentències de cada sessió i `cursor_pool_size` el
+            nombre de cursors lliures que es guarden per reutilitzar-los. `liveness_interval` (per defecte 30
+            segons) és el temps d'inactivitat a partir del qual `is_open` torna a fer un ping al servidor.
+            `result_cache` (True o un diccionari amb `size` i `ttl`) activa la memòria cau de `cached_query` i
+            `profile` (True o un diccionari amb els paràmetres d'`enable_profiling`), el perfilat de sentències.
+            `fetch_lobs=False` fa que els cursors retornin els LOB com a `str`/`bytes` en lloc de localitzadors
+            (adequat per a LOB petits; per als grans, vegeu `open_lob`).
+            `listeners` (ports locals de `multiple_tunnels`, `"host:port"` o `(host, port)`) i `load_balance`
+            ('round_robin', 'least_connections', 'descriptor' o un diccionari amb `policy` i `retry_after`)
+            reparteixen les sessions entre diversos listeners (nodes d'un RAC o rèpliques). Vegeu `listener_stats`.
+            `metadata_ttl` (per defecte 300 segons) és el temps de vida de les descripcions de `table_info`.
+            `bind_literals` (True o un diccionari amb els paràmetres de `LiteralNormalizer`) fa que `execute`
+            substitueixi els literals de les consultes i DML per variables d'enllaç. Vegeu `literal_stats`.
         """
 
         self._cursor = None
+        self._cursors = None
+        self._cursor_pool_size = params.pop('cursor_pool_size', 8)
+        self._dbms_output = params.pop('dbms_output', True)
+        self._output_enabled = False
+        self._liveness_interval = params.pop('liveness_interval', 30.0)
+        self._last_alive = 0.0
+        self._listeners = []
+        result_cache = params.pop('result_cache', None)
+        self._result_cache = None
+        if result_cache:
+            self._result_cache = ResultCache(**(result_cache if isinstance(result_cache, dict) else {}))
+            self._listeners.append(self._invalidate_on_dml)
+        self._fetch_lobs = params.pop('fetch_lobs', None)
+        self._metadata = None
+        self._metadata_ttl = params.pop('metadata_ttl', 300.0)
+        self._stats_sources = None
+        self._types = TypeCache()
+        bind_literals = params.pop('bind_literals', None)
+        self._normalizer = None
+        if bind_literals:
+            self._normalizer = LiteralNormalizer(**(bind_literals if isinstance(bind_literals, dict) else {}))
+        self._profiler = None
+        profile = params.pop('profile', None)
+        if profile:
+            self.enable_profiling(**(profile if isinstance(profile, dict) else {}))
+        stmtcachesize = params.pop('stmtcachesize', None)
+        self._pool_params = params.pop('pool', None)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._pool_waits = {'acquires': 0, 'total': 0.0, 'max': 0.0}
         self._serviceName = params.pop('serviceName', 'orcl')
         params['port'] = params.pop('port', 1521)
+        listeners = params.pop('listeners', None)
+        load_balance = params.pop('load_balance', None)
 
         AbsConnection.__init__(self, **params)
         if params['ssh_data'] is None:
@@ -56,24 +348,36 @@ class oracleConnection(AbsConnection):
         else:
             self._dsn = f"{self.user}/{self.pwd}@localhost:{self._local_port}/{self._serviceName}"
 
+        self._load_balance = None
+        self._balancer = None
+        self._endpoint = None
+        if load_balance:
+            self._setup_load_balance(listeners, load_balance)
+
         # mode = params.pop('mode', None)
 
         mode = SYSDBA if params.pop('mode', '').strip().lower() in ['sysdba', 'dba'] else None
 
         self._con_params = {'mode': mode} if mode is not None else dict()
+        if stmtcachesize is not None:
+            self._con_params['stmtcachesize'] = stmtcachesize
 
-    def cursor(self) -> DB_TYPE_CURSOR:
+    def cursor(self) -> PooledCursor:
         """
-        Retorna el cursor de la connexió Oracle.
+        Retorna un cursor de la connexió Oracle.
+
+        Els cursors es reutilitzen: en tancar-los (o en sortir del `with`) tornen al pool de cursors de la sessió.
+        Si la connexió s'ha creat amb `dbms_output=True`, el primer cursor de cada sessió activa DBMS_OUTPUT.
 
         Retorna:
         --------
-        oracledb.Cursor
-            El cursor de la connexió.
+        PooledCursor
+            Un cursor que es fa servir igual que un `oracledb.Cursor`.
         """
         try:
-            self._cursor = self.conn.cursor()
-            self._cursor.callproc("dbms_output.enable")
+            self._cursor = self._pooled_cursor()
+            if self._dbms_output and not self._output_enabled:
+                self.enable_output()
 
         except DatabaseError:
             logging.warning('Database connection already closed')
@@ -85,6 +389,115 @@ class oracleConnection(AbsConnection):
         finally:
             return self._cursor
 
+    def _pooled_cursor(self) -> PooledCursor:
+        """Cursor del pool de cursors de la sessió actual, sense activar DBMS_OUTPUT."""
+        conn = self.conn
+        if conn is None:
+            raise AttributeError("'NoneType' object has no attribute 'cursor'")
+        if self._cursors is None or self._cursors.connection is not conn:
+            self._close_cursors()
+            self._cursors = CursorPool(conn, self._cursor_pool_size, self._listeners, self._profiler,
+                                       self._fetch_lobs, self._normalizer)
+        return self._cursors.get()
+
+    def _close_cursors(self) -> None:
+        if self._cursors is not None:
+            self._cursors.close()
+            self._cursors = None
+        self._output_enabled = False
+
+    def enable_output(self, buffer_size: Optional[int] = None) -> None:
+        """
+        Activa DBMS_OUTPUT a la sessió actual.
+
+        Paràmetres:
+        -----------
+        buffer_size : int, opcional
+            Mida del buffer en bytes. Si és None, il·limitada.
+        """
+        with self._pooled_cursor() as curs:
+            # Pel cursor d'oracledb: DBMS_OUTPUT no modifica cap taula i no ha d'avisar els listeners
+            curs.cursor.callproc("dbms_output.enable", [buffer_size])
+        self._output_enabled = True
+
+    def cursor_stats(self) -> Dict[str, int]:
+        """
+        Retorna quants cursors s'han creat, reutilitzat i descartat a la sessió actual, i quants n'hi ha de lliures.
+        """
+        return self._cursors.stats() if self._cursors is not None else {}
+
+    def _listener_endpoints(self, listeners: Optional[List[Any]]) -> List[tuple]:
+        """
+        Adreces a què s'ha de connectar per arribar a cada listener. Amb túnel SSH, els listeners remots es tradueixen
+        al seu port local de `multiple_tunnels` i, si no se n'indica cap, es fan servir tots els forwards cap al port
+        de la connexió.
+        """
+        if self._ssh_data is None:
+            if not listeners:
+                raise ValueError("Cal indicar `listeners` per repartir les sessions sense túnel SSH")
+            return [parse_endpoint(listener) for listener in listeners]
+
+        # Els ports de `multiple_tunnels` poden ser cadenes si s'hi han passat com a tupla
+        local_ports = {parse_endpoint(remote): local for local, remote in self._mt.items()}
+        if not listeners:
+            return [('localhost', local) for local, (_, remote_port) in self._mt.items()
+                    if int(remote_port) == int(self._port)]
+        endpoints = []
+        for listener in listeners:
+            if isinstance(listener, int):
+                endpoints.append(('localhost', listener))
+                continue
+            remote = parse_endpoint(listener)
+            if remote not in local_ports:
+                raise ValueError(f"El listener {remote[0]}:{remote[1]} no és a `multiple_tunnels`")
+            endpoints.append(('localhost', local_ports[remote]))
+        return endpoints
+
+    def _setup_load_balance(self, listeners: Optional[List[Any]], load_balance: Any) -> None:
+        config = dict(load_balance) if isinstance(load_balance, dict) else {}
+        policy = config.pop('policy', load_balance if isinstance(load_balance, str) else 'round_robin')
+        endpoints = self._listener_endpoints(listeners)
+        if policy == 'descriptor':
+            # El controlador tria l'adreça de cada sessió i, si no respon, prova la següent
+            self._dsn = f"{self.user}/{self.pwd}@{connect_descriptor(endpoints, self._serviceName)}"
+            return
+        self._load_balance = {'endpoints': endpoints, 'policy': policy, **config}
+        self._balancer = self._new_balancer()
+
+    def _new_balancer(self) -> ListenerBalancer:
+        return ListenerBalancer(health=self._listener_alive, **self._load_balance)
+
+    def _listener_alive(self, endpoint: tuple) -> bool:
+        """Un listener a través del túnel és utilitzable mentre el seu forward és obert."""
+        if self._ssh_data is None:
+            return True
+        tunnel = self.get_tunnel()
+        return tunnel is None or not tunnel.is_tunnel_closed(endpoint[1])
+
+    def _endpoint_dsn(self, endpoint: tuple) -> str:
+        return f"{self.user}/{self.pwd}@{endpoint[0]}:{endpoint[1]}/{self._serviceName}"
+
+    def _new_pool(self, **pool_kwargs):
+        """Pool de sessions pel DSN de la connexió o, si es reparteixen les sessions, un per listener."""
+        if self._load_balance is not None:
+            return BalancedPool(self._new_balancer(), self._endpoint_dsn, **pool_kwargs)
+        return create_pool(self.dsn, **pool_kwargs)
+
+    def _release_endpoint(self) -> None:
+        if self._endpoint is not None:
+            self._balancer.released(self._endpoint)
+            self._endpoint = None
+
+    def listener_stats(self) -> Dict[str, Any]:
+        """
+        Retorna com s'han repartit les sessions entre els listeners: la política i, per a cada listener, les sessions
+        obertes en total (`sessions`), les actives (`active`), les ocupades del pool (`load`), els errors de
+        connexió (`failures`) i si és fora de la rotació (`down`). Buit si no es reparteixen les sessions.
+        """
+        if isinstance(self._pool, BalancedPool):
+            return self._pool.balancer.stats()
+        return self._balancer.stats() if self._balancer is not None else {}
+
     def open(self, dsn: str = None, host: str = None, port: int = None, service_name: str = None, **con_params):
         """
           Connect to a oracle server given the connexion information saved on the cfg member variable.
@@ -97,12 +510,15 @@ class oracleConnection(AbsConnection):
             raise RuntimeError(f"Could not open the SSH tunnel {t}. Check the connection parameters and its status.")
 
         # Si no es passa dsn, el creem a partir de host/port/service_name o de self._dsn
+        # Un DSN explícit substitueix el repartiment entre listeners
         if dsn is None:
             if host and port and service_name:
                 self.dsn = makedsn(host, port, service_name=service_name)
+                self._load_balance = self._balancer = None
 
         else:
             self.dsn = dsn
+            self._load_balance = self._balancer = None
 
         con_params_to_use = {**self._con_params, **con_params}
 
@@ -121,10 +537,18 @@ class oracleConnection(AbsConnection):
             return self
 
     def open_session(self, **con_params):
-        conn = connect(self.dsn, **con_params)
+        if self._pool_params is not None:
+            conn = self._open_pool(**con_params).acquire()
+        elif self._balancer is not None:
+            self._release_endpoint()
+            conn, self._endpoint = self._balancer.connect(lambda e: connect(self._endpoint_dsn(e), **con_params))
+        else:
+            conn = connect(self.dsn, **con_params)
         if conn is not None:
             self.conn = conn
-            self._cursor = self.conn.cursor()
+            self._close_cursors()
+            self._cursor = None
+            self._last_alive = time.monotonic()
             self.is_open = True
         else:
             self.is_open = False
@@ -134,6 +558,96 @@ class oracleConnection(AbsConnection):
 
         return self.conn
 
+    def _open_pool(self, **con_params) -> ConnectionPool:
+        """Crea el pool de sessions amb el mateix DSN (i túnel) que la connexió, si encara no existeix."""
+        if self._pool is None:
+            self._pool = self._new_pool(**_pool_kwargs(self._pool_params), **con_params)
+        return self._pool
+
+    def _close_pool(self) -> None:
+        if self._pool is not None:
+            try:
+                self._pool.close(force=True)
+            except DatabaseError:
+                logging.warning('Connection pool already closed')
+            finally:
+                self._pool = None
+
+    @property
+    def pool(self) -> Optional[ConnectionPool]:
+        """Pool de sessions o None si la connexió no és en mode pool."""
+        return self._pool
+
+    def acquire(self) -> Connection:
+        """
+        Obté una sessió del pool. Es pot fer servir com a context manager: en sortir del `with` la sessió torna al
+        pool.
+
+            with db.acquire() as conn:
+                with conn.cursor() as curs:
+                    ...
+
+        Retorna:
+        --------
+        oracledb.Connection
+            Una sessió del pool.
+        """
+        if self._pool_params is None:
+            raise RuntimeError("La connexió no és en mode pool. Crea-la amb el paràmetre `pool`.")
+        if self._pool is None:
+            self.open()
+
+        start = time.perf_counter()
+        conn = self._pool.acquire()
+        waited = time.perf_counter() - start
+
+        with self._pool_lock:
+            self._pool_waits['acquires'] += 1
+            self._pool_waits['total'] += waited
+            self._pool_waits['max'] = max(self._pool_waits['max'], waited)
+        return conn
+
+    def release(self, conn: Connection) -> None:
+        """
+        Retorna al pool una sessió obtinguda amb `acquire()`.
+
+        Paràmetres:
+        -----------
+        conn : oracledb.Connection
+            La sessió a alliberar.
+        """
+        if self._pool is None:
+            raise RuntimeError("El pool de sessions no està obert")
+        self._pool.release(conn)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Retorna les estadístiques del pool de sessions.
+
+        Retorna:
+        --------
+        dict
+            Sessions obertes (`opened`) i ocupades (`busy`), la configuració del pool i el temps d'espera (en
+            segons) de les crides a `acquire()`.
+        """
+        if self._pool is None:
+            return {}
+
+        with self._pool_lock:
+            waits = dict(self._pool_waits)
+
+        return {
+            'opened': self._pool.opened,
+            'busy': self._pool.busy,
+            'min': self._pool.min,
+            'max': self._pool.max,
+            'increment': self._pool.increment,
+            'acquires': waits['acquires'],
+            'wait_time_total': waits['total'],
+            'wait_time_avg': waits['total'] / waits['acquires'] if waits['acquires'] else 0.0,
+            'wait_time_max': waits['max'],
+        }
+
     def close(self) -> None:
         """
         Tanca la connexió a la base de dades Oracle.
@@ -143,6 +657,7 @@ class oracleConnection(AbsConnection):
         None
         """
         try:
+            self._close_cursors()
             if self.is_open:
                 self.conn.close()
                 self.is_open = False
@@ -151,6 +666,8 @@ class oracleConnection(AbsConnection):
         except AttributeError:
             logging.warning(f"Connexió a {self._dsn} tancada.")
         finally:
+            self._release_endpoint()
+            self._close_pool()
             if self._context_mode is None or self._context_mode == "Tunnel":
                 self.closetunnel()
 
@@ -167,7 +684,9 @@ class oracleConnection(AbsConnection):
             if self._cursor is not None:
                 self._cursor.close()
         except Exception:
-            self._cursor = None
+            pass
+        self._cursor = None
+        self._close_cursors()
 
         try:
             if self.conn is not None:
@@ -177,8 +696,963 @@ class oracleConnection(AbsConnection):
         except AttributeError as e:
             print(f"Connexió a {self._dsn} tancada.")
 
+        self._release_endpoint()
+        self._close_pool()
         self.is_open = False
 
+    def bulk_execute(self, sql: str, rows: Any, batch_size: int = 1000, commit_every: Optional[int] = None,
+                     input_sizes: Any = True) -> Dict[str, Any]:
+        """
+        Executa una sentència DML per a moltes files fent servir `executemany` per lots: un sol viatge d'anada i
+        tornada per lot en lloc d'un per fila.
+
+            res = db.bulk_execute("INSERT INTO t (id, nom) VALUES (:1, :2)", rows, batch_size=5000, commit_every=10)
+            for err in res['errors']:
+                print(err['row'], err['message'])
+
+        Paràmetres:
+        -----------
+        sql : str
+            Sentència INSERT, UPDATE, DELETE o MERGE amb variables d'enllaç posicionals (:1, :2, ...) o amb nom.
+        rows : iterable o pandas.DataFrame
+            Files (tuples, llistes o diccionaris). Es consumeix en lots, de manera que pot ser un generador.
+        batch_size : int
+            Nombre de files per lot.
+        commit_every : int, opcional
+            Si s'indica, fa commit cada `commit_every` lots i al final. Si és None, no fa cap commit.
+        input_sizes : bool, list o dict
+            Si és True, crida `setinputsizes` a cada lot amb els tipus i mides deduïts de les seves files, per evitar
+            que el controlador hagi de tornar a reservar els buffers a mig lot. Una llista (variables posicionals) o
+            un diccionari (amb nom) es passen tal qual a `setinputsizes`.
+
+        Retorna:
+        --------
+        dict
+            `rows` (files enviades), `rowcount` (files afectades), `batches`, `errors` (una entrada per fila
+            rebutjada amb `row`, l'índex de la fila a `rows`; `code` i `message`), `elapsed` (segons) i
+            `rows_per_second`.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size ha de ser positiu")
+        if self.conn is None:
+            raise RuntimeError("La sessió Oracle no està oberta")
+
+        result = {'rows': 0, 'rowcount': 0, 'batches': 0, 'errors': []}
+        start = time.perf_counter()
+
+        sizes = _batch_input_sizes(input_sizes)
+        with self._pooled_cursor() as curs:
+            for batch in _iter_batches(rows, batch_size):
+                _execute_batch(curs, sql, batch, sizes(batch), result)
+                if commit_every and result['batches'] % commit_every == 0:
+                    self.conn.commit()
+
+        if commit_every and result['batches'] % commit_every != 0:
+            self.conn.commit()
+
+        result['elapsed'] = time.perf_counter() - start
+        result['rows_per_second'] = result['rows'] / result['elapsed'] if result['elapsed'] else 0.0
+        if result['errors']:
+            logging.warning(f"bulk_execute: {len(result['errors'])} de {result['rows']} files rebutjades")
+        return result
+
+    def bulk_insert(self, table: str, rows: Any, columns: Optional[Sequence[str]] = None, batch_size: int = 1000,
+                    commit_every: Optional[int] = None, input_sizes: bool = True) -> Dict[str, Any]:
+        """
+        Insereix moltes files a `table` amb `bulk_execute`.
+
+        Paràmetres:
+        -----------
+        table : str
+            Nom de la taula (pot incloure l'esquema).
+        rows : iterable o pandas.DataFrame
+            Files a inserir: seqüències de valors o diccionaris {columna: valor}. Amb un DataFrame, per defecte les
+            columnes són les del DataFrame.
+        columns : list de str, opcional
+            Columnes de la taula en l'ordre dels valors de cada fila. Si és None, s'agafen les claus dels
+            diccionaris o les columnes del DataFrame; amb seqüències s'insereixen totes les columnes en l'ordre de
+            la taula.
+        batch_size, commit_every, input_sizes :
+            Vegeu `bulk_execute`. Amb `input_sizes=True`, si es té accés a la descripció de la taula (vegeu
+            `table_info`), els tipus i mides es prenen de les columnes en lloc de deduir-los de cada lot.
+
+        Retorna:
+        --------
+        dict
+            El resultat de `bulk_execute`.
+        """
+        if _is_dataframe(rows):
+            columns = [str(c) for c in rows.columns] if columns is None else columns
+            named = False
+        else:
+            # Mirem la primera fila per saber quantes variables d'enllaç cal i si són amb nom
+            it = iter(rows)
+            try:
+                first = next(it)
+            except StopIteration:
+                return {'rows': 0, 'rowcount': 0, 'batches': 0, 'errors': [], 'elapsed': 0.0, 'rows_per_second': 0.0}
+            rows = _chain_first(first, it)
+            named = isinstance(first, dict)
+            if columns is None and named:
+                columns = list(first)
+            elif columns is None:
+                columns = [None] * len(first)
+
+        if named:
+            binds = ", ".join(f":{c}" for c in columns)
+        else:
+            binds = ", ".join(f":{i}" for i in range(1, len(columns) + 1))
+        cols = f" ({', '.join(columns)})" if all(columns) else ""
+
+        if input_sizes is True:
+            input_sizes = self._column_input_sizes(table, columns, named) or True
+
+        sql = f"INSERT INTO {table}{cols} VALUES ({binds})"
+        return self.bulk_execute(sql, rows, batch_size=batch_size, commit_every=commit_every,
+                                 input_sizes=input_sizes)
+
+    def object_type(self, name: str) -> DbObjectType:
+        """
+        Tipus d'objecte o col·lecció de la base de dades (`Connection.gettype`), desat per sessió perquè només es
+        consulti al diccionari de dades la primera vegada.
+
+            ids = db.object_type("NUM_TAB").newobject([1, 2, 3])
+        """
+        if self.conn is None:
+            raise RuntimeError("La sessió Oracle no està oberta")
+        return self._types.get(self.conn, name)
+
+    def call_arrays(self, name: str, parameters: Any, chunk_size: int = 10000,
+                    commit_every: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Crida un procediment que processa col·leccions senceres (amb `FORALL`, `TABLE(...)`, ...) passant-li els
+        arguments `ArrayBind` com a taules associatives de PL/SQL o com a objectes col·lecció: una crida per lot
+        de `chunk_size` elements en lloc d'una per fila.
+
+            ids, noms = ArrayBind(df['id'], DB_TYPE_NUMBER), ArrayBind(df['nom'], str)
+            db.call_arrays("vendes_pkg.carrega", [ids, noms, 2024])
+            db.call_arrays("carrega_vendes", {'p_vendes': ArrayBind(df, 'VENDES_TAB')}, chunk_size=50000)
+
+        Paràmetres:
+        -----------
+        name : str
+            Nom del procediment (`paquet.procediment`, `esquema.procediment`, ...).
+        parameters : list o dict
+            Arguments posicionals o amb nom. Els `ArrayBind` (que han de tenir tots el mateix nombre d'elements)
+            es parteixen en lots; la resta d'arguments es passen tal qual a cada crida.
+        chunk_size : int
+            Elements per crida, per acotar la memòria del client i de la sessió (PGA) amb entrades molt grans.
+        commit_every : int, opcional
+            Si s'indica, fa commit cada `commit_every` crides i al final. Si és None, no fa cap commit.
+
+        Retorna:
+        --------
+        dict
+            `elements` (per col·lecció), `calls`, `elapsed` (segons) i `elements_per_second`. Si les col·leccions
+            són buides, no es crida el procediment.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size ha de ser positiu")
+        if self.conn is None:
+            raise RuntimeError("La sessió Oracle no està oberta")
+
+        named = isinstance(parameters, dict)
+        items = list(parameters.items()) if named else list(enumerate(parameters))
+        length = array_length([v for _, v in items if isinstance(v, ArrayBind)])
+
+        result = {'elements': length, 'calls': 0}
+        start = time.perf_counter()
+        with self._pooled_cursor() as curs:
+            for first, last in chunk_bounds(length, chunk_size):
+                args = [(k, bind_value(curs, v, first, last, self._types) if isinstance(v, ArrayBind) else v)
+                        for k, v in items]
+                if named:
+                    curs.callproc(name, keyword_parameters=dict(args))
+                else:
+                    curs.callproc(name, [v for _, v in args])
+                result['calls'] += 1
+                if commit_every and result['calls'] % commit_every == 0:
+                    self.conn.commit()
+
+        if commit_every and result['calls'] % commit_every != 0:
+            self.conn.commit()
+
+        result['elapsed'] = time.perf_counter() - start
+        result['elements_per_second'] = result['elements'] / result['elapsed'] if result['elapsed'] else 0.0
+        return result
+
+    def _column_input_sizes(self, table: str, columns: List[Optional[str]], named: bool) -> Any:
+        """
+        Tipus i mides de `setinputsizes` a partir de la descripció de la taula. None si no se'n té la descripció o
+        alguna columna no hi és.
+        """
+        try:
+            info = self.table_info(table)
+        except DatabaseError as e:
+            logging.debug(f"No metadata for {table}: {e}")
+            return None
+        if info is None:
+            return None
+        if not all(columns):
+            if len(columns) != len(info):
+                return None
+            columns = info.column_names
+        if not all(c in info for c in columns):
+            return None
+        sizes = [input_size(info[c]) for c in columns]
+        return dict(zip(columns, sizes)) if named else sizes
+
+    def stream(self, sql: str, binds: Any = None, batch_size: Optional[int] = None, rowtype: Optional[str] = None,
+               batches: bool = True, fetch_lobs: Optional[bool] = None) -> Iterator[Any]:
+        """
+        Executa una consulta i en retorna els resultats de mica en mica, amb memòria acotada i pocs viatges d'anada
+        i tornada, en lloc de fer `fetchall()` o de llegir fila a fila amb l'`arraysize` per defecte.
+
+            for lot in db.stream("SELECT * FROM vendes WHERE any = :1", [2024], batch_size=10000):
+                processa(lot)
+
+        Paràmetres:
+        -----------
+        sql : str
+            Consulta.
+        binds : list, tuple o dict, opcional
+            Valors de les variables d'enllaç.
+        batch_size : int, opcional
+            Files per lot. També s'utilitza per a `arraysize` i `prefetchrows`, de manera que cada lot és un sol
+            viatge d'anada i tornada. Si és None, s'estima a partir de l'amplada de les files perquè cada lot ocupi
+            aproximadament 1 MB.
+        rowtype : str, opcional
+            'tuple' (per defecte), 'dict' o 'namedtuple'.
+        batches : bool
+            Si és True retorna llistes de files; si és False, les files una a una.
+        fetch_lobs : bool, opcional
+            Si és False, els LOB es retornen com a `str`/`bytes` dins dels mateixos viatges (adequat per a LOB
+            petits; oracledb no n'admet de més d'1 GB). Si és None, el valor de la connexió: per defecte,
+            localitzadors, que es poden llegir per trossos amb `oracle_lob.LobReader`.
+
+        Retorna:
+        --------
+        Iterador de lots (o de files).
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size ha de ser positiu")
+        if self.conn is None:
+            raise RuntimeError("La sessió Oracle no està oberta")
+
+        with self._pooled_cursor() as curs:
+            batch_size = self._execute_query(curs, sql, binds, batch_size, fetch_lobs)
+            curs.rowfactory = _rowfactory(curs.description, rowtype)
+            for rows in _fetch_batches(curs, batch_size):
+                if batches:
+                    yield rows
+                else:
+                    yield from rows
+
+    @staticmethod
+    def _execute_query(curs, sql: str, binds: Any, batch_size: Optional[int], fetch_lobs: Optional[bool]) -> int:
+        """
+        Executa una consulta amb `arraysize` i `prefetchrows` ajustats a `batch_size` (o a l'amplada de les files si
+        és None). `fetch_lobs` és None per fer servir el valor de la connexió. Retorna la mida de lot efectiva.
+        """
+        if batch_size is not None:
+            curs.arraysize = batch_size
+            # Una fila més perquè el primer viatge ja sàpiga si s'ha acabat el resultat
+            curs.prefetchrows = batch_size + 1
+        kwargs = {'fetch_lobs': fetch_lobs} if fetch_lobs is not None else {}
+        curs.execute(sql, binds if binds is not None else [], **kwargs)
+        if curs.description is None:
+            raise ValueError("La sentència no és una consulta")
+
+        if batch_size is None:
+            batch_size = _STREAM_BATCH_BYTES // _row_width(curs.description)
+            batch_size = max(_STREAM_MIN_ROWS, min(_STREAM_MAX_ROWS, batch_size))
+            curs.arraysize = batch_size
+        return batch_size
+
+    def _fetch_oracle_df(self, sql: str, binds: Any, batch_size: Optional[int]):
+        """
+        Obté el resultat com a `oracledb.DataFrame` (columnar, sense passar per tuples de Python) si el controlador
+        ho permet i pyarrow està instal·lat. Retorna None en cas contrari.
+        """
+        if not hasattr(self.conn, 'fetch_df_all') or _import_pyarrow(required=False) is None:
+            return None
+        try:
+            return self.conn.fetch_df_all(sql, binds, arraysize=batch_size)
+        except NotSupportedError as e:
+            logging.debug(f"fetch_df_all no disponible: {e}")
+            return None
+
+    def _fetch_columns(self, sql: str, binds: Any, batch_size: Optional[int]):
+        """
+        Llegeix el resultat per lots i el reorganitza per columnes.
+
+        Retorna:
+        --------
+        tuple
+            (noms de les columnes, {columna: tipus d'Oracle}, llista de valors de cada columna)
+        """
+        with self._pooled_cursor() as curs:
+            # Tot el resultat queda en memòria: els LOB es llegeixen com a str/bytes dins dels mateixos viatges
+            batch_size = self._execute_query(curs, sql, binds, batch_size, False)
+            names = [col.name for col in curs.description]
+            columns = [[] for _ in names]
+            for rows in _fetch_batches(curs, batch_size):
+                for values, column in zip(zip(*rows), columns):
+                    column.extend(values)
+            return names, _oracle_type_names(curs.description), columns
+
+    def fetch_df(self, sql: str, binds: Any = None, dtypes: Optional[Dict[str, Any]] = None,
+                 batch_size: Optional[int] = None):
+        """
+        Executa una consulta i en retorna el resultat com a `pandas.DataFrame`.
+
+        Si pyarrow està instal·lat, fa servir la lectura columnar d'oracledb (`fetch_df_all`), que no crea cap tupla
+        de Python. Altrament, llegeix el resultat per lots i el munta per columnes.
+
+            df = db.fetch_df("SELECT * FROM vendes WHERE any = :1", [2024], dtypes={'NUMBER': 'float64'})
+
+        Paràmetres:
+        -----------
+        sql : str
+            Consulta.
+        binds : list, tuple o dict, opcional
+            Valors de les variables d'enllaç.
+        dtypes : dict, opcional
+            Tipus de pandas per columna. Les claus poden ser noms de columna o tipus d'Oracle ('NUMBER', 'DATE',
+            'TIMESTAMP', ...).
+        batch_size : int, opcional
+            Files per viatge d'anada i tornada. Vegeu `stream`.
+
+        Retorna:
+        --------
+        pandas.DataFrame
+        """
+        import pandas as pd
+
+        odf = self._fetch_oracle_df(sql, binds, batch_size)
+        if odf is not None:
+            df = _import_pyarrow().table(odf).to_pandas()
+            if dtypes and not set(dtypes) <= set(df.columns):
+                return _apply_dtypes(df, self._oracle_types(sql), dtypes)
+            return _apply_dtypes(df, {name: None for name in df.columns}, dtypes)
+
+        names, types, columns = self._fetch_columns(sql, binds, batch_size)
+        df = pd.DataFrame({name: pd.Series(values, dtype=None if values else object)
+                           for name, values in zip(names, columns)}, columns=names)
+        return _apply_dtypes(df, types, dtypes)
+
+    def _oracle_types(self, sql: str) -> Dict[str, str]:
+        """Tipus d'Oracle de cada columna d'una consulta. Només l'analitza (`parse`), no l'executa."""
+        with self._pooled_cursor() as curs:
+            curs.parse(sql)
+            return _oracle_type_names(curs.description)
+
+    def fetch_arrow(self, sql: str, binds: Any = None, batch_size: Optional[int] = None):
+        """
+        Executa una consulta i en retorna el resultat com a `pyarrow.Table`. Cal tenir pyarrow instal·lat.
+
+        Paràmetres:
+        -----------
+        sql, binds, batch_size :
+            Vegeu `fetch_df`.
+
+        Retorna:
+        --------
+        pyarrow.Table
+        """
+        pa = _import_pyarrow()
+        odf = self._fetch_oracle_df(sql, binds, batch_size)
+        if odf is not None:
+            return pa.table(odf)
+        names, _, columns = self._fetch_columns(sql, binds, batch_size)
+        return pa.table(dict(zip(names, columns)))
+
+    def fetch_numpy(self, sql: str, binds: Any = None, dtypes: Optional[Dict[str, Any]] = None,
+                    batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Executa una consulta i en retorna el resultat com a un array de NumPy per columna.
+
+        Paràmetres:
+        -----------
+        sql, binds, dtypes, batch_size :
+            Vegeu `fetch_df`.
+
+        Retorna:
+        --------
+        dict
+            {nom de la columna: numpy.ndarray}
+        """
+        df = self.fetch_df(sql, binds, dtypes=dtypes, batch_size=batch_size)
+        return {name: df[name].to_numpy() for name in df.columns}
+
+    def export(self, query_or_table: str, path: str, format: str = 'parquet', batch_size: Optional[int] = None,
+               binds: Any = None, compression: Optional[str] = None, row_group_size: Optional[int] = None,
+               threaded: bool = True, queue_size: int = 2, fetch_lobs: Optional[bool] = None,
+               **csv_options) -> Dict[str, Any]:
+        """
+        Exporta el resultat d'una consulta (o una taula sencera) a un fitxer Parquet o CSV en memòria constant: els
+        lots passen del cursor al fitxer a mesura que arriben, sense acumular el resultat.
+
+            db.export("vendes", "vendes.parquet", compression='zstd')
+            db.export("SELECT * FROM vendes WHERE any = :1", "vendes_2024.csv.gz", format='csv', binds=[2024])
+
+        Paràmetres:
+        -----------
+        query_or_table : str
+            Consulta, o nom d'una taula o vista (`taula`, `esquema.taula`), que s'exporta sencera.
+        path : str
+            Fitxer de sortida. Si l'exportació falla, s'esborra.
+        format : str
+            'parquet' (cal pyarrow) o 'csv'.
+        batch_size : int, opcional
+            Files per lot i per viatge d'anada i tornada. Vegeu `stream`.
+        binds : list, tuple o dict, opcional
+            Valors de les variables d'enllaç.
+        compression : str, opcional
+            En Parquet, 'snappy' (per defecte), 'zstd', 'gzip', 'lz4', 'brotli' o 'none'. En CSV, 'gzip', 'bz2' o
+            'xz'; per defecte es dedueix de l'extensió del fitxer.
+        row_group_size : int, opcional
+            Files per grup de files en Parquet. Per defecte, les que ocupen aproximadament 64 MB sense comprimir.
+        threaded : bool
+            Si és True, el fitxer s'escriu en un altre fil mentre es llegeixen els lots següents.
+        queue_size : int
+            Lots que poden esperar entre la lectura i l'escriptura (només amb `threaded`).
+        fetch_lobs : bool, opcional
+            Vegeu `stream`. Amb localitzadors, cada LOB es llegeix just abans d'escriure'l.
+        **csv_options :
+            En CSV, `header` (per defecte True) i els arguments de `csv.writer` (`delimiter`, `quoting`, ...).
+
+        Retorna:
+        --------
+        dict
+            Files (`rows`) i lots (`batches`) exportats, grups de files (`row_groups`, en Parquet), mida del fitxer
+            (`bytes`), segons totals (`elapsed`) i d'escriptura (`write_time`) i files per segon
+            (`rows_per_second`).
+        """
+        format = format.lower()
+        if format not in FORMATS:
+            raise ValueError(f"Format '{format}' no vàlid. Ha de ser un de {list(FORMATS)}")
+        if csv_options and format != 'csv':
+            raise TypeError(f"Arguments no vàlids per a {format}: {', '.join(csv_options)}")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size ha de ser positiu")
+        if self.conn is None:
+            raise RuntimeError("La sessió Oracle no està oberta")
+
+        sql = _export_query(query_or_table)
+        with self._pooled_cursor() as curs:
+            batch_size = self._execute_query(curs, sql, binds, batch_size, fetch_lobs)
+            writer = _export_writer(path, format, curs.description, batch_size, compression, row_group_size,
+                                    csv_options)
+            try:
+                try:
+                    batches = read_lobs(_fetch_batches(curs, batch_size), curs.description)
+                    stats = write_batches(batches, writer, threaded=threaded, queue_size=queue_size)
+                finally:
+                    writer.close()
+            except BaseException:
+                _remove_quietly(path)
+                raise
+
+        if format == 'parquet':
+            stats['row_groups'] = writer.row_groups
+        stats['bytes'] = os.path.getsize(path)
+        stats['rows_per_second'] = stats['rows'] / stats['elapsed'] if stats['elapsed'] else 0.0
+        logging.debug(f"Exported {stats['rows']} rows to {path} in {stats['elapsed']:.3f} s")
+        return stats
+
+    def chunk_ranges(self, table: str, chunks: int = 8, by: str = 'rowid', owner: Optional[str] = None,
+                     chunk_size: Optional[int] = None) -> List[tuple]:
+        """
+        Divideix una taula en rangs per processar-la en paral·lel.
+
+        Paràmetres:
+        -----------
+        table : str
+            Nom de la taula.
+        chunks : int
+            Nombre aproximat de rangs.
+        by : str
+            'rowid' per dividir-la en rangs de ROWID amb `DBMS_PARALLEL_EXECUTE`, o el nom d'una columna per
+            dividir-ne els valors diferents (les files amb la columna a NULL queden fora).
+        owner : str, opcional
+            Propietari de la taula (només per a 'rowid').
+        chunk_size : int, opcional
+            Blocs per rang (només per a 'rowid'). Té prioritat sobre `chunks`.
+
+        Retorna:
+        --------
+        list
+            Parelles (inici, final) de cada rang, ambdós inclosos.
+
+        Els procediments de `DBMS_PARALLEL_EXECUTE` fan commit implícit. Per no confirmar la transacció pendent de la
+        connexió, amb 'rowid' s'executen en una altra sessió: una del pool o, si no n'hi ha, una de temporal.
+        """
+        with self._pooled_cursor() as curs:
+            if by.lower() != 'rowid':
+                return key_chunks(curs, table if owner is None else f"{owner}.{table}", by, chunks)
+            if owner is None:
+                owner = curs.execute("SELECT sys_context('USERENV', 'CURRENT_SCHEMA') FROM dual").fetchone()[0]
+
+        with self._chunk_sessions(1) as (acquire, release):
+            conn = acquire()
+            try:
+                with conn.cursor() as curs:
+                    return rowid_chunks(curs, table, chunks, owner=owner, chunk_size=chunk_size)
+            finally:
+                release(conn)
+
+    @contextmanager
+    def _chunk_sessions(self, workers: int):
+        """
+        Funcions (acquire, release) per obtenir sessions per als rangs: les del pool de la connexió o, si no n'hi
+        ha, les d'un pool temporal de `workers` sessions pel mateix túnel.
+        """
+        if self._pool_params is not None:
+            yield self.acquire, self.release
+            return
+
+        size = workers
+        if self._load_balance is not None:
+            # BalancedPool crea un pool per listener amb aquests paràmetres: es reparteixen les sessions entre tots
+            endpoints = len(self._load_balance['endpoints'])
+            size = -(-workers // endpoints)
+        pool = self._new_pool(min=1, max=size, increment=1, **self._con_params)
+        try:
+            yield pool.acquire, pool.release
+        finally:
+            pool.close(force=True)
+
+    def parallel_execute(self, sql: str, table: Optional[str] = None, chunks: int = 8, by: str = 'rowid',
+                         workers: Optional[int] = None, binds: Optional[Dict[str, Any]] = None, commit: bool = True,
+                         ranges: Optional[List[tuple]] = None) -> List[Dict[str, Any]]:
+        """
+        Executa una sentència DML per rangs d'una taula, cada rang en una sessió diferent.
+
+            estat = db.parallel_execute(
+                "UPDATE vendes SET iva = import * 0.21 WHERE rowid BETWEEN :start_id AND :end_id",
+                table="vendes", chunks=16, workers=4)
+
+        Paràmetres:
+        -----------
+        sql : str
+            Sentència amb les variables d'enllaç `:start_id` i `:end_id`.
+        table, chunks, by :
+            Taula i manera de dividir-la. Vegeu `chunk_ranges`.
+        workers : int, opcional
+            Sessions simultànies. Per defecte, la mida màxima del pool de la connexió o `min(chunks, 8)`.
+        binds : dict, opcional
+            Altres variables d'enllaç de la sentència.
+        commit : bool
+            Si és True, cada rang fa commit en acabar. Els rangs que fallen fan rollback. Si és False, és una prova
+            en sec: cada rang es fa en una sessió a part i en acaba desfent els canvis, de manera que `rows` diu
+            quantes files s'haurien modificat però no queda res per confirmar amb `commit`.
+        ranges : list, opcional
+            Rangs ja calculats. Si s'indiquen, no cal `table`.
+
+        Retorna:
+        --------
+        list
+            L'estat de cada rang: `chunk`, `start`, `end`, `rows` (files afectades), `elapsed` i `error`.
+        """
+        return self._run_chunks(sql, table, chunks, by, workers, binds, ranges, query=False, commit=commit)
+
+    def parallel_query(self, sql: str, table: Optional[str] = None, chunks: int = 8, by: str = 'rowid',
+                       workers: Optional[int] = None, binds: Optional[Dict[str, Any]] = None,
+                       ranges: Optional[List[tuple]] = None) -> List[Any]:
+        """
+        Executa una consulta per rangs d'una taula, cada rang en una sessió diferent, i n'ajunta les files en
+        l'ordre dels rangs. Els paràmetres són els de `parallel_execute`.
+
+            files = db.parallel_query("SELECT * FROM vendes WHERE rowid BETWEEN :start_id AND :end_id",
+                                      table="vendes", chunks=16, workers=4)
+
+        Retorna:
+        --------
+        list
+            Les files de tots els rangs. Si algun rang falla, llença RuntimeError.
+        """
+        status = self._run_chunks(sql, table, chunks, by, workers, binds, ranges, query=True, commit=False)
+        errors = [st for st in status if st['error'] is not None]
+        if errors:
+            raise RuntimeError(f"Han fallat {len(errors)} de {len(status)} rangs: {errors[0]['error']}")
+        return [row for st in status for row in st['result']]
+
+    def _run_chunks(self, sql, table, chunks, by, workers, binds, ranges, query, commit):
+        if ranges is None:
+            if table is None:
+                raise ValueError("Cal indicar `table` o `ranges`")
+            ranges = self.chunk_ranges(table, chunks, by)
+        if not ranges:
+            return []
+
+        if workers is None:
+            workers = self._pool.max if self._pool is not None else min(len(ranges), 8)
+        start = time.perf_counter()
+        with self._chunk_sessions(workers) as (acquire, release):
+            status = run_chunks(acquire, release, sql, ranges, workers, binds=binds, query=query, commit=commit)
+        # Les sessions dels rangs no són la de la connexió: avisem nosaltres els listeners
+        for listener in list(self._listeners):
+            listener(sql, binds, time.perf_counter() - start)
+        return status
+
+    def cached_query(self, sql: str, binds: Any = None, ttl: Optional[float] = None,
+                     tables: Optional[List[str]] = None) -> List[Any]:
+        """
+        Executa una consulta i en retorna totes les files, fent servir la memòria cau de resultats si la connexió
+        s'ha creat amb `result_cache`. Les consultes repetides (mateixa sentència, llevat dels espais, i mateixos
+        valors d'enllaç) no arriben al servidor mentre l'entrada sigui vàlida.
+
+        Les entrades es descarten en caducar, quan aquesta mateixa connexió executa DML sobre alguna de les seves
+        taules (o un bloc PL/SQL) i amb `invalidate_cache`. Els canvis fets per altres sessions només es veuen en
+        caducar l'entrada.
+
+        Paràmetres:
+        -----------
+        sql : str
+            Consulta.
+        binds : list, tuple o dict, opcional
+            Valors de les variables d'enllaç.
+        ttl : float, opcional
+            Temps de vida de l'entrada, en segons. Per defecte, el de la memòria cau.
+        tables : list de str, opcional
+            Taules de les quals depèn el resultat. Per defecte, les que apareixen després de FROM i JOIN.
+
+        Retorna:
+        --------
+        list
+            Les files del resultat.
+        """
+        if self._result_cache is None:
+            with self._pooled_cursor() as curs:
+                return curs.execute(sql, binds if binds is not None else []).fetchall()
+
+        key = ResultCache.key(sql, binds)
+        hit, rows = self._result_cache.get(key)
+        if hit:
+            return list(rows)
+
+        with self._pooled_cursor() as curs:
+            rows = curs.execute(sql, binds if binds is not None else []).fetchall()
+        self._result_cache.put(key, rows, tables if tables is not None else query_tables(sql), ttl=ttl)
+        return list(rows)
+
+    def invalidate_cache(self, *tables: str) -> int:
+        """
+        Descarta les entrades de la memòria cau de resultats que depenen de les taules indicades, o totes si no se
+        n'indica cap. Retorna el nombre d'entrades descartades.
+        """
+        return self._result_cache.invalidate(*tables) if self._result_cache is not None else 0
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Retorna les estadístiques de la memòria cau de resultats: `hits`, `misses`, `hit_ratio`, `entries`,
+        `evictions`, `expirations` i `invalidations`.
+        """
+        return self._result_cache.stats() if self._result_cache is not None else {}
+
+    def literal_stats(self, n: int = 10) -> Dict[str, Any]:
+        """
+        Retorna l'efecte de `bind_literals`: sentències vistes (`statements`), normalitzades (`normalized`) i
+        deixades tal qual (`skipped`), literals substituïts (`literals`), formes normalitzades diferents (`forms`),
+        variants de text que s'hi han reduït (`variants`) i, a `top`, les `n` formes amb més variants. Buit si
+        `bind_literals` no està activat.
+        """
+        if self._normalizer is None:
+            return {}
+        return {**self._normalizer.stats(), 'top': self._normalizer.top(n)}
+
+    def table_info(self, table: str, owner: Optional[str] = None) -> Optional[TableInfo]:
+        """
+        Descripció d'una taula o vista: columnes (tipus, mida, precisió, escala i nul·litat), clau primària, claus
+        úniques i claus foranes. La primera consulta d'un esquema en carrega totes les taules amb una sola
+        consulta al diccionari de dades; les següents es responen des de memòria fins que passen `metadata_ttl`
+        segons o s'executa una sentència DDL sobre l'esquema amb aquesta connexió.
+
+            info = db.table_info("espectacles.recintes")
+            print(info.primary_key, info["nom"].char_length)
+
+        Paràmetres:
+        -----------
+        table : str
+            Nom de la taula (pot incloure l'esquema). Els noms sense cometes es passen a majúscules.
+        owner : str, opcional
+            Esquema. Per defecte, el de `table` o el de la sessió.
+
+        Retorna:
+        --------
+        oracle_metadata.TableInfo
+            La descripció, o None si la taula no existeix o no s'hi té accés.
+        """
+        if self._metadata is None:
+            self._metadata = MetadataCache(self._metadata_ttl)
+            self._listeners.append(self._invalidate_metadata_on_ddl)
+        return self._metadata.table(self._pooled_cursor, table, owner)
+
+    def invalidate_metadata(self, owner: Optional[str] = None) -> None:
+        """Fa que `table_info` torni a llegir el diccionari de dades de l'esquema `owner` (o de tots)."""
+        if self._metadata is not None:
+            self._metadata.invalidate(owner)
+
+    def metadata_stats(self) -> Dict[str, Any]:
+        """Consultes de `table_info` resoltes des de memòria (`hits`), esquemes carregats (`loads`), ..."""
+        return self._metadata.stats() if self._metadata is not None else {}
+
+    def _invalidate_metadata_on_ddl(self, statement: str, parameters: Any, elapsed: float) -> None:
+        self._metadata.invalidate_ddl(statement)
+
+    def _invalidate_on_dml(self, statement: str, parameters: Any, elapsed: float) -> None:
+        tables = dml_tables(statement)
+        if tables is None:
+            self._result_cache.invalidate()
+        elif tables:
+            self._result_cache.invalidate(*tables)
+
+    @contextmanager
+    def pipeline(self, continue_on_error: bool = False):
+        """
+        Context on s'encuen sentències independents per executar-les totes juntes en sortir, amb el mínim de
+        viatges d'anada i tornada pel túnel.
+
+            with db.pipeline() as p:
+                for fila in files:
+                    p.execute("INSERT INTO log (id, text) VALUES (:1, :2)", fila)
+                total = p.fetchone("SELECT count(*) FROM log")
+                p.commit()
+            print(total.rows[0])
+
+        Les connexions síncrones d'oracledb no tenen `run_pipeline`: les DML consecutives i els commits que les
+        segueixen s'envien en un sol bloc PL/SQL anònim i la resta d'operacions una a una. Vegeu
+        `oracle_pipeline.StatementPipeline`.
+
+        Paràmetres:
+        -----------
+        continue_on_error : bool
+            Si és True, un error no atura la resta d'operacions i queda a l'atribut `error` del seu resultat.
+
+        Retorna:
+        --------
+        StatementPipeline
+            On s'afegeixen les operacions. Cada mètode retorna un `PipelineResult` que s'omple en sortir.
+        """
+        p = StatementPipeline(continue_on_error)
+        yield p
+        if not len(p):
+            return
+        if self.conn is None:
+            raise RuntimeError("La sessió Oracle no està oberta")
+
+        p.run_fallback(self._pooled_cursor, self.conn.commit)
+
+    def enable_profiling(self, server_stats: bool = False, callback: Optional[Callable] = None,
+                         max_statements: int = 1000, recent: int = 1000) -> StatementProfiler:
+        """
+        Activa el perfilat de les sentències executades amb els cursors de `cursor()` (i els de la resta de mètodes
+        de la connexió).
+
+            prof = db.enable_profiling(callback=lambda r: print(r.sql_id, r.elapsed))
+            ...
+            print(db.profile_report(10))
+
+        Paràmetres:
+        -----------
+        server_stats : bool
+            Si és True, afegeix a cada registre la diferència de les estadístiques de la sessió a `v$mystat`
+            (parse, execucions, lectures lògiques, DB time, viatges i bytes de SQL*Net). Costa dos viatges més per
+            sentència.
+        callback : callable, opcional
+            Funció que rep cada `StatementRecord`.
+        max_statements, recent :
+            Vegeu `oracle_profiler.StatementProfiler`.
+
+        Retorna:
+        --------
+        StatementProfiler
+        """
+        self._profiler = StatementProfiler(server_stats=server_stats, max_statements=max_statements, recent=recent)
+        if callback is not None:
+            self._profiler.add_callback(callback)
+        if self._cursors is not None:
+            self._cursors.profiler = self._profiler
+        return self._profiler
+
+    def disable_profiling(self) -> None:
+        """Desactiva el perfilat. Els cursors tornen a no fer cap feina addicional."""
+        self._profiler = None
+        if self._cursors is not None:
+            self._cursors.profiler = None
+
+    @property
+    def profiler(self) -> Optional[StatementProfiler]:
+        """El `StatementProfiler` actiu o None."""
+        return self._profiler
+
+    def profile_report(self, n: int = 10, by: str = 'elapsed') -> str:
+        """
+        Rànquing de les `n` sentències amb més `by` (per defecte, temps total). Vegeu `StatementProfiler.top`.
+        """
+        if self._profiler is None:
+            return "El perfilat no està activat"
+        return self._profiler.report(n, by)
+
+    def explain(self, sql: str, binds: Any = None) -> ExecutionPlan:
+        """
+        Pla d'execució d'una sentència, amb el cost, la cardinalitat, els predicats i el camí d'accés de cada pas.
+
+            pla = db.explain("SELECT * FROM vendes WHERE client = :1", [42])
+            print(pla)
+            assert "INDEX RANGE SCAN VENDES_CLIENT_IX" in pla.access_paths()
+
+        Sense `binds`, és el pla estimat d'`EXPLAIN PLAN` i la sentència no s'executa. Amb `binds`, si és una
+        consulta s'executa (només se'n llegeix una fila) i es retorna el pla que el servidor ha triat amb aquests
+        valors; les DML es continuen explicant amb `EXPLAIN PLAN`, que no en mira els valors.
+
+        `EXPLAIN PLAN` escriu a `PLAN_TABLE` i després se n'esborren les files sense fer commit: si la sessió no
+        tenia cap transacció oberta, en queda una (buida) fins al pròxim commit o rollback.
+
+        Retorna:
+        --------
+        oracle_plan.ExecutionPlan
+        """
+        with self._pooled_cursor() as curs:
+            if binds is None or not _QUERY.match(sql):
+                return explain_plan(curs.cursor, sql)
+            # Pel cursor d'oracledb: amb el perfilat, el cursor del pool consulta v$mystat abans i després de cada
+            # sentència i `last_statement` trobaria aquesta consulta en lloc de `sql`
+            raw = curs.cursor
+            raw.execute(sql, binds).fetchone()
+            return cursor_plan(raw, *last_statement(raw), format='TYPICAL')
+
+    def plan_statistics(self, sql: Optional[str] = None, binds: Any = None) -> ExecutionPlan:
+        """
+        Pla amb les estadístiques reals de cada pas (execucions, files, temps, lectures lògiques i físiques) de la
+        darrera execució.
+
+            pla = db.plan_statistics("SELECT * FROM vendes WHERE client = :1", [42])
+            assert not pla.misestimates(factor=100)
+
+        Paràmetres:
+        -----------
+        sql : str, opcional
+            Sentència que s'executa amb el hint `gather_plan_statistics` (les consultes es llegeixen senceres; les
+            DML s'executen sense fer commit). Si és None, es retorna el pla de la darrera sentència de la sessió,
+            que s'ha d'haver executat amb el hint o amb `statistics_level = ALL`.
+        binds : list, tuple o dict, opcional
+            Valors de les variables d'enllaç.
+
+        Retorna:
+        --------
+        oracle_plan.ExecutionPlan
+        """
+        with self._pooled_cursor() as curs:
+            raw = curs.cursor  # Vegeu `explain`
+            if sql is not None:
+                statement = add_hint(sql, "gather_plan_statistics")
+                start = time.perf_counter()
+                raw.execute(statement, binds if binds is not None else [])
+                if raw.description is not None:
+                    raw.arraysize = _STREAM_MAX_ROWS
+                    while raw.fetchmany():
+                        pass
+                self._cursors.executed(raw, statement, binds, time.perf_counter() - start)
+            return cursor_plan(raw, *last_statement(raw))
+
+    def monitor(self, sql_id: Optional[str] = None, report_type: str = 'TEXT') -> str:
+        """
+        Informe de SQL Monitor de la darrera execució monitoritzada de `sql_id` (o de la darrera sentència
+        monitoritzada, si és None). `report_type` pot ser 'TEXT', 'HTML', 'ACTIVE' o 'XML'. Les sentències es
+        monitoritzen si duren més de 5 segons, si són en paral·lel o si porten el hint `monitor`. Cal el Tuning Pack.
+
+        Per obtenir el SQL_ID d'un text, vegeu `oracle_profiler.sql_id`.
+        """
+        with self._pooled_cursor() as curs:
+            return monitor_report(curs, sql_id, report_type)
+
+    def stats_snapshot(self, scope: str = 'both') -> StatsSnapshot:
+        """
+        Context que mesura què costa al servidor un bloc de codi: pren una instantània de les estadístiques abans i
+        després del bloc (una consulta per instantània) i en calcula la diferència.
+
+            with db.stats_snapshot() as informe:
+                carrega_diaria(db)
+            print(informe)
+            print(informe['session logical reads'], informe['redo size'])
+
+        Paràmetres:
+        -----------
+        scope : str
+            'session' (`v$mystat` i `v$session_event`: només el que fa aquesta sessió), 'system' (`v$sysstat` i
+            `v$system_event`: tota la instància) o 'both'. Les vistes que l'usuari no pot llegir s'ometen amb un
+            avís; amb `mode='sysdba'` s'hi té accés a totes.
+
+        Retorna:
+        --------
+        oracle_stats.StatsSnapshot
+            En entrar al `with` retorna un `oracle_stats.StatsReport`, que s'omple en sortir-ne.
+        """
+        if scope not in SCOPES:
+            raise ValueError(f"scope '{scope}' no vàlid. Ha de ser un de {list(SCOPES)}")
+        if self._stats_sources is None:
+            with self._pooled_cursor() as curs:
+                self._stats_sources = accessible_sources(curs, SOURCES)
+        return StatsSnapshot(self._pooled_cursor, [s for s in SCOPES[scope] if s in self._stats_sources])
+
+    def open_lob(self, sql: str, binds: Any = None, chunk_size: Optional[int] = None) -> LobReader:
+        """
+        Executa una consulta que retorna un LOB (primera columna de la primera fila) i el retorna com un fitxer
+        que es llegeix per trossos, de manera que la memòria no creix amb la mida del LOB.
+
+            with db.open_lob("SELECT contingut FROM documents WHERE id = :1", [7]) as f:
+                with open("document.pdf", "wb") as out:
+                    for tros in f:
+                        out.write(tros)
+
+        Paràmetres:
+        -----------
+        sql : str
+            Consulta.
+        binds : list, tuple o dict, opcional
+            Valors de les variables d'enllaç.
+        chunk_size : int, opcional
+            Bytes (o caràcters) per lectura, arrodonits a un múltiple de la mida de tros del LOB. Per defecte, 16
+            trossos.
+
+        Retorna:
+        --------
+        oracle_lob.LobReader
+        """
+        with self._pooled_cursor() as curs:
+            row = curs.execute(sql, binds if binds is not None else [], fetch_lobs=True).fetchone()
+        if row is None:
+            raise ValueError("La consulta no ha retornat cap fila")
+        if row[0] is None:
+            raise ValueError("El LOB és NULL")
+        return LobReader(row[0], chunk_size)
+
+    def write_lob(self, sql: str, binds: Any, stream: Any, chunk_size: Optional[int] = None) -> int:
+        """
+        Escriu `stream` (un fitxer obert o qualsevol objecte amb `read`) al LOB que retorna la consulta, per trossos.
+        La consulta ha de bloquejar la fila (`FOR UPDATE`) i el LOB no pot ser NULL (cal inicialitzar-lo amb
+        `empty_blob()` o `empty_clob()`). No fa commit.
+
+            db.cursor().execute("INSERT INTO documents (id, contingut) VALUES (:1, empty_blob())", [7])
+            with open("document.pdf", "rb") as f:
+                db.write_lob("SELECT contingut FROM documents WHERE id = :1 FOR UPDATE", [7], f)
+            db.commit()
+
+        Retorna:
+        --------
+        int
+            Bytes (o caràcters) escrits.
+        """
+        with self._pooled_cursor() as curs:
+            row = curs.execute(sql, binds if binds is not None else [], fetch_lobs=True).fetchone()
+        if row is None or row[0] is None:
+            raise ValueError("La consulta no ha retornat cap LOB")
+        lob = row[0]
+        lob.trim()
+        return write_lob(lob, stream, chunk_size)
+
     def commit(self) -> None:
         """
         Fa un commit de la transacció actual.
@@ -198,12 +1672,11 @@ class oracleConnection(AbsConnection):
         bool
             True si la connexió és correcta, False en cas contrari.
         """
-        cur = self._cursor
-
         try:
-            res = cur.execute("""SELECT sys_context('USERENV','SESSION_USER')  as "CURRENT USER" ,
-                      sys_context('USERENV', 'CURRENT_SCHEMA') as "CURRENT SCHEMA"
-                      FROM dual""").fetchone()
+            with self._pooled_cursor() as cur:
+                res = cur.execute("""SELECT sys_context('USERENV','SESSION_USER')  as "CURRENT USER" ,
+                          sys_context('USERENV', 'CURRENT_SCHEMA') as "CURRENT SCHEMA"
+                          FROM dual""").fetchone()
 
             print("Current user: {}, Current schema: {}".format(res[0], res[1]))
             return True
@@ -223,39 +1696,106 @@ class oracleConnection(AbsConnection):
         self.open()
         return self.is_open
 
-    def showMessages(self) -> None:
+    def showMessages(self, num_lines: int = 1000) -> None:
         """
         Mostra els missatges de sortida de la base de dades Oracle.
 
+        Paràmetres:
+        -----------
+        num_lines : int
+            Línies que es demanen a cada viatge d'anada i tornada. Vegeu `iter_messages`.
+
         Retorna:
         --------
         None
         """
-        statusVar = self._cursor.var(NUMBER)
-        lineVar = self._cursor.var(STRING)
-        while True:
-            self._cursor.callproc("dbms_output.get_line", (lineVar, statusVar))
-            if statusVar.getvalue() != 0:
-                break
-            print(lineVar.getvalue())
+        for line in self.iter_messages(num_lines):
+            print(line)
+
+    def iter_messages(self, num_lines: int = 1000, line_size: int = 32767) -> Iterator[str]:
+        """
+        Llegeix els missatges de DBMS_OUTPUT de la sessió amb `dbms_output.get_lines`, `num_lines` línies per crida,
+        en lloc d'una crida a `dbms_output.get_line` per línia.
+
+        Paràmetres:
+        -----------
+        num_lines : int
+            Mida de l'array on es reben les línies.
+        line_size : int
+            Longitud màxima de cada línia.
+
+        Retorna:
+        --------
+        Iterador de les línies (les línies buides es retornen com a cadena buida).
+        """
+        if num_lines < 1:
+            raise ValueError("num_lines ha de ser positiu")
+
+        with self._pooled_cursor() as curs:
+            lines_var = curs.arrayvar(STRING, num_lines, line_size)
+            num_lines_var = curs.var(NUMBER)
+            while True:
+                num_lines_var.setvalue(0, num_lines)
+                curs.cursor.callproc("dbms_output.get_lines", (lines_var, num_lines_var))
+                fetched = int(num_lines_var.getvalue())
+                for line in lines_var.getvalue()[:fetched]:
+                    yield line if line is not None else ""
+                if fetched < num_lines:
+                    break
+
+    def get_messages(self, num_lines: int = 1000) -> List[str]:
+        """
+        Retorna en una llista els missatges de DBMS_OUTPUT de la sessió. Vegeu `iter_messages`.
+        """
+        return list(self.iter_messages(num_lines))
 
     @property
     def is_open(self) -> bool:
         """
         Retorna True si la connexió Oracle està oberta.
+
+        No fa cap viatge d'anada i tornada si el controlador considera la sessió sana i el servidor ha respost fa menys
+        de `liveness_interval` segons. Altrament fa un ping (vegeu `check_alive`).
         """
         if not hasattr(self, "conn") or self.conn is None:
             return False
 
         try:
-            return self.conn.ping() is None  # retorna None si la connexió és vàlida
+            if not self.conn.is_healthy():
+                return False
+        except Exception:
+            return False
+
+        last = max(self._last_alive, self._cursors.last_used if self._cursors is not None else 0.0)
+        if time.monotonic() - last < self._liveness_interval:
+            return True
+        return self.check_alive()
+
+    def check_alive(self) -> bool:
+        """
+        Comprova que la sessió està viva fent un ping al servidor, independentment de quan s'ha fet servir per
+        darrer cop.
+
+        Retorna:
+        --------
+        bool
+            True si el servidor ha respost.
+        """
+        if self.conn is None:
+            return False
+        try:
+            self.conn.ping()
         except Exception:
             return False
+        self._last_alive = time.monotonic()
+        return True
 
     @is_open.setter
     def is_open(self, valor: bool) -> None:
         # Setter buit per evitar errors en assignacions
         self._is_open = valor
+        if not valor:
+            self._last_alive = 0.0
 
 
 
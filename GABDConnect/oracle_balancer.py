@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Repartiment de sessions entre diversos listeners d'Oracle (nodes d'un RAC o rèpliques), típicament els forwards de
+`multiple_tunnels`. `ListenerBalancer` tria el listener de cada sessió nova (per torns o el que en té menys) i deixa
+de fer servir durant un temps els que fallen o el forward dels quals s'ha tancat. `BalancedPool` té un
+`oracledb.ConnectionPool` per listener i la mateixa interfície que un pool, de manera que `acquire` reparteix les
+sessions entre nodes.
+
+Si es prefereix que ho faci el controlador, `connect_descriptor` construeix un descriptor amb `LOAD_BALANCE` i
+`FAILOVER` amb totes les adreces.
+"""
+
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import oracledb
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROUND_ROBIN = 'round_robin'
+LEAST_CONNECTIONS = 'least_connections'
+POLICIES = (ROUND_ROBIN, LEAST_CONNECTIONS)
+
+Endpoint = Tuple[str, int]
+
+# Errors del pool d'un listener que no té cap sessió lliure (amb els getmode 'nowait' o 'timedwait', o el límit de
+# sessions del mode thick). El listener funciona: no s'ha de treure de la rotació.
+_POOL_EXHAUSTED = {'DPY-4005', 'ORA-24418', 'ORA-24459', 'ORA-24496'}
+
+
+def _pool_exhausted(error: Exception) -> bool:
+    return str(error).split(':', 1)[0].strip() in _POOL_EXHAUSTED
+
+
+def parse_endpoint(value: Union[str, int, Sequence[Any]]) -> Endpoint:
+    """Converteix `"host:port"`, `(host, port)` o un port local en una parella (host, port)."""
+    if isinstance(value, int):
+        return 'localhost', value
+    if isinstance(value, str):
+        host, _, port = value.rpartition(':')
+        if not host:
+            return 'localhost', int(port)
+        return host, int(port)
+    host, port = value
+    return str(host), int(port)
+
+
+def connect_descriptor(endpoints: Sequence[Endpoint], service_name: str, load_balance: bool = True,
+                       failover: bool = True) -> str:
+    """
+    Descriptor de connexió amb una adreça per listener. Amb `LOAD_BALANCE=ON` el controlador tria una adreça a
+    l'atzar per a cada sessió nova i amb `FAILOVER=ON` prova la següent si no pot connectar.
+    """
+    addresses = "".join(f"(ADDRESS=(PROTOCOL=TCP)(HOST={host})(PORT={port}))" for host, port in endpoints)
+    return (f"(DESCRIPTION=(LOAD_BALANCE={'ON' if load_balance else 'OFF'})(FAILOVER={'ON' if failover else 'OFF'})"
+            f"(ADDRESS_LIST={addresses})(CONNECT_DATA=(SERVICE_NAME={service_name})))")
+
+
+class ListenerBalancer:
+    """
+    Tria el listener de cada sessió nova (segur entre fils).
+    """
+
+    def __init__(self, endpoints: Sequence[Union[str, int, Sequence[Any]]], policy: str = ROUND_ROBIN,
+                 retry_after: float = 30.0, health: Optional[Callable[[Endpoint], bool]] = None,
+                 load: Optional[Callable[[Endpoint], int]] = None):
+        """
+        Paràmetres:
+        -----------
+        endpoints : list
+            Listeners: `"host:port"`, `(host, port)` o ports locals.
+        policy : str
+            'round_robin' (per torns) o 'least_connections' (el que té menys sessions obertes).
+        retry_after : float
+            Segons que un listener queda fora de la rotació després d'un error de connexió.
+        health : callable, opcional
+            Funció que diu si un listener és utilitzable (p. ex. si el seu forward del túnel és obert).
+        load : callable, opcional
+            Sessions obertes a un listener. Per defecte, les comptades amb `acquired` i `released`.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Política '{policy}' no vàlida. Ha de ser una de {list(POLICIES)}")
+        self.endpoints: List[Endpoint] = [parse_endpoint(e) for e in endpoints]
+        if not self.endpoints:
+            raise ValueError("Cal almenys un listener")
+        self.policy = policy
+        self.retry_after = retry_after
+        self.health = health
+        self.load = load
+        self._next = 0
+        self._down: Dict[Endpoint, float] = {}
+        self._stats = {e: {'sessions': 0, 'active': 0, 'failures': 0} for e in self.endpoints}
+        self._lock = threading.Lock()
+
+    def _healthy(self, endpoint: Endpoint) -> bool:
+        if self.health is None:
+            return True
+        try:
+            return bool(self.health(endpoint))
+        except Exception as e:
+            logger.debug(f"Health check of {endpoint} failed: {e}")
+            return False
+
+    def _load(self, endpoint: Endpoint) -> int:
+        return self.load(endpoint) if self.load is not None else self._stats[endpoint]['active']
+
+    def available(self) -> List[Endpoint]:
+        """Listeners que no han fallat recentment i passen la comprovació de salut."""
+        now = time.monotonic()
+        with self._lock:
+            for e in [e for e, until in self._down.items() if until <= now]:
+                del self._down[e]
+            candidates = [e for e in self.endpoints if e not in self._down]
+        return [e for e in candidates if self._healthy(e)]
+
+    def candidates(self) -> List[Endpoint]:
+        """
+        Listeners per ordre de preferència segons la política. Si no n'hi ha cap de disponible, tots, començant pel
+        que fa més que ha fallat.
+        """
+        available = self.available()
+        if not available:
+            with self._lock:
+                return sorted(self.endpoints, key=lambda e: self._down.get(e, 0.0))
+        with self._lock:
+            start = self._next % len(available)
+            self._next += 1
+        ordered = available[start:] + available[:start]
+        if self.policy == LEAST_CONNECTIONS:
+            ordered.sort(key=self._load)
+        return ordered
+
+    def choose(self) -> Endpoint:
+        return self.candidates()[0]
+
+    def acquired(self, endpoint: Endpoint) -> None:
+        with self._lock:
+            self._stats[endpoint]['sessions'] += 1
+            self._stats[endpoint]['active'] += 1
+
+    def released(self, endpoint: Endpoint) -> None:
+        with self._lock:
+            self._stats[endpoint]['active'] = max(0, self._stats[endpoint]['active'] - 1)
+
+    def failed(self, endpoint: Endpoint) -> None:
+        """Treu el listener de la rotació durant `retry_after` segons."""
+        with self._lock:
+            self._stats[endpoint]['failures'] += 1
+            self._down[endpoint] = time.monotonic() + self.retry_after
+        logger.warning(f"Listener {endpoint[0]}:{endpoint[1]} unavailable, skipping it for {self.retry_after} s")
+
+    def connect(self, factory: Callable[[Endpoint], Any]) -> Tuple[Any, Endpoint]:
+        """
+        Obre una sessió amb `factory(endpoint)` provant els listeners per ordre de preferència fins que un respon.
+        Un listener que no respon es treu de la rotació (vegeu `failed`); si el que falla és que el seu pool no té
+        cap sessió lliure, es prova el següent sense treure'l.
+
+        Retorna:
+        --------
+        tuple
+            (sessió, listener).
+        """
+        error = None
+        for endpoint in self.candidates():
+            try:
+                conn = factory(endpoint)
+            except oracledb.DatabaseError as e:
+                if not _pool_exhausted(e):
+                    self.failed(endpoint)
+                error = e
+                continue
+            self.acquired(endpoint)
+            return conn, endpoint
+        raise error
+
+    def stats(self) -> Dict[str, Any]:
+        """Política i, per listener, sessions obertes en total, actives, errors i si és fora de la rotació."""
+        now = time.monotonic()
+        with self._lock:
+            listeners = {f"{h}:{p}": {**st, 'down': self._down.get((h, p), 0.0) > now, 'load': None}
+                         for (h, p), st in self._stats.items()}
+        for (h, p) in self.endpoints:
+            listeners[f"{h}:{p}"]['load'] = self._load((h, p))
+        return {'policy': self.policy, 'listeners': listeners}
+
+
+class BalancedPool:
+    """
+    Un `oracledb.ConnectionPool` per listener, creat en el primer `acquire` que el tria, amb la interfície de pool
+    que fa servir `oracleConnection` (`acquire`, `release`, `close`, `opened`, `busy`, `min`, `max` i
+    `increment`). Els paràmetres del pool (`min`, `max`, ...) s'apliquen a cada listener.
+    """
+
+    def __init__(self, balancer: ListenerBalancer, dsn: Callable[[Endpoint], str], **pool_kwargs):
+        """
+        Paràmetres:
+        -----------
+        balancer : ListenerBalancer
+            Tria el listener de cada sessió. Si no té `load`, es fa servir el nombre de sessions ocupades de cada pool.
+        dsn : callable
+            Funció que retorna el DSN d'un listener.
+        **pool_kwargs :
+            Arguments de `oracledb.create_pool`.
+        """
+        self.balancer = balancer
+        self.pools: Dict[Endpoint, oracledb.ConnectionPool] = {}
+        self._dsn = dsn
+        self._pool_kwargs = pool_kwargs
+        self._owner: "weakref.WeakKeyDictionary[Any, Endpoint]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        if balancer.load is None:
+            balancer.load = self._busy
+
+    def _busy(self, endpoint: Endpoint) -> int:
+        pool = self.pools.get(endpoint)
+        return pool.busy if pool is not None else 0
+
+    def _pool(self, endpoint: Endpoint) -> oracledb.ConnectionPool:
+        with self._lock:
+            pool = self.pools.get(endpoint)
+            if pool is None:
+                pool = self.pools[endpoint] = oracledb.create_pool(self._dsn(endpoint), **self._pool_kwargs)
+            return pool
+
+    def acquire(self):
+        conn, endpoint = self.balancer.connect(lambda e: self._pool(e).acquire())
+        self._owner[conn] = endpoint
+        return conn
+
+    def release(self, conn) -> None:
+        endpoint = self._owner.pop(conn)
+        self.balancer.released(endpoint)
+        self.pools[endpoint].release(conn)
+
+    def close(self, force: bool = False) -> None:
+        with self._lock:
+            pools, self.pools = list(self.pools.values()), {}
+        for pool in pools:
+            pool.close(force=force)
+
+    @property
+    def opened(self) -> int:
+        return sum(pool.opened for pool in list(self.pools.values()))
+
+    @property
+    def busy(self) -> int:
+        return sum(pool.busy for pool in list(self.pools.values()))
+
+    @property
+    def min(self) -> int:
+        return self._pool_kwargs.get('min', 1) * len(self.balancer.endpoints)
+
+    @property
+    def max(self) -> int:
+        return self._pool_kwargs.get('max', 2) * len(self.balancer.endpoints)
+
+    @property
+    def increment(self) -> int:
+        return self._pool_kwargs.get('increment', 1)
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Conversió dels literals de les sentències en variables d'enllaç. Les sentències construïdes amb f-strings
+(`f"SELECT * FROM t WHERE id = {i}"`) són textos diferents per al servidor, i cadascun és un *hard parse* i un cursor
+nou a la memòria compartida. `LiteralNormalizer` reescriu `WHERE id = 42` com `WHERE id = :lit1` amb `{'lit1': 42}`,
+de manera que totes les variants comparteixen un sol cursor al servidor i a la memòria cau de sentències del
+controlador.
+
+Només es tracten consultes i DML (no blocs PL/SQL ni DDL), i es deixen tal qual els literals on una variable
+d'enllaç canviaria el significat o no és permesa: la llista del SELECT, ORDER BY i GROUP BY (`ORDER BY 1`), la
+clàusula FROM (`SAMPLE (10)`), PIVOT, els literals de data i interval (`DATE '2024-01-01'`), les mides de tipus
+(`CAST(x AS VARCHAR2(10))`), els que segueixen WAIT i LIMIT, els comentaris i hints, i els arguments de les funcions
+excloses.
+"""
+
+import decimal
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_TOKENS = re.compile(r"""
+    (?P<qstring>[nN]?[qQ]'(?:\[.*?\]|\{.*?\}|\(.*?\)|<.*?>|(?P<qd>.).*?(?P=qd))')
+  | (?P<string>(?P<nat>[nN])?'(?:[^']|'')*')
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<ident>"[^"]*")
+  | (?P<bind>:(?:\w+|"[^"]*"))
+  | (?P<number>(?<![\w$#.])(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?(?P<suffix>[fFdD])?(?![\w$#]))
+  | (?P<word>[A-Za-z_][\w$#]*)
+  | (?P<open>\()
+  | (?P<close>\))
+  | (?P<other>\S)
+""", re.VERBOSE | re.DOTALL)
+
+_STATEMENTS = {'SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'MERGE'}
+
+# Paraules que comencen una clàusula. En les de `_KEEP_CLAUSES` els literals es deixen tal qual.
+_CLAUSES = {'SELECT', 'FROM', 'WHERE', 'GROUP', 'HAVING', 'ORDER', 'VALUES', 'SET', 'INTO', 'ON', 'USING', 'CONNECT',
+            'START', 'FETCH', 'OFFSET', 'PIVOT', 'UNPIVOT', 'MODEL', 'RETURNING', 'PARTITION', 'WITH'}
+_KEEP_CLAUSES = {'SELECT', 'FROM', 'GROUP', 'ORDER', 'PIVOT', 'UNPIVOT', 'MODEL', 'RETURNING', 'PARTITION', 'WITH',
+                 None}
+
+# Paraules després de les quals un literal de text forma part d'un literal de data o interval
+_TYPED_LITERALS = {'DATE', 'TIMESTAMP', 'INTERVAL'}
+
+# Tipus amb mida o precisió entre parèntesis: els seus arguments no poden ser variables
+_TYPE_NAMES = {'VARCHAR2', 'NVARCHAR2', 'VARCHAR', 'CHAR', 'NCHAR', 'NUMBER', 'FLOAT', 'RAW', 'TIMESTAMP',
+               'INTERVAL', 'DECIMAL', 'NUMERIC', 'UROWID'}
+
+# Paraules després de les quals un literal ha de ser una constant (`FOR UPDATE WAIT 5`, `REJECT LIMIT 10`)
+_CONSTANT_AFTER = {'WAIT', 'LIMIT'}
+
+# Funcions que per defecte conserven els literals: les màscares de format i les unitats de TRUNC i ROUND solen
+# formar part d'índexs basats en funcions, que amb una variable deixarien de fer-se servir, i els camins de JSON i
+# XQuery han de ser literals (ORA-40454).
+DEFAULT_EXCLUDE = ('TO_CHAR', 'TO_DATE', 'TO_TIMESTAMP', 'TO_NUMBER', 'TRUNC', 'ROUND', 'JSON_VALUE', 'JSON_QUERY',
+                   'JSON_EXISTS', 'JSON_TABLE', 'XMLQUERY', 'XMLTABLE')
+
+_KEEP = '\0'
+
+
+def _value(token: str, kind: str) -> Any:
+    if kind == 'string':
+        return token[1:-1].replace("''", "'")
+    if re.fullmatch(r"\d+", token):
+        return int(token)
+    return decimal.Decimal(token)
+
+
+def _is_statement(tokens) -> bool:
+    """Si la sentència és una consulta o una DML (la primera paraula és una de `_STATEMENTS`)."""
+    first = next((t for t in tokens if t.lastgroup in ('word', 'open', 'other')), None)
+    return first is not None and first.lastgroup == 'word' and first.group().upper() in _STATEMENTS
+
+
+def _keep_literal(token, clause: Optional[str], prev: Optional[str]) -> bool:
+    """Si el literal `token` s'ha de deixar tal qual, segons la clàusula on és i la paraula que el precedeix."""
+    if clause in _KEEP_CLAUSES or clause == _KEEP or prev in _CONSTANT_AFTER:
+        return True
+    if token.lastgroup == 'string':
+        return bool(token.group('nat')) or prev in _TYPED_LITERALS
+    return bool(token.group('suffix'))
+
+
+def _next_name(prefix: str, n: int, used) -> Tuple[int, str]:
+    """Següent nom de variable `prefix<n>` que no és a la sentència."""
+    n += 1
+    while f"{prefix}{n}".lower() in used:
+        n += 1
+    return n, f"{prefix}{n}"
+
+
+def lift_literals(sql: str, exclude: Iterable[str] = DEFAULT_EXCLUDE,
+                  prefix: str = "lit") -> Tuple[str, Dict[str, Any]]:
+    """
+    Substitueix els literals de text i numèrics d'una consulta o DML per variables d'enllaç amb nom.
+
+        lift_literals("SELECT nom FROM t WHERE id = 42 AND estat = 'A'")
+        # ("SELECT nom FROM t WHERE id = :lit1 AND estat = :lit2", {'lit1': 42, 'lit2': 'A'})
+
+    Paràmetres:
+    -----------
+    sql : str
+        Sentència.
+    exclude : iterable de str
+        Funcions els arguments de les quals no es toquen.
+    prefix : str
+        Prefix del nom de les variables noves.
+
+    Retorna:
+    --------
+    tuple
+        (sentència, valors de les variables noves). Si la sentència no és una consulta ni una DML, o no té
+        literals que es puguin substituir, es retorna tal qual amb un diccionari buit.
+    """
+    tokens = list(_TOKENS.finditer(sql))
+    if not _is_statement(tokens):
+        return sql, {}
+
+    exclude = {f.upper() for f in exclude}
+    used = {t.group()[1:].lower() for t in tokens if t.lastgroup == 'bind'}
+    stack: List[Optional[str]] = [None]
+    prev: Optional[str] = None
+    out: List[str] = []
+    binds: Dict[str, Any] = {}
+    pos = 0
+    n = 0
+
+    for t in tokens:
+        kind = t.lastgroup
+        if kind == 'comment':
+            continue
+        if kind == 'word':
+            word = t.group().upper()
+            if word in _CLAUSES:
+                stack[-1] = word
+            prev = word
+            continue
+        if kind == 'open':
+            stack.append(_KEEP if prev in exclude or prev in _TYPE_NAMES else stack[-1])
+        elif kind == 'close' and len(stack) > 1:
+            stack.pop()
+        elif kind in ('string', 'number') and not _keep_literal(t, stack[-1], prev):
+            n, name = _next_name(prefix, n, used)
+            binds[name] = _value(t.group(), kind)
+            out.append(sql[pos:t.start()])
+            out.append(f":{name}")
+            pos = t.end()
+        prev = None
+
+    if not binds:
+        return sql, {}
+    out.append(sql[pos:])
+    return "".join(out), binds
+
+
+class LiteralNormalizer:
+    """
+    Aplica `lift_literals` a les sentències que s'executen i compta quantes variants de text diferents es redueixen
+    a cada forma normalitzada (segur entre fils).
+    """
+
+    def __init__(self, exclude: Iterable[str] = DEFAULT_EXCLUDE, max_forms: int = 1000, max_variants: int = 10000):
+        """
+        Paràmetres:
+        -----------
+        exclude : iterable de str
+            Funcions els arguments de les quals no es toquen. Vegeu `DEFAULT_EXCLUDE`.
+        max_forms : int
+            Nombre màxim de formes normalitzades de les quals es guarden estadístiques (s'obliden les menys
+            recents).
+        max_variants : int
+            Nombre màxim de variants que es compten per forma.
+        """
+        self.exclude = tuple(exclude)
+        self.max_forms = max_forms
+        self.max_variants = max_variants
+        self._forms: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'statements': 0, 'normalized': 0, 'skipped': 0, 'literals': 0}
+
+    def normalize(self, statement: str, parameters: Any = None) -> Tuple[str, Any]:
+        """
+        Retorna la sentència i els valors d'enllaç que s'han d'executar. Les sentències amb variables posicionals
+        no es toquen, perquè no es poden barrejar amb variables amb nom.
+        """
+        if parameters is not None and not isinstance(parameters, dict) and len(parameters) > 0:
+            with self._lock:
+                self._stats['statements'] += 1
+                self._stats['skipped'] += 1
+            return statement, parameters
+
+        sql, binds = lift_literals(statement, self.exclude)
+        with self._lock:
+            self._stats['statements'] += 1
+            if not binds:
+                self._stats['skipped'] += 1
+                return statement, parameters
+            self._stats['normalized'] += 1
+            self._stats['literals'] += len(binds)
+            form = self._forms.get(sql)
+            if form is None:
+                form = self._forms[sql] = {'executions': 0, 'variants': set()}
+                while len(self._forms) > self.max_forms:
+                    self._forms.popitem(last=False)
+            else:
+                self._forms.move_to_end(sql)
+            form['executions'] += 1
+            if len(form['variants']) < self.max_variants:
+                form['variants'].add(hash(statement))
+        return sql, {**parameters, **binds} if parameters else binds
+
+    def top(self, n: int = 10) -> List[Dict[str, Any]]:
+        """Les `n` formes normalitzades amb més variants de text: `sql`, `executions` i `variants`."""
+        with self._lock:
+            forms = [{'sql': sql, 'executions': f['executions'], 'variants': len(f['variants'])}
+                     for sql, f in self._forms.items()]
+        return sorted(forms, key=lambda f: (f['variants'], f['executions']), reverse=True)[:n]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Sentències vistes, normalitzades i deixades tal qual, literals substituïts, formes diferents i variants de
+        text que s'hi han reduït.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['forms'] = len(self._forms)
+            stats['variants'] = sum(len(f['variants']) for f in self._forms.values())
+        return stats
+
+    def reset(self) -> None:
+        with self._lock:
+            self._forms.clear()
+            self._stats = dict.fromkeys(self._stats, 0)
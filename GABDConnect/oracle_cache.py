@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Memòria cau de resultats de consultes al client. `ResultCache` guarda les files de les consultes indexades per la
+sentència normalitzada i les variables d'enllaç, amb una mida màxima (LRU) i un temps de vida (TTL). Cada entrada
+recorda les taules de la consulta, de manera que es poden invalidar per taula, i `dml_tables` permet detectar quines
+taules modifica una sentència per invalidar-les automàticament.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+# Literals (q'[...]', '...') i identificadors entre cometes, que es conserven tal qual, o espais
+_WHITESPACE = re.compile(r"""((?<![\w$#])[nN]?[qQ]'(?:\[.*?\]|\{.*?\}|\(.*?\)|<.*?>|(\S).*?\2)'|'(?:[^']|'')*'|"[^"]*")"""
+                         r"|\s+", re.DOTALL)
+_IDENT = r'(?:"[^"]+"|[\w$#]+)(?:\s*\.\s*(?:"[^"]+"|[\w$#]+))?'
+_FROM = re.compile(r"\b(?:FROM|JOIN)\s+(" + _IDENT + r"(?:\s+(?!WHERE\b|GROUP\b|ORDER\b|CONNECT\b|START\b|HAVING\b|"
+                   r"UNION\b|INNER\b|LEFT\b|RIGHT\b|FULL\b|CROSS\b|JOIN\b|ON\b|FETCH\b)\w+)?"
+                   r"(?:\s*,\s*" + _IDENT + r"(?:\s+\w+)?)*)", re.IGNORECASE)
+_DML = re.compile(r"^\s*(?:INSERT\s+(?:ALL\s+)?INTO|UPDATE|DELETE(?:\s+FROM)?|MERGE\s+INTO|TRUNCATE\s+TABLE|"
+                  r"DROP\s+TABLE|ALTER\s+TABLE|LOCK\s+TABLE)\s+(" + _IDENT + ")", re.IGNORECASE)
+_INSERT_INTO = re.compile(r"\bINTO\s+(" + _IDENT + ")", re.IGNORECASE)
+_PLSQL = re.compile(r"^\s*(?:BEGIN|DECLARE|CALL)\b", re.IGNORECASE)
+_READ_ONLY = re.compile(r"^\s*(?:SELECT|WITH|COMMIT|SAVEPOINT)\b", re.IGNORECASE)
+# Cadenes (que es conserven) i comentaris o hints (que se substitueixen per un espai)
+_COMMENTS = re.compile(r"('(?:[^']|'')*')|--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+# Valor de retorn de `dml_tables` per a les sentències que poden modificar qualsevol taula (blocs PL/SQL)
+ALL_TABLES = None
+
+
+def normalize_sql(sql: str) -> str:
+    """Sentència sense espais sobrants (fora dels literals i identificadors entre cometes), per fer servir de clau."""
+    return _WHITESPACE.sub(lambda m: m.group(1) or " ", sql).strip().rstrip(";").rstrip()
+
+
+def _table_name(ident: str) -> str:
+    """
+    Nom de la taula (sense esquema ni cometes) en majúscules, que és com s'indexen les entrades. Com a molt fa que
+    s'invalidin entrades de més, mai de menys.
+    """
+    return ident.split(".")[-1].strip().strip('"').upper()
+
+
+def query_tables(sql: str) -> Set[str]:
+    """Taules que apareixen després de FROM o JOIN en una consulta."""
+    tables = set()
+    for match in _FROM.finditer(sql):
+        for item in match.group(1).split(","):
+            tables.add(_table_name(item.strip().split()[0]))
+    return tables
+
+
+def strip_comments(sql: str) -> str:
+    """Sentència sense comentaris ni hints (els literals de text es conserven)."""
+    return _COMMENTS.sub(lambda m: m.group(1) or " ", sql)
+
+
+def dml_tables(sql: str) -> Optional[Set[str]]:
+    """
+    Taules que modifica una sentència: un conjunt buit si és una consulta (o un COMMIT) i `ALL_TABLES` (None) si
+    és un bloc PL/SQL o qualsevol altra sentència de la qual no es pot saber quines taules modifica.
+    """
+    sql = strip_comments(sql)
+    if _PLSQL.match(sql):
+        return ALL_TABLES
+    match = _DML.match(sql)
+    if match is None:
+        return set() if _READ_ONLY.match(sql) else ALL_TABLES
+    tables = {_table_name(match.group(1))}
+    if re.match(r"^\s*INSERT\s+ALL\b", sql, re.IGNORECASE):
+        tables.update(_table_name(m.group(1)) for m in _INSERT_INTO.finditer(sql))
+    return tables
+
+
+def _freeze(binds: Any) -> Any:
+    """Converteix les variables d'enllaç en una clau que es pugui fer servir en un diccionari."""
+    if binds is None:
+        return ()
+    if isinstance(binds, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in binds.items()))
+    if isinstance(binds, (list, tuple)):
+        return tuple(_freeze(v) for v in binds)
+    try:
+        hash(binds)
+        return binds
+    except TypeError:
+        return repr(binds)
+
+
+class ResultCache:
+    """
+    Memòria cau LRU amb TTL de resultats de consultes (segura entre fils).
+    """
+
+    def __init__(self, size: int = 1024, ttl: Optional[float] = 60.0):
+        """
+        Paràmetres:
+        -----------
+        size : int
+            Nombre màxim d'entrades. En superar-lo s'eliminen les menys usades.
+        ttl : float, opcional
+            Segons que és vàlida una entrada. None, sense límit.
+        """
+        self.size = size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any, Set[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    @staticmethod
+    def key(sql: str, binds: Any = None) -> Tuple:
+        return normalize_sql(sql), _freeze(binds)
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        """Retorna (True, valor) si hi ha una entrada vàlida per a `key` o (False, None) altrament."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return True, entry[1]
+
+    def put(self, key: Tuple, value: Any, tables: Iterable[str], ttl: Optional[float] = None) -> None:
+        """Desa `value` per a `key`. `tables` són les taules de les quals depèn."""
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else float('inf')
+        with self._lock:
+            self._entries[key] = (expires, value, {_table_name(t) for t in tables})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, *tables: str) -> int:
+        """
+        Elimina les entrades que depenen d'alguna de les taules indicades, o totes si no se n'indica cap.
+
+        Retorna:
+        --------
+        int
+            Nombre d'entrades eliminades.
+        """
+        with self._lock:
+            if not tables:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                names = {_table_name(t) for t in tables}
+                keys = [k for k, (_, _, deps) in self._entries.items() if deps & names]
+                for k in keys:
+                    del self._entries[k]
+                removed = len(keys)
+            self._stats['invalidations'] += removed
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Encerts, errors, expulsions, caducitats, invalidacions, entrades i taxa d'encerts."""
+        with self._lock:
+            stats = {**self._stats, 'entries': len(self._entries)}
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def __len__(self):
+        return len(self._entries)
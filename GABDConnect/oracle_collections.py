@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Col·leccions de PL/SQL com a variables d'enllaç, per cridar procediments que processen un lot sencer per crida
+(`FORALL`) en lloc de fer un `callproc` per fila. `ArrayBind` descriu un argument de tipus col·lecció a partir d'una
+seqüència, una columna d'un DataFrame o un DataFrame sencer, i es converteix en:
+
+- una taula associativa de PL/SQL (`TABLE OF ... INDEX BY PLS_INTEGER`) amb `Cursor.arrayvar`, si el tipus és un
+  tipus d'oracledb o de Python (`DB_TYPE_NUMBER`, `str`, ...);
+- un objecte col·lecció (taula niada, VARRAY o col·lecció d'un paquet) amb `Connection.gettype` i `newobject`, si el
+  tipus és el nom d'un tipus de la base de dades. Si els elements són objectes, cada fila (diccionari, tupla o fila
+  del DataFrame) es converteix en un objecte.
+
+`TypeCache` desa els `DbObjectType` per sessió, perquè `gettype` és un viatge d'anada i tornada (o més) cada vegada.
+"""
+
+import logging
+import math
+import threading
+import weakref
+from typing import Any, Dict, Iterator, List, Tuple
+
+import oracledb
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _is_dataframe(values: Any) -> bool:
+    return hasattr(values, 'itertuples') and hasattr(values, 'iloc') and hasattr(values, 'columns')
+
+
+def _null(value: Any) -> Any:
+    """NaN/NaT -> None, perquè arribin a Oracle com a NULL."""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if type(value).__name__ in ('NaTType', 'NAType'):
+        return None
+    return value
+
+
+def as_list(values: Any) -> List[Any]:
+    """
+    Valors d'una col·lecció com a llista de Python: una seqüència, un `pandas.Series` o un array de NumPy es
+    converteixen en una llista d'escalars, i un DataFrame en una llista de diccionaris (un per fila).
+    """
+    if _is_dataframe(values):
+        names = list(values.columns)
+        return [{name: _null(v) for name, v in zip(names, row)}
+                for row in values.astype(object).itertuples(index=False, name=None)]
+    if hasattr(values, 'tolist'):
+        values = values.tolist()
+    return [_null(v) for v in values]
+
+
+class ArrayBind:
+    """
+    Argument de tipus col·lecció per a `oracleConnection.call_arrays`.
+
+        db.call_arrays("vendes_pkg.carrega", [ArrayBind(df['id'], DB_TYPE_NUMBER), ArrayBind(df['nom'], str)])
+        db.call_arrays("carrega_vendes", {'p_vendes': ArrayBind(df, 'VENDES_TAB')})
+    """
+
+    __slots__ = ['values', 'type']
+
+    def __init__(self, values: Any, type: Any = None):
+        """
+        Paràmetres:
+        -----------
+        values : seqüència, pandas.Series, numpy.ndarray o pandas.DataFrame
+            Elements de la col·lecció. Un DataFrame (o una seqüència de diccionaris o tuples) només té sentit si
+            els elements de la col·lecció són objectes.
+        type : str, tipus d'oracledb o tipus de Python, opcional
+            Nom del tipus col·lecció de la base de dades ('NUM_TAB', 'ESQUEMA.VENDES_TAB', 'PAQUET.T_IDS'), o tipus
+            dels elements d'una taula associativa de PL/SQL. Si és None, taula associativa del tipus del primer
+            element no nul.
+        """
+        self.values = as_list(values)
+        self.type = type
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return f"<ArrayBind {self.type!r} ({len(self.values)} elements)>"
+
+
+class TypeCache:
+    """`DbObjectType` per sessió i nom de tipus (segura entre fils)."""
+
+    def __init__(self):
+        self._types: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'loads': 0}
+
+    def get(self, connection, name: str):
+        """Tipus `name` de la sessió `connection`. Només crida `gettype` la primera vegada."""
+        key = name.upper() if '"' not in name else name
+        with self._lock:
+            types = self._types.setdefault(connection, {})
+            typ = types.get(key)
+            if typ is not None:
+                self._stats['hits'] += 1
+                return typ
+        typ = connection.gettype(name)
+        with self._lock:
+            self._types.setdefault(connection, {})[key] = typ
+            self._stats['loads'] += 1
+        return typ
+
+    def clear(self) -> None:
+        with self._lock:
+            self._types.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, 'types': sum(len(t) for t in self._types.values())}
+
+
+def _element_type(values: List[Any]) -> Any:
+    """Tipus de Python del primer element no nul (per a `arrayvar`)."""
+    first = next((v for v in values if v is not None), None)
+    if first is None:
+        return oracledb.DB_TYPE_VARCHAR
+    if isinstance(first, (bytes, bytearray)):
+        return oracledb.DB_TYPE_RAW
+    return type(first)
+
+
+def _new_element(obj_type, value: Any):
+    """Objecte del tipus `obj_type` a partir d'un diccionari (per nom d'atribut) o d'una seqüència (per posició)."""
+    if value is None or isinstance(value, oracledb.DbObject):
+        return value
+    obj = obj_type.newobject()
+    if isinstance(value, dict):
+        attributes = {a.name: a for a in obj_type.attributes}
+        for key, v in value.items():
+            name = key if key in attributes else str(key).upper()
+            if name not in attributes:
+                raise ValueError(f"El tipus {obj_type.name} no té cap atribut '{key}'")
+            setattr(obj, name, v)
+    else:
+        for attribute, v in zip(obj_type.attributes, value):
+            setattr(obj, attribute.name, v)
+    return obj
+
+
+def bind_value(cursor, array: ArrayBind, start: int, end: int, types: TypeCache) -> Any:
+    """Variable d'enllaç amb els elements `start:end` de `array`."""
+    values = array.values[start:end]
+    if isinstance(array.type, str):
+        typ = types.get(cursor.connection, array.type)
+        if not typ.iscollection:
+            raise ValueError(f"El tipus {array.type} no és una col·lecció")
+        if hasattr(typ.element_type, 'newobject'):  # Col·lecció d'objectes
+            values = [_new_element(typ.element_type, v) for v in values]
+        return typ.newobject(values)
+
+    typ = array.type if array.type is not None else _element_type(values)
+    size = 0
+    if typ in (str, oracledb.DB_TYPE_VARCHAR, oracledb.DB_TYPE_NVARCHAR, oracledb.DB_TYPE_CHAR,
+               oracledb.DB_TYPE_NCHAR, bytes, oracledb.DB_TYPE_RAW):
+        size = max((len(v) for v in values if v is not None), default=0) or 1
+    return cursor.arrayvar(typ, values, size)
+
+
+def chunk_bounds(length: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Rangs (inici, final) de com a molt `chunk_size` elements."""
+    for start in range(0, length, chunk_size):
+        yield start, min(start + chunk_size, length)
+
+
+def array_length(arrays: List[ArrayBind]) -> int:
+    """Nombre d'elements de les col·leccions, que han de tenir-ne tots el mateix."""
+    lengths = {len(a) for a in arrays}
+    if len(lengths) > 1:
+        raise ValueError(f"Totes les col·leccions han de tenir el mateix nombre d'elements: {sorted(lengths)}")
+    return lengths.pop() if lengths else 0
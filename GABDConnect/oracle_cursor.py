@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Reutilització de cursors Oracle. `CursorPool` guarda els cursors tancats d'una sessió per tornar-los a donar a la
+propera crida a `oracleConnection.cursor()`, i `PooledCursor` és l'embolcall que l'usuari rep: es fa servir igual que
+un `oracledb.Cursor`, però en tancar-lo (o en sortir del `with`) el cursor torna al pool en lloc de destruir-se.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import oracledb
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Arguments de `oracledb.Cursor.execute` que no són variables d'enllaç
+_EXECUTE_OPTIONS = {'suspend_on_success', 'fetch_lobs', 'fetch_decimals'}
+
+
+class PooledCursor:
+    """
+    Embolcall d'un `oracledb.Cursor` obtingut d'un `CursorPool`.
+    """
+
+    __slots__ = ['_cursor', '_pool', '_record']
+
+    def __init__(self, cursor, pool: "CursorPool"):
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_record', None)
+
+    @property
+    def cursor(self):
+        """El cursor d'oracledb que hi ha a sota."""
+        if self._cursor is None:
+            raise oracledb.InterfaceError("El cursor està tancat")
+        return self._cursor
+
+    def execute(self, statement: Optional[str], parameters: Any = None, **kwargs):
+        """Com `oracledb.Cursor.execute`. Per a les consultes retorna aquest mateix embolcall."""
+        cursor = self.cursor
+        if self._pool.normalizer is not None and statement is not None:
+            statement, parameters = self._normalize(statement, parameters, kwargs)
+        if self._pool.fetch_lobs is not None and 'fetch_lobs' not in kwargs:
+            kwargs['fetch_lobs'] = self._pool.fetch_lobs
+        if self._pool.profiler is not None:
+            return self._profiled('execute', cursor, statement, parameters, kwargs)
+        start = time.perf_counter()
+        res = cursor.execute(statement, parameters, **kwargs)
+        self._pool.executed(cursor, statement, parameters, time.perf_counter() - start)
+        return self if res is not None else None
+
+    def _normalize(self, statement: str, parameters: Any, kwargs: Dict[str, Any]):
+        """
+        Passa la sentència pel `normalizer` del pool. Les variables d'enllaç amb nom passades com a arguments de
+        `execute` es traslladen al diccionari de valors, perquè oracledb no accepta totes dues formes alhora.
+        """
+        binds = {k: kwargs.pop(k) for k in list(kwargs) if k not in _EXECUTE_OPTIONS}
+        if binds:
+            if parameters is None:
+                parameters = binds
+            elif isinstance(parameters, dict):
+                parameters = {**parameters, **binds}
+            else:
+                kwargs.update(binds)  # Barreja no vàlida: que la rebutgi oracledb
+                return statement, parameters
+        return self._pool.normalizer.normalize(statement, parameters)
+
+    def executemany(self, statement: Optional[str], parameters: Any, **kwargs) -> None:
+        """Com `oracledb.Cursor.executemany`."""
+        cursor = self.cursor
+        if self._pool.profiler is not None:
+            self._profiled('executemany', cursor, statement, parameters, kwargs)
+            return
+        start = time.perf_counter()
+        cursor.executemany(statement, parameters, **kwargs)
+        self._pool.executed(cursor, statement, parameters, time.perf_counter() - start)
+
+    def callproc(self, name: str, parameters: Any = None, keyword_parameters: Any = None) -> list:
+        """Com `oracledb.Cursor.callproc`. Els `listeners` reben la crida com un bloc PL/SQL (`BEGIN name; END;`)."""
+        cursor = self.cursor
+        start = time.perf_counter()
+        res = cursor.callproc(name, parameters, keyword_parameters)
+        self._pool.executed(cursor, f"BEGIN {name}; END;", parameters if parameters is not None else keyword_parameters,
+                            time.perf_counter() - start)
+        return res
+
+    def callfunc(self, name: str, return_type: Any, parameters: Any = None, keyword_parameters: Any = None) -> Any:
+        """Com `oracledb.Cursor.callfunc`. Vegeu `callproc`."""
+        cursor = self.cursor
+        start = time.perf_counter()
+        res = cursor.callfunc(name, return_type, parameters, keyword_parameters)
+        self._pool.executed(cursor, f"BEGIN {name}; END;", parameters if parameters is not None else keyword_parameters,
+                            time.perf_counter() - start)
+        return res
+
+    # --- Perfilat (només si el pool té un `profiler`) ------------------------------------------------------------
+
+    def _profiled(self, method: str, cursor, statement: Optional[str], parameters: Any, kwargs):
+        self._finish_record()
+        profiler = self._pool.profiler
+        record = profiler.start(cursor, statement if statement is not None else cursor.statement,
+                                self._pool.connection)
+        start = time.perf_counter()
+        try:
+            getattr(cursor, method)(statement, parameters, **kwargs)
+        except Exception as e:
+            record.error = str(e)
+            record.execute_time = time.perf_counter() - start
+            profiler.finish(record, self._pool.connection)
+            raise
+        record.execute_time = time.perf_counter() - start
+        self._pool.executed(cursor, statement, parameters, record.execute_time)
+
+        if cursor.description is None:
+            record.rows = cursor.rowcount
+            profiler.finish(record, self._pool.connection)
+            return None
+        object.__setattr__(self, '_record', record)
+        return self
+
+    def _fetched(self, rows: int, elapsed: float, done: bool) -> None:
+        record = self._record
+        record.rows += rows
+        record.fetch_time += elapsed
+        if done:
+            self._finish_record()
+
+    def _finish_record(self) -> None:
+        record = self._record
+        if record is not None:
+            object.__setattr__(self, '_record', None)
+            self._pool.profiler.finish(record, self._pool.connection)
+
+    def fetchone(self):
+        if self._record is None:
+            return self.cursor.fetchone()
+        start = time.perf_counter()
+        row = self.cursor.fetchone()
+        self._fetched(row is not None, time.perf_counter() - start, row is None)
+        return row
+
+    def fetchmany(self, size: Optional[int] = None):
+        if self._record is None:
+            return self.cursor.fetchmany(size) if size is not None else self.cursor.fetchmany()
+        start = time.perf_counter()
+        rows = self.cursor.fetchmany(size) if size is not None else self.cursor.fetchmany()
+        self._fetched(len(rows), time.perf_counter() - start, len(rows) < (size or self.cursor.arraysize))
+        return rows
+
+    def fetchall(self):
+        if self._record is None:
+            return self.cursor.fetchall()
+        start = time.perf_counter()
+        rows = self.cursor.fetchall()
+        self._fetched(len(rows), time.perf_counter() - start, True)
+        return rows
+
+    def __iter__(self):
+        if self._record is None:
+            return iter(self.cursor)
+        return self._profiled_iter()
+
+    def _profiled_iter(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self) -> None:
+        """Retorna el cursor al pool. Es pot cridar més d'una vegada."""
+        cursor = self._cursor
+        if cursor is not None:
+            self._finish_record()
+            object.__setattr__(self, '_cursor', None)
+            self._pool.put(cursor)
+
+    @property
+    def closed(self) -> bool:
+        return self._cursor is None
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.cursor, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __repr__(self):
+        return f"<PooledCursor {self._cursor!r}>"
+
+
+class CursorPool:
+    """
+    Pool de cursors d'una sessió Oracle.
+    """
+
+    def __init__(self, connection, size: int = 8, listeners: Optional[List[Callable]] = None, profiler=None,
+                 fetch_lobs: Optional[bool] = None, normalizer=None):
+        """
+        Paràmetres:
+        -----------
+        connection : oracledb.Connection
+            Sessió a la qual pertanyen els cursors.
+        size : int
+            Nombre màxim de cursors lliures que es guarden. Els que sobren es tanquen.
+        listeners : list, opcional
+            Funcions `f(statement, parameters, elapsed)` que es criden després de cada `execute` o `executemany`
+            correcte d'un cursor del pool. La llista es comparteix, no es copia.
+        profiler : StatementProfiler, opcional
+            Si s'indica, els cursors del pool hi envien les mesures de cada sentència.
+        fetch_lobs : bool, opcional
+            Valor per defecte de `fetch_lobs` a `execute`. Si és None, el d'oracledb.
+        normalizer : LiteralNormalizer, opcional
+            Si s'indica, `execute` hi passa les sentències per substituir-ne els literals per variables d'enllaç.
+        """
+        self.connection = connection
+        self.size = size
+        self.listeners = listeners if listeners is not None else []
+        self.profiler = profiler
+        self.fetch_lobs = fetch_lobs
+        self.normalizer = normalizer
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {'created': 0, 'reused': 0, 'discarded': 0}
+        self.last_used = 0.0
+
+    def get(self) -> PooledCursor:
+        """Retorna un cursor lliure o en crea un de nou si no n'hi ha cap."""
+        with self._lock:
+            if self._closed:
+                raise oracledb.InterfaceError("El pool de cursors està tancat")
+            cursor = self._idle.pop() if self._idle else None
+            self._stats['reused' if cursor is not None else 'created'] += 1
+
+        if cursor is None:
+            cursor = self.connection.cursor()
+        return PooledCursor(cursor, self)
+
+    def executed(self, cursor, statement: Optional[str], parameters: Any, elapsed: float) -> None:
+        """
+        Anota que la sessió acaba de respondre correctament (`last_used`, en temps de `time.monotonic()`) i avisa
+        els `listeners`.
+        """
+        self.last_used = time.monotonic()
+        if self.listeners:
+            if statement is None:
+                statement = cursor.statement
+            for listener in list(self.listeners):
+                try:
+                    listener(statement, parameters, elapsed)
+                except Exception as e:
+                    logger.warning(f"Execute listener {listener!r} failed: {e}")
+
+    def put(self, cursor) -> None:
+        """Torna un cursor al pool, amb la configuració per defecte."""
+        with self._lock:
+            keep = not self._closed and len(self._idle) < self.size
+            if keep:
+                try:
+                    _reset(cursor)
+                except Exception as e:
+                    logger.debug(f"Cursor discarded: {e}")
+                    keep = False
+            if keep:
+                self._idle.append(cursor)
+                return
+            self._stats['discarded'] += 1
+        _close_quietly(cursor)
+
+    def close(self) -> None:
+        """Tanca tots els cursors lliures. Els que estan en ús es tancaran quan es tornin."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for cursor in idle:
+            _close_quietly(cursor)
+
+    def stats(self) -> Dict[str, int]:
+        """Cursors creats, reutilitzats, descartats i lliures."""
+        with self._lock:
+            return {**self._stats, 'idle': len(self._idle)}
+
+    def __len__(self):
+        return len(self._idle)
+
+
+def _reset(cursor) -> None:
+    """Deixa un cursor com acabat de crear, perquè l'usuari següent no hereti la configuració de l'anterior."""
+    cursor.arraysize = oracledb.defaults.arraysize
+    cursor.prefetchrows = oracledb.defaults.prefetchrows
+    cursor.rowfactory = None
+    cursor.inputtypehandler = None
+    cursor.outputtypehandler = None
+
+
+def _close_quietly(cursor) -> None:
+    try:
+        cursor.close()
+    except Exception:
+        pass
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Exportació del resultat d'una consulta a fitxers Parquet o CSV sense carregar-lo a memòria. Els lots es llegeixen
+del cursor i s'escriuen al fitxer a mesura que arriben; opcionalment, l'escriptura es fa en un altre fil, de manera que
+mentre es comprimeix i s'escriu un lot ja s'està llegint el següent. La memòria queda acotada per la mida dels lots,
+la cua entre els dos fils i, en Parquet, la mida dels grups de files.
+"""
+
+import bz2
+import csv
+import gzip
+import logging
+import lzma
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import oracledb
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FORMATS = ('parquet', 'csv')
+
+# Compressions de CSV, pel nom i per l'extensió del fitxer
+_CSV_OPENERS = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+_CSV_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+
+_BINARY_TYPES = (oracledb.DB_TYPE_RAW, oracledb.DB_TYPE_LONG_RAW, oracledb.DB_TYPE_BLOB)
+_LOB_TYPES = (oracledb.DB_TYPE_CLOB, oracledb.DB_TYPE_NCLOB, oracledb.DB_TYPE_BLOB)
+
+_DONE = object()
+
+
+def _import_parquet():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Cal instal·lar pyarrow per exportar a Parquet: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def arrow_type(pa, column) -> Any:
+    """Tipus d'Arrow d'una columna a partir de la descripció del cursor. None si s'ha de deduir dels valors."""
+    t = column.type
+    if t is oracledb.DB_TYPE_NUMBER:
+        if column.scale == 0 and column.precision and column.precision <= 18:
+            return pa.int64()
+        return pa.float64()
+    if t is oracledb.DB_TYPE_BINARY_FLOAT:
+        return pa.float32()
+    if t is oracledb.DB_TYPE_BINARY_DOUBLE:
+        return pa.float64()
+    if t is oracledb.DB_TYPE_BINARY_INTEGER:
+        return pa.int64()
+    if t in (oracledb.DB_TYPE_VARCHAR, oracledb.DB_TYPE_NVARCHAR, oracledb.DB_TYPE_CHAR, oracledb.DB_TYPE_NCHAR,
+             oracledb.DB_TYPE_LONG, oracledb.DB_TYPE_CLOB, oracledb.DB_TYPE_NCLOB, oracledb.DB_TYPE_ROWID):
+        return pa.string()
+    if t in (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP, oracledb.DB_TYPE_TIMESTAMP_LTZ,
+             oracledb.DB_TYPE_TIMESTAMP_TZ):
+        return pa.timestamp('us')
+    if t in _BINARY_TYPES:
+        return pa.binary()
+    if t is oracledb.DB_TYPE_BOOLEAN:
+        return pa.bool_()
+    return None
+
+
+class CsvBatchWriter:
+    """Escriu lots de files en un fitxer CSV, opcionalment comprimit."""
+
+    def __init__(self, path: str, description, compression: Optional[str] = None, header: bool = True,
+                 **csv_options):
+        """
+        Paràmetres:
+        -----------
+        path : str
+            Fitxer de sortida.
+        description :
+            Descripció del cursor (noms i tipus de les columnes).
+        compression : str, opcional
+            'gzip', 'bz2' o 'xz'. Si és None, es dedueix de l'extensió del fitxer ('.gz', '.bz2', '.xz').
+        header : bool
+            Si s'escriu la fila amb els noms de les columnes.
+        **csv_options :
+            Arguments de `csv.writer` (`delimiter`, `quoting`, ...).
+        """
+        if compression is None:
+            compression = _CSV_EXTENSIONS.get(os.path.splitext(str(path))[1].lower())
+        if compression is not None and compression not in _CSV_OPENERS:
+            raise ValueError(f"Compressió '{compression}' no vàlida per a CSV. Ha de ser una de {list(_CSV_OPENERS)}")
+        opener = _CSV_OPENERS.get(compression, open)
+        self._file = opener(path, 'wt', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file, **csv_options)
+        # Els valors binaris s'escriuen en hexadecimal
+        self._binary = [i for i, col in enumerate(description) if col.type in _BINARY_TYPES]
+        if header:
+            self._writer.writerow([col.name for col in description])
+
+    def write(self, rows: List[Any]) -> None:
+        if self._binary:
+            rows = [list(row) for row in rows]
+            for row in rows:
+                for i in self._binary:
+                    if row[i] is not None:
+                        row[i] = bytes(row[i]).hex()
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetBatchWriter:
+    """
+    Escriu lots de files en un fitxer Parquet. Els lots s'acumulen fins a tenir `row_group_size` files, que
+    s'escriuen com un grup de files.
+    """
+
+    def __init__(self, path: str, description, compression: Optional[str] = 'snappy',
+                 row_group_size: int = 100000):
+        """
+        Paràmetres:
+        -----------
+        path : str
+            Fitxer de sortida.
+        description :
+            Descripció del cursor. L'esquema del fitxer se'n dedueix (vegeu `arrow_type`); els tipus que no s'hi
+            poden deduir es prenen del primer lot.
+        compression : str, opcional
+            Compressió de Parquet ('snappy', 'zstd', 'gzip', 'lz4', 'brotli' o None).
+        row_group_size : int
+            Files per grup de files.
+        """
+        self._pa, self._pq = _import_parquet()
+        self._path = path
+        self._names = [col.name for col in description]
+        self._types = [arrow_type(self._pa, col) for col in description]
+        self._compression = compression
+        self.row_group_size = row_group_size
+        self.row_groups = 0
+        self._schema = None
+        self._writer = None
+        self._pending: List[Any] = []
+        self._pending_rows = 0
+
+    def _open(self, columns) -> None:
+        pa = self._pa
+        fields = []
+        for name, t, values in zip(self._names, self._types, columns):
+            if t is None:
+                t = pa.array(values).type
+                if pa.types.is_null(t):
+                    t = pa.string()
+            fields.append(pa.field(name, t))
+        self._schema = pa.schema(fields)
+        self._writer = self._pq.ParquetWriter(self._path, self._schema, compression=self._compression)
+
+    def write(self, rows: List[Any]) -> None:
+        columns = list(zip(*rows))
+        if self._writer is None:
+            self._open(columns)
+        arrays = [self._pa.array(values, type=field.type) for values, field in zip(columns, self._schema)]
+        self._pending.append(self._pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+        self._pending_rows += len(rows)
+        while self._pending_rows >= self.row_group_size:
+            self._flush(self.row_group_size)
+
+    def _flush(self, rows: int) -> None:
+        table = self._pa.Table.from_batches(self._pending, schema=self._schema)
+        self._writer.write_table(table.slice(0, rows), row_group_size=rows)
+        self.row_groups += 1
+        rest = table.slice(rows)
+        self._pending = rest.to_batches()
+        self._pending_rows = rest.num_rows
+
+    def close(self) -> None:
+        if self._writer is None:
+            # Resultat buit: un fitxer amb l'esquema i cap grup de files
+            self._open([[] for _ in self._names])
+        if self._pending_rows:
+            self._flush(self._pending_rows)
+        self._writer.close()
+
+
+def read_lobs(batches: Iterable[List[Any]], description) -> Iterator[List[Any]]:
+    """
+    Substitueix els localitzadors de LOB dels lots pel seu contingut. Es fa al fil que llegeix el cursor, perquè el
+    fil d'escriptura no faci servir la sessió.
+    """
+    lobs = [i for i, col in enumerate(description) if col.type in _LOB_TYPES]
+    for rows in batches:
+        if lobs:
+            rows = [list(row) for row in rows]
+            for row in rows:
+                for i in lobs:
+                    if row[i] is not None and hasattr(row[i], 'read'):
+                        row[i] = row[i].read()
+        yield rows
+
+
+def _consume(pending: "queue.Queue[Any]", write, errors: List[BaseException]) -> None:
+    """Fil d'escriptura: escriu els lots de la cua fins a `_DONE`. Després d'un error només buida la cua."""
+    while True:
+        rows = pending.get()
+        if rows is _DONE:
+            return
+        if errors:
+            continue  # Es buida la cua perquè el fil de lectura no es quedi bloquejat
+        try:
+            write(rows)
+        except BaseException as e:
+            errors.append(e)
+
+
+def _write_threaded(batches: Iterable[List[Any]], write, queue_size: int) -> None:
+    pending: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+    errors: List[BaseException] = []
+    thread = threading.Thread(target=_consume, args=(pending, write, errors), name="gabd-export-writer", daemon=True)
+    thread.start()
+    try:
+        for rows in batches:
+            if errors:
+                break
+            pending.put(rows)
+    finally:
+        pending.put(_DONE)
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def write_batches(batches: Iterable[List[Any]], writer, threaded: bool = True,
+                  queue_size: int = 2) -> Dict[str, Any]:
+    """
+    Escriu els lots de `batches` amb `writer.write`. Amb `threaded`, l'escriptura es fa en un fil a part i entre
+    la lectura i l'escriptura hi ha com a màxim `queue_size` lots en memòria. No tanca `writer`.
+
+    Retorna:
+    --------
+    dict
+        `rows`, `batches`, `elapsed` (segons) i `write_time` (segons dedicats a escriure).
+    """
+    stats = {'rows': 0, 'batches': 0, 'elapsed': 0.0, 'write_time': 0.0}
+    start = time.perf_counter()
+
+    def write(rows):
+        t0 = time.perf_counter()
+        writer.write(rows)
+        stats['write_time'] += time.perf_counter() - t0
+        stats['rows'] += len(rows)
+        stats['batches'] += 1
+
+    if threaded:
+        _write_threaded(batches, write, queue_size)
+    else:
+        for rows in batches:
+            write(rows)
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Lectura i escriptura de LOB (CLOB, NCLOB i BLOB) per trossos, perquè la memòria no creixi amb la mida del LOB.
+`LobReader` es fa servir com un fitxer obert en mode lectura (`read`, `seek`, `tell`, iteració per trossos) i
+`write_lob` hi copia un fitxer o qualsevol objecte amb `read`. Els trossos són múltiples de la mida de tros del LOB
+(`getchunksize`), que és la unitat amb què el servidor el desa.
+
+Les posicions i mides són en bytes per als BLOB i en caràcters per als CLOB i NCLOB, com a oracledb.
+"""
+
+import logging
+from typing import Any, AsyncIterator, Iterator, Optional, Union
+
+import oracledb
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Trossos del LOB que es llegeixen o escriuen per viatge d'anada i tornada
+DEFAULT_CHUNKS_PER_CALL = 16
+
+
+def aligned_chunk_size(lob_chunk_size: int, chunk_size: Optional[int] = None) -> int:
+    """
+    Mida de lectura o escriptura: `chunk_size` arrodonit amunt a un múltiple de la mida de tros del LOB, o
+    `DEFAULT_CHUNKS_PER_CALL` trossos si és None.
+    """
+    lob_chunk_size = max(1, lob_chunk_size or 1)
+    if chunk_size is None:
+        return lob_chunk_size * DEFAULT_CHUNKS_PER_CALL
+    return max(1, -(-chunk_size // lob_chunk_size)) * lob_chunk_size
+
+
+class LobReader:
+    """
+    Lector d'un `oracledb.LOB` amb interfície de fitxer. Cada `read` o pas de la iteració és un viatge d'anada i
+    tornada al servidor i només té a memòria el tros llegit.
+
+        with LobReader(lob) as f, open("document.pdf", "wb") as out:
+            shutil.copyfileobj(f, out)
+    """
+
+    def __init__(self, lob, chunk_size: Optional[int] = None):
+        self.lob = lob
+        self.chunk_size = aligned_chunk_size(lob.getchunksize(), chunk_size)
+        self._size = None
+        self._pos = 0  # 0-based; oracledb compta des d'1
+        self.closed = False
+
+    @property
+    def size(self) -> int:
+        """Mida del LOB (es demana al servidor la primera vegada)."""
+        if self._size is None:
+            self._size = self.lob.size()
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return False
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 0:
+            pos = offset
+        elif whence == 1:
+            pos = self._pos + offset
+        elif whence == 2:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"whence {whence} no vàlid")
+        self._pos = max(0, pos)
+        return self._pos
+
+    def read(self, size: int = -1) -> Union[str, bytes]:
+        """
+        Llegeix com a molt `size` bytes (o caràcters) des de la posició actual. Amb `size` negatiu, llegeix fins al
+        final (en memòria: per a LOB grans és millor iterar).
+        """
+        if self.closed:
+            raise ValueError("El lector del LOB està tancat")
+        if size is None or size < 0:
+            size = max(0, self.size - self._pos)
+            if size == 0:
+                return self._empty()
+        elif size == 0:
+            return self._empty()
+        data = self.lob.read(self._pos + 1, size)
+        self._pos += len(data)
+        return data
+
+    def _empty(self):
+        return b"" if self.lob.type is oracledb.DB_TYPE_BLOB else ""
+
+    def __iter__(self) -> Iterator[Union[str, bytes]]:
+        while True:
+            data = self.read(self.chunk_size)
+            if not data:
+                return
+            yield data
+            if len(data) < self.chunk_size:
+                return
+
+    def close(self) -> None:
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_lob(lob, stream: Any, chunk_size: Optional[int] = None, offset: int = 1) -> int:
+    """
+    Escriu al LOB el contingut de `stream` (un fitxer obert, `io.BytesIO`, ... o qualsevol objecte amb
+    `read(n)`) per trossos. El LOB s'ha d'haver seleccionat `FOR UPDATE` o obtingut amb
+    `RETURNING ... INTO`. No fa commit.
+
+        curs.execute("INSERT INTO documents (id, contingut) VALUES (:1, empty_blob()) RETURNING contingut INTO :2",
+                     [7, lob_var])
+        write_lob(lob_var.getvalue()[0], open("document.pdf", "rb"))
+
+    Paràmetres:
+    -----------
+    lob : oracledb.LOB
+        LOB de destí.
+    stream :
+        Origen de les dades: bytes per a un BLOB i text per a un CLOB.
+    chunk_size : int, opcional
+        Mida de cada escriptura, arrodonida a un múltiple de `lob.getchunksize()`.
+    offset : int
+        Posició (des d'1) on es comença a escriure.
+
+    Retorna:
+    --------
+    int
+        Bytes (o caràcters) escrits.
+    """
+    chunk_size = aligned_chunk_size(lob.getchunksize(), chunk_size)
+    written = 0
+    # Obrir el LOB evita que el servidor actualitzi índexs i triggers a cada escriptura
+    lob.open()
+    try:
+        while True:
+            data = stream.read(chunk_size)
+            if not data:
+                break
+            lob.write(data, offset + written)
+            written += len(data)
+    finally:
+        lob.close()
+    return written
+
+
+async def aiter_lob(lob, chunk_size: Optional[int] = None) -> AsyncIterator[Union[str, bytes]]:
+    """
+    Versió asíncrona de la iteració de `LobReader`, per a un `oracledb.AsyncLOB`.
+
+        async for tros in aiter_lob(lob):
+            await destí.write(tros)
+    """
+    chunk_size = aligned_chunk_size(await lob.getchunksize(), chunk_size)
+    offset = 1
+    while True:
+        data = await lob.read(offset, chunk_size)
+        if not data:
+            return
+        yield data
+        offset += len(data)
+        if len(data) < chunk_size:
+            return
+
+
+async def awrite_lob(lob, stream: Any, chunk_size: Optional[int] = None, offset: int = 1) -> int:
+    """
+    Versió asíncrona de `write_lob`, per a un `oracledb.AsyncLOB`. `stream.read` pot ser síncron o una corutina.
+    """
+    chunk_size = aligned_chunk_size(await lob.getchunksize(), chunk_size)
+    written = 0
+    await lob.open()
+    try:
+        while True:
+            data = stream.read(chunk_size)
+            if hasattr(data, '__await__'):
+                data = await data
+            if not data:
+                break
+            await lob.write(data, offset + written)
+            written += len(data)
+    finally:
+        await lob.close()
+    return written
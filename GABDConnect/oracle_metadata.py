@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Memòria cau de la descripció de les taules (columnes, tipus, mides, nul·litat i claus) a partir del diccionari de
+dades. `MetadataCache` carrega totes les taules d'un esquema amb una sola consulta a `ALL_TAB_COLUMNS` i
+`ALL_CONSTRAINTS` la primera vegada que se'n demana una, i després respon des de memòria fins que caduca el temps de
+vida o s'invalida l'esquema (p. ex. després d'una sentència DDL).
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import oracledb
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ColumnInfo = namedtuple('ColumnInfo', ['name', 'type', 'length', 'char_length', 'precision', 'scale', 'nullable',
+                                       'position'])
+
+_SCHEMA_SQL = """
+SELECT c.table_name, c.column_name, c.data_type, c.data_length, c.char_length, c.data_precision, c.data_scale,
+       c.nullable, c.column_id, k.constraint_name, k.constraint_type, k.position, k.r_owner, k.r_table_name
+  FROM all_tab_columns c
+  LEFT JOIN (SELECT cc.table_name, cc.column_name, cc.position, ac.constraint_name, ac.constraint_type,
+                    rc.owner r_owner, rc.table_name r_table_name
+               FROM all_cons_columns cc
+               JOIN all_constraints ac ON ac.owner = cc.owner AND ac.constraint_name = cc.constraint_name
+               LEFT JOIN all_constraints rc ON rc.owner = ac.r_owner AND rc.constraint_name = ac.r_constraint_name
+              WHERE cc.owner = :owner AND ac.constraint_type IN ('P', 'U', 'R')) k
+    ON k.table_name = c.table_name AND k.column_name = c.column_name
+ WHERE c.owner = :owner
+ ORDER BY c.table_name, c.column_id, k.constraint_name, k.position"""
+
+_DDL = re.compile(r"^\s*(?:CREATE|ALTER|DROP|RENAME|TRUNCATE)\b", re.IGNORECASE)
+_ALTER_SESSION = re.compile(r"^\s*ALTER\s+SESSION\b", re.IGNORECASE)
+_DDL_OWNER = re.compile(r"\b(?:TABLE|VIEW|INDEX|ON)\s+(\"[^\"]+\"|[\w$#]+)\s*\.", re.IGNORECASE)
+
+# Tipus per a `Cursor.setinputsizes` segons el tipus de la columna (els de text i RAW es passen per mida)
+_INPUT_TYPES = {
+    'NUMBER': oracledb.DB_TYPE_NUMBER,
+    'FLOAT': oracledb.DB_TYPE_NUMBER,
+    'BINARY_FLOAT': oracledb.DB_TYPE_BINARY_FLOAT,
+    'BINARY_DOUBLE': oracledb.DB_TYPE_BINARY_DOUBLE,
+    'DATE': oracledb.DB_TYPE_DATE,
+    'CLOB': oracledb.DB_TYPE_CLOB,
+    'NCLOB': oracledb.DB_TYPE_NCLOB,
+    'BLOB': oracledb.DB_TYPE_BLOB,
+    'BOOLEAN': oracledb.DB_TYPE_BOOLEAN,
+}
+
+
+def identifier(name: str) -> str:
+    """Identificador tal com el desa el diccionari de dades: sense cometes, o en majúscules si no en duia."""
+    name = name.strip()
+    if name.startswith('"') and name.endswith('"'):
+        return name[1:-1]
+    return name.upper()
+
+
+def split_name(name: str) -> Tuple[Optional[str], str]:
+    """Separa `esquema.taula` en (esquema o None, taula), normalitzats amb `identifier`."""
+    parts = re.findall(r'"[^"]+"|[^.]+', name.strip())
+    if len(parts) >= 2:
+        return identifier(parts[-2]), identifier(parts[-1])
+    return None, identifier(parts[0])
+
+
+def input_size(column: ColumnInfo) -> Any:
+    """Tipus o mida de `setinputsizes` per a una columna. None si no se'n pot deduir cap."""
+    if column.type in _INPUT_TYPES:
+        return _INPUT_TYPES[column.type]
+    if column.type.startswith('TIMESTAMP'):
+        return oracledb.DB_TYPE_TIMESTAMP
+    if column.type in ('VARCHAR2', 'NVARCHAR2', 'CHAR', 'NCHAR', 'VARCHAR'):
+        return column.char_length or column.length
+    if column.type == 'RAW':
+        return oracledb.DB_TYPE_RAW
+    return None
+
+
+class TableInfo:
+    """
+    Descripció d'una taula o vista.
+
+    Atributs:
+    ----------
+    owner, name : str
+        Esquema i nom.
+    columns : dict
+        `ColumnInfo` per nom de columna, en l'ordre de la taula.
+    primary_key : list
+        Columnes de la clau primària, en ordre.
+    unique_keys : dict
+        Columnes de cada restricció UNIQUE, pel nom de la restricció.
+    foreign_keys : dict
+        Per nom de restricció, un diccionari amb `columns`, `ref_owner` i `ref_table`.
+    """
+
+    __slots__ = ['owner', 'name', 'columns', 'primary_key', 'unique_keys', 'foreign_keys']
+
+    def __init__(self, owner: str, name: str):
+        self.owner = owner
+        self.name = name
+        self.columns: Dict[str, ColumnInfo] = {}
+        self.primary_key: List[str] = []
+        self.unique_keys: Dict[str, List[str]] = {}
+        self.foreign_keys: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.columns)
+
+    def __getitem__(self, column: str) -> ColumnInfo:
+        return self.columns[identifier(column)]
+
+    def __contains__(self, column: str) -> bool:
+        return identifier(column) in self.columns
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __repr__(self):
+        return f"<TableInfo {self.owner}.{self.name} ({', '.join(self.columns)})>"
+
+
+def load_schema(curs, owner: str) -> Dict[str, TableInfo]:
+    """Descripció de totes les taules i vistes de l'esquema `owner`, amb una sola consulta."""
+    tables: Dict[str, TableInfo] = {}
+    for (table, column, data_type, length, char_length, precision, scale, nullable, position, constraint,
+         ctype, cpos, r_owner, r_table) in curs.execute(_SCHEMA_SQL, {'owner': owner}).fetchall():
+        info = tables.get(table)
+        if info is None:
+            info = tables[table] = TableInfo(owner, table)
+        if column not in info.columns:
+            info.columns[column] = ColumnInfo(column, data_type, length, char_length, precision, scale,
+                                              nullable == 'Y', position)
+        if ctype == 'P':
+            info.primary_key.append(column)
+        elif ctype == 'U':
+            info.unique_keys.setdefault(constraint, []).append(column)
+        elif ctype == 'R':
+            fk = info.foreign_keys.setdefault(constraint, {'columns': [], 'ref_owner': r_owner, 'ref_table': r_table})
+            fk['columns'].append(column)
+    return tables
+
+
+class MetadataCache:
+    """
+    Descripcions de taules per esquema, amb temps de vida (segura entre fils).
+    """
+
+    def __init__(self, ttl: Optional[float] = 300.0):
+        """
+        Paràmetres:
+        -----------
+        ttl : float, opcional
+            Segons que és vàlida la descripció d'un esquema. None, fins que s'invalidi.
+        """
+        self.ttl = ttl
+        self.default_owner: Optional[str] = None
+        self._schemas: Dict[str, Tuple[float, Dict[str, TableInfo]]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0  # Augmenta amb cada invalidació
+        self._stats = {'hits': 0, 'loads': 0, 'invalidations': 0}
+
+    def table(self, cursor_factory: Callable, name: str, owner: Optional[str] = None) -> Optional[TableInfo]:
+        """
+        Descripció de la taula `name` (que pot incloure l'esquema), o None si no existeix o no s'hi té accés.
+
+        Paràmetres:
+        -----------
+        cursor_factory : callable
+            Funció que retorna un cursor (que es pot fer servir amb `with`), per si cal carregar l'esquema.
+        """
+        schema, table = split_name(name)
+        owner = identifier(owner) if owner is not None else schema
+        return self._load(cursor_factory, owner).get(table)
+
+    def schema(self, cursor_factory: Callable, owner: Optional[str] = None) -> Dict[str, TableInfo]:
+        """Descripcions de totes les taules de l'esquema (per defecte, el de la sessió), per nom."""
+        return self._load(cursor_factory, identifier(owner) if owner is not None else None)
+
+    def _load(self, cursor_factory: Callable, owner: Optional[str]) -> Dict[str, TableInfo]:
+        with self._lock:
+            if owner is None:
+                owner = self.default_owner
+            entry = self._schemas.get(owner) if owner is not None else None
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                self._stats['hits'] += 1
+                return entry[1]
+            generation = self._generation
+
+        # La consulta al diccionari es fa sense el bloqueig, perquè els altres fils puguin continuar fent servir
+        # els esquemes que ja hi ha en memòria. Si dos fils carreguen el mateix esquema alhora, es desa el darrer.
+        current = owner is None
+        with cursor_factory() as curs:
+            if current:
+                owner = curs.execute("SELECT sys_context('USERENV', 'CURRENT_SCHEMA') FROM dual").fetchone()[0]
+            start = time.perf_counter()
+            tables = load_schema(curs, owner)
+        logger.debug(f"Loaded metadata of {len(tables)} tables of {owner} in {time.perf_counter() - start:.3f} s")
+
+        with self._lock:
+            self._stats['loads'] += 1
+            # Si s'ha invalidat (o s'ha canviat l'esquema de la sessió) mentre es carregava, la descripció pot ser
+            # anterior al canvi i no es desa
+            if generation == self._generation:
+                self._schemas[owner] = (time.monotonic(), tables)
+                if current:
+                    self.default_owner = owner
+        return tables
+
+    def invalidate(self, owner: Optional[str] = None) -> None:
+        """Fa que es torni a carregar l'esquema `owner` (o tots, si és None) en la pròxima consulta."""
+        with self._lock:
+            self._generation += 1
+            if owner is None:
+                self._stats['invalidations'] += len(self._schemas)
+                self._schemas.clear()
+            elif self._schemas.pop(identifier(owner), None) is not None:
+                self._stats['invalidations'] += 1
+
+    def invalidate_ddl(self, statement: str) -> None:
+        """
+        Invalida l'esquema afectat si `statement` és DDL (el de la sessió si la sentència no n'indica cap). Després
+        d'un `ALTER SESSION` (p. ex. `SET CURRENT_SCHEMA`) es torna a consultar quin és l'esquema de la sessió.
+        """
+        if _ALTER_SESSION.match(statement):
+            with self._lock:
+                self._generation += 1
+                self.default_owner = None
+            return
+        if not _DDL.match(statement):
+            return
+        match = _DDL_OWNER.search(statement)
+        owner = identifier(match.group(1)) if match else self.default_owner
+        if owner is not None:
+            self.invalidate(owner)
+
+    def stats(self) -> Dict[str, Any]:
+        """Consultes resoltes des de memòria, esquemes carregats, invalidacions i taules en memòria."""
+        with self._lock:
+            return {**self._stats, 'schemas': len(self._schemas),
+                    'tables': sum(len(t) for _, t in self._schemas.values())}
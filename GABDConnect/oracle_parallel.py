@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Execució en paral·lel d'una sentència per trossos d'una taula. La taula es divideix en rangs de ROWID (amb
+`DBMS_PARALLEL_EXECUTE`) o de valors d'una columna, i cada rang s'executa en una sessió diferent d'un pool, de manera
+que el treball es reparteix entre diversos processos del servidor i diverses connexions.
+
+La sentència ha de fer servir les variables d'enllaç `:start_id` i `:end_id`, com a `DBMS_PARALLEL_EXECUTE`:
+
+    UPDATE vendes SET iva = import * 0.21 WHERE rowid BETWEEN :start_id AND :end_id
+"""
+
+import logging
+import math
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def rowid_chunks(curs, table: str, chunks: int, owner: Optional[str] = None,
+                 chunk_size: Optional[int] = None) -> List[Tuple[str, str]]:
+    """
+    Divideix una taula en rangs de ROWID amb `DBMS_PARALLEL_EXECUTE.create_chunks_by_rowid`.
+
+    Paràmetres:
+    -----------
+    curs : oracledb.Cursor
+        Cursor d'una sessió sense cap transacció pendent: els procediments de `DBMS_PARALLEL_EXECUTE` fan commit.
+    table : str
+        Nom de la taula.
+    chunks : int
+        Nombre aproximat de trossos.
+    owner : str, opcional
+        Propietari de la taula. Per defecte, l'usuari de la sessió.
+    chunk_size : int, opcional
+        Blocs per tros. Si és None, es calcula a partir dels blocs de la taula i de `chunks`.
+
+    Retorna:
+    --------
+    list
+        Parelles (ROWID inicial, ROWID final).
+    """
+    table = table.upper()
+    if owner is None:
+        owner = curs.execute("SELECT sys_context('USERENV', 'CURRENT_SCHEMA') FROM dual").fetchone()[0]
+    owner = owner.upper()
+
+    if chunk_size is None:
+        row = curs.execute("SELECT blocks FROM all_tables WHERE owner = :1 AND table_name = :2",
+                           [owner, table]).fetchone()
+        if row is None:
+            raise ValueError(f"No existeix la taula {owner}.{table} o no s'hi té accés")
+        blocks = row[0]
+        if not blocks:
+            # Sense estadístiques: comptem els blocs que tenen files
+            blocks = curs.execute(f"SELECT COUNT(DISTINCT dbms_rowid.rowid_block_number(rowid)) "
+                                  f"FROM {owner}.{table}").fetchone()[0]
+        chunk_size = max(1, math.ceil(blocks / chunks))
+
+    task = f"GABD_{uuid.uuid4().hex[:20].upper()}"
+    curs.callproc("dbms_parallel_execute.create_task", [task])
+    try:
+        curs.callproc("dbms_parallel_execute.create_chunks_by_rowid", [task, owner, table, False, chunk_size])
+        return [tuple(r) for r in curs.execute("""SELECT start_rowid, end_rowid FROM user_parallel_execute_chunks
+                                                  WHERE task_name = :1 ORDER BY chunk_id""", [task]).fetchall()]
+    finally:
+        curs.callproc("dbms_parallel_execute.drop_task", [task])
+
+
+def key_chunks(curs, table: str, column: str, chunks: int) -> List[Tuple[Any, Any]]:
+    """
+    Divideix els valors diferents (no nuls) d'una columna en `chunks` rangs disjunts.
+
+    Retorna:
+    --------
+    list
+        Parelles (valor mínim, valor màxim) de cada rang, ambdós inclosos.
+    """
+    return [tuple(r) for r in curs.execute(f"""SELECT MIN({column}), MAX({column})
+                                               FROM (SELECT {column}, NTILE(:1) OVER (ORDER BY {column}) nt
+                                                     FROM (SELECT DISTINCT {column} FROM {table}
+                                                           WHERE {column} IS NOT NULL))
+                                               GROUP BY nt ORDER BY 1""", [chunks]).fetchall()]
+
+
+def run_chunks(acquire, release, sql: str, ranges: List[Tuple[Any, Any]], workers: int,
+               binds: Optional[Dict[str, Any]] = None, query: bool = False,
+               commit: bool = True) -> List[Dict[str, Any]]:
+    """
+    Executa `sql` per a cada rang, cadascun en una sessió obtinguda amb `acquire()` i alliberada amb `release(conn)`,
+    amb com a molt `workers` sessions alhora. Amb DML, cada rang fa commit en acabar si `commit` és True i rollback
+    si és False (prova en sec): una sessió es torna al pool sense la transacció, de manera que els canvis no es
+    poden confirmar després.
+
+    Retorna:
+    --------
+    list
+        Un diccionari per rang, en el mateix ordre, amb `chunk`, `start`, `end`, `rows` (files llegides o
+        afectades), `elapsed`, `error` (None si ha anat bé) i, per a les consultes, `result`.
+    """
+    binds = dict(binds or {})
+
+    def run(i: int, start: Any, end: Any) -> Dict[str, Any]:
+        status = {'chunk': i, 'start': start, 'end': end, 'rows': 0, 'elapsed': 0.0, 'error': None}
+        t = time.perf_counter()
+        conn = None
+        try:
+            conn = acquire()
+            with conn.cursor() as curs:
+                curs.execute(sql, {**binds, 'start_id': start, 'end_id': end})
+                if query:
+                    status['result'] = curs.fetchall()
+                    status['rows'] = len(status['result'])
+                else:
+                    status['rows'] = curs.rowcount
+            if not query:
+                if commit:
+                    conn.commit()
+                else:
+                    conn.rollback()
+        except Exception as e:
+            logger.error(f"Chunk {i} ({start}, {end}) failed: {e}")
+            status['error'] = str(e)
+            if conn is not None and not query:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+        finally:
+            if conn is not None:
+                release(conn)
+            status['elapsed'] = time.perf_counter() - t
+        return status
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(run, i, start, end) for i, (start, end) in enumerate(ranges)]
+        return [f.result() for f in futures]
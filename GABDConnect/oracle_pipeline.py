@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Agrupació de sentències independents en el mínim de viatges d'anada i tornada. `StatementPipeline` recull les
+operacions (`execute`, `fetch*`, `callproc`, `callfunc`, `commit`) i les executa totes alhora en sortir del `with`.
+
+Amb una connexió asíncrona s'envien amb el *pipelining* d'oracledb (`create_pipeline` i `run_pipeline`, Oracle 23ai o
+posterior; amb servidors anteriors oracledb les executa una a una). Les connexions síncrones d'oracledb no tenen
+`run_pipeline`: en aquest cas les sentències DML consecutives (i els commits que les segueixen) s'envien en un sol bloc
+PL/SQL anònim (un per cada tram acabat en COMMIT) i la resta d'operacions una a una.
+"""
+
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import oracledb
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_DML = re.compile(r"^\s*(?:INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+# Cadenes, comentaris i variables d'enllaç: només es reanomenen les variables
+_SQL_TOKENS = re.compile(r"('(?:[^']|'')*')|(\"[^\"]*\")|(--[^\n]*)|(/\*.*?\*/)|:(\w+)", re.DOTALL)
+
+
+class PipelineResult:
+    """
+    Resultat d'una operació del pipeline, disponible quan aquest s'ha executat.
+
+    Atributs:
+    ----------
+    rows : list
+        Files de les operacions `fetch*` (`fetchone` en retorna com a molt una).
+    return_value : Any
+        Valor de retorn de `callfunc`.
+    rowcount : int
+        Files afectades per `execute` quan s'ha executat dins d'un bloc PL/SQL o per separat.
+    error : Exception
+        Error de l'operació amb `continue_on_error=True`. None si ha anat bé.
+    """
+
+    __slots__ = ['operation', 'rows', 'return_value', 'rowcount', 'error']
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.rows = None
+        self.return_value = None
+        self.rowcount = None
+        self.error = None
+
+    def __repr__(self):
+        return (f"<PipelineResult {self.operation}: rows={self.rows!r} return_value={self.return_value!r} "
+                f"rowcount={self.rowcount!r} error={self.error!r}>")
+
+
+class _Op:
+    __slots__ = ['kind', 'statement', 'parameters', 'extra', 'result']
+
+    def __init__(self, kind: str, statement: Optional[str] = None, parameters: Any = None, **extra):
+        self.kind = kind
+        self.statement = statement
+        self.parameters = parameters
+        self.extra = extra
+        self.result = PipelineResult(kind)
+
+
+class StatementPipeline:
+    """
+    Operacions pendents d'executar en bloc. S'obté amb `oracleConnection.pipeline()` o
+    `AsyncOracleConnection.pipeline()`.
+
+        with db.pipeline() as p:
+            p.execute("INSERT INTO log VALUES (:1)", ["a"])
+            p.execute("UPDATE comptador SET n = n + 1")
+            recintes = p.fetchall("SELECT * FROM recintes")
+            p.commit()
+        print(recintes.rows)
+    """
+
+    def __init__(self, continue_on_error: bool = False):
+        self.continue_on_error = continue_on_error
+        self._ops: List[_Op] = []
+        self.round_trips = 0
+
+    def _add(self, kind: str, statement: Optional[str] = None, parameters: Any = None, **extra) -> PipelineResult:
+        op = _Op(kind, statement, parameters, **extra)
+        self._ops.append(op)
+        return op.result
+
+    def execute(self, statement: str, parameters: Any = None) -> PipelineResult:
+        return self._add('execute', statement, parameters)
+
+    def executemany(self, statement: str, parameters: Any) -> PipelineResult:
+        return self._add('executemany', statement, parameters)
+
+    def fetchone(self, statement: str, parameters: Any = None) -> PipelineResult:
+        return self._add('fetchone', statement, parameters)
+
+    def fetchmany(self, statement: str, parameters: Any = None, num_rows: Optional[int] = None) -> PipelineResult:
+        return self._add('fetchmany', statement, parameters, num_rows=num_rows)
+
+    def fetchall(self, statement: str, parameters: Any = None) -> PipelineResult:
+        return self._add('fetchall', statement, parameters)
+
+    def callproc(self, name: str, parameters: Any = None) -> PipelineResult:
+        return self._add('callproc', name, parameters)
+
+    def callfunc(self, name: str, return_type: Any, parameters: Any = None) -> PipelineResult:
+        return self._add('callfunc', name, parameters, return_type=return_type)
+
+    def commit(self) -> PipelineResult:
+        return self._add('commit')
+
+    @property
+    def results(self) -> List[PipelineResult]:
+        """Resultats de totes les operacions, en ordre."""
+        return [op.result for op in self._ops]
+
+    def __len__(self):
+        return len(self._ops)
+
+    # --- Execució amb el pipelining d'oracledb -------------------------------------------------------------------
+
+    def to_oracledb(self):
+        """Construeix l'`oracledb.Pipeline` equivalent."""
+        pipeline = oracledb.create_pipeline()
+        for op in self._ops:
+            if op.kind == 'commit':
+                pipeline.add_commit()
+            elif op.kind == 'fetchmany':
+                pipeline.add_fetchmany(op.statement, op.parameters, num_rows=op.extra['num_rows'])
+            elif op.kind == 'callfunc':
+                pipeline.add_callfunc(op.statement, op.extra['return_type'], op.parameters)
+            else:
+                getattr(pipeline, f"add_{op.kind}")(op.statement, op.parameters)
+        return pipeline
+
+    def set_results(self, results) -> None:
+        """Copia els `oracledb.PipelineOpResult` de `run_pipeline` als resultats de les operacions."""
+        for op, res in zip(self._ops, results):
+            op.result.rows = res.rows
+            op.result.return_value = res.return_value
+            op.result.error = res.error
+        self.round_trips += 1
+
+    # --- Alternativa per a connexions sense pipelining ----------------------------------------------------------
+
+    def run_fallback(self, cursor_factory: Callable, commit: Callable) -> List[PipelineResult]:
+        """
+        Executa les operacions sense `run_pipeline`: les DML consecutives fins al següent commit (inclòs) en un sol
+        bloc PL/SQL i la resta una a una.
+
+        Paràmetres:
+        -----------
+        cursor_factory : callable
+            Funció que retorna un cursor (que es pot fer servir amb `with`).
+        commit : callable
+            Funció que fa commit de la sessió.
+        """
+        i, n = 0, len(self._ops)
+        while i < n:
+            if not self._mergeable(self._ops[i]):
+                self._run_one(self._ops[i], cursor_factory, commit)
+                i += 1
+                continue
+            # Cada grup acaba en el primer COMMIT: així el COMMIT és la darrera sentència del bloc i, si el bloc
+            # falla, no n'ha quedat res confirmat que s'hagi de tornar a executar.
+            j = i
+            while j < n and self._mergeable(self._ops[j]):
+                j += 1
+                if self._ops[j - 1].kind == 'commit':
+                    break
+            group = self._ops[i:j]
+            if len(group) > 1 and any(op.kind == 'execute' for op in group):
+                self._run_block(group, cursor_factory, commit)
+            else:
+                for op in group:
+                    self._run_one(op, cursor_factory, commit)
+            i = j
+        return self.results
+
+    @staticmethod
+    def _mergeable(op: _Op) -> bool:
+        return op.kind == 'commit' or (op.kind == 'execute' and bool(_DML.match(op.statement)))
+
+    def _run_block(self, group: List[_Op], cursor_factory: Callable, commit: Callable) -> None:
+        body = []
+        binds: Dict[str, Any] = {}
+        counts = {}
+        with cursor_factory() as curs:
+            for k, op in enumerate(group):
+                if op.kind == 'commit':
+                    body.append("COMMIT;")
+                    continue
+                statement, stmt_binds = _rename_binds(op.statement.strip().rstrip(';'), op.parameters, f"p{k}_")
+                binds.update(stmt_binds)
+                counts[k] = curs.var(int)
+                binds[f"n{k}"] = counts[k]
+                body.append(f"{statement};\n:n{k} := SQL%ROWCOUNT;")
+            block = "BEGIN\n" + "\n".join(body) + "\nEND;"
+            try:
+                curs.execute(block, binds)
+                self.round_trips += 1
+            except oracledb.DatabaseError as e:
+                # El bloc es desfà sencer (com a molt hi ha un COMMIT i és al final): les tornem a executar una a
+                # una per saber quina falla.
+                logger.debug(f"Pipeline block failed, running its statements one by one: {e}")
+                self.round_trips += 1
+                for op in group:
+                    self._run_one(op, cursor_factory, commit)
+                return
+        for k, var in counts.items():
+            value = var.getvalue()
+            group[k].result.rowcount = int(value) if value is not None else None
+
+    def _run_one(self, op: _Op, cursor_factory: Callable, commit: Callable) -> None:
+        try:
+            if op.kind == 'commit':
+                commit()
+            else:
+                with cursor_factory() as curs:
+                    self._run_on_cursor(op, curs)
+            self.round_trips += 1
+        except oracledb.Error as e:
+            self.round_trips += 1
+            if not self.continue_on_error:
+                raise
+            op.result.error = e
+
+    @staticmethod
+    def _run_on_cursor(op: _Op, curs) -> None:
+        res = op.result
+        if op.kind == 'execute':
+            curs.execute(op.statement, op.parameters)
+            res.rowcount = curs.rowcount
+        elif op.kind == 'executemany':
+            curs.executemany(op.statement, op.parameters)
+            res.rowcount = curs.rowcount
+        elif op.kind == 'fetchone':
+            row = curs.execute(op.statement, op.parameters).fetchone()
+            res.rows = [row] if row is not None else []
+        elif op.kind == 'fetchmany':
+            num_rows = op.extra['num_rows'] or curs.arraysize
+            curs.arraysize = num_rows
+            curs.prefetchrows = num_rows + 1
+            res.rows = curs.execute(op.statement, op.parameters).fetchmany(num_rows)
+        elif op.kind == 'fetchall':
+            res.rows = curs.execute(op.statement, op.parameters).fetchall()
+        elif op.kind == 'callproc':
+            curs.callproc(op.statement, op.parameters or [])
+        elif op.kind == 'callfunc':
+            res.return_value = curs.callfunc(op.statement, op.extra['return_type'], op.parameters or [])
+
+
+def _rename_binds(statement: str, parameters: Any, prefix: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Reanomena les variables d'enllaç d'una sentència afegint-hi `prefix`, perquè se'n puguin posar diverses en un
+    mateix bloc PL/SQL. Les variables posicionals s'assignen per ordre d'aparició.
+
+    Llança `KeyError` si una variable amb nom no és al diccionari de paràmetres: al bloc PL/SQL quedaria a NULL
+    sense cap error.
+    """
+    binds = {}
+    position = [0]
+    if parameters is None:
+        parameters = []
+
+    def replace(match):
+        name = match.group(5)
+        if name is None:
+            return match.group(0)
+        if isinstance(parameters, dict):
+            key = next((k for k in (name, name.upper(), name.lower()) if k in parameters), None)
+            if key is None:
+                raise KeyError(f"Falta el valor de la variable d'enllaç :{name}")
+            value = parameters[key]
+            new = f"{prefix}{name}"
+        else:
+            value = parameters[position[0]]
+            new = f"{prefix}{position[0]}"
+            position[0] += 1
+        binds[new] = value
+        return f":{new}"
+
+    return _SQL_TOKENS.sub(replace, statement), binds
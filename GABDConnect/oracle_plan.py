@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Plans d'execució i informes de SQL Monitor com a dades, per poder-los inspeccionar i comprovar en tests sense passar
+per SQL Developer. `ExecutionPlan` és la llista de passos del pla (operació, objecte, cost, cardinalitat, predicats i,
+si s'han recollit, les estadístiques reals de cada pas) més el text de `DBMS_XPLAN`.
+
+    pla = db.explain("SELECT * FROM vendes WHERE client = :1")
+    assert not pla.full_scans("VENDES")
+"""
+
+import logging
+import re
+import uuid
+from collections import namedtuple
+from typing import List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PlanStep = namedtuple('PlanStep', ['id', 'parent_id', 'depth', 'operation', 'options', 'object_owner', 'object_name',
+                                   'cost', 'cardinality', 'bytes', 'time', 'access_predicates', 'filter_predicates',
+                                   'starts', 'actual_rows', 'elapsed', 'buffer_gets', 'disk_reads'])
+
+_PLAN_TABLE_SQL = """
+SELECT id, parent_id, depth, operation, options, object_owner, object_name, cost, cardinality, bytes, time,
+       access_predicates, filter_predicates
+  FROM plan_table
+ WHERE statement_id = :1
+ ORDER BY id"""
+
+_CURSOR_PLAN_SQL = """
+SELECT id, parent_id, depth, operation, options, object_owner, object_name, cost, cardinality, bytes, time,
+       access_predicates, filter_predicates, last_starts, last_output_rows, last_elapsed_time, last_cr_buffer_gets,
+       last_disk_reads, plan_hash_value
+  FROM v$sql_plan_statistics_all
+ WHERE sql_id = :1 AND child_number = :2
+ ORDER BY id"""
+
+_LAST_STATEMENT_SQL = """
+SELECT prev_sql_id, prev_child_number FROM v$session WHERE sid = sys_context('USERENV', 'SID')"""
+
+_HINTABLE = re.compile(r"\b(SELECT|INSERT|UPDATE|DELETE|MERGE)\b(\s*/\*\+)?", re.IGNORECASE)
+
+
+def add_hint(sql: str, hint: str) -> str:
+    """
+    Afegeix `hint` al primer SELECT, INSERT, UPDATE, DELETE o MERGE de la sentència, dins del comentari de hints
+    que ja hi hagi o en un de nou.
+    """
+    match = _HINTABLE.search(sql)
+    if match is None:
+        raise ValueError("La sentència no és una consulta ni una DML")
+    if match.group(2):
+        return f"{sql[:match.end()]} {hint}{sql[match.end():]}"
+    return f"{sql[:match.end(1)]} /*+ {hint} */{sql[match.end(1):]}"
+
+
+class ExecutionPlan:
+    """
+    Pla d'execució d'una sentència.
+
+    Atributs:
+    ----------
+    steps : list
+        `PlanStep` per ordre d'id. `starts`, `actual_rows`, `elapsed` (segons), `buffer_gets` i `disk_reads` només
+        tenen valor en els plans amb estadístiques reals (vegeu `oracleConnection.plan_statistics`).
+    sql_id : str
+        SQL_ID de la sentència, per als plans llegits de la memòria del servidor.
+    plan_hash_value : int
+        Identificador del pla, per als plans llegits de la memòria del servidor.
+    text : str
+        Sortida de `DBMS_XPLAN`.
+    """
+
+    __slots__ = ['steps', 'sql_id', 'plan_hash_value', 'text']
+
+    def __init__(self, steps: List[PlanStep], sql_id: Optional[str] = None, plan_hash_value: Optional[int] = None,
+                 text: str = ""):
+        self.steps = steps
+        self.sql_id = sql_id
+        self.plan_hash_value = plan_hash_value
+        self.text = text
+
+    @property
+    def cost(self) -> Optional[int]:
+        """Cost total estimat (el del primer pas)."""
+        return self.steps[0].cost if self.steps else None
+
+    @property
+    def cardinality(self) -> Optional[int]:
+        """Files estimades del resultat."""
+        return self.steps[0].cardinality if self.steps else None
+
+    def find(self, operation: Optional[str] = None, options: Optional[str] = None,
+             object_name: Optional[str] = None) -> List[PlanStep]:
+        """Passos que coincideixen amb l'operació, les opcions i l'objecte indicats (sense distingir majúscules)."""
+        def match(value, wanted):
+            return wanted is None or (value or "").upper() == wanted.upper()
+
+        return [s for s in self.steps
+                if match(s.operation, operation) and match(s.options, options) and match(s.object_name, object_name)]
+
+    def full_scans(self, object_name: Optional[str] = None) -> List[PlanStep]:
+        """Recorreguts complets de taules i índexs (`TABLE ACCESS FULL`, `INDEX FULL SCAN`, ...)."""
+        return [s for s in self.steps if (s.options or "").upper() in ('FULL', 'FULL SCAN', 'FAST FULL SCAN')
+                and (object_name is None or (s.object_name or "").upper() == object_name.upper())]
+
+    def access_paths(self) -> List[str]:
+        """Com s'accedeix a cada objecte: `'TABLE ACCESS FULL VENDES'`, `'INDEX RANGE SCAN VENDES_IX'`, ..."""
+        return [" ".join(filter(None, (s.operation, s.options, s.object_name)))
+                for s in self.steps if s.object_name]
+
+    def misestimates(self, factor: float = 10.0) -> List[PlanStep]:
+        """
+        Passos en què les files reals per execució difereixen de les estimades més d'un factor `factor`. Cal un pla
+        amb estadístiques reals.
+        """
+        res = []
+        for s in self.steps:
+            if s.actual_rows is None or not s.starts or s.cardinality is None:
+                continue
+            actual = s.actual_rows / s.starts
+            estimated = max(s.cardinality, 1)
+            if max(actual, 1) / estimated > factor or estimated / max(actual, 1) > factor:
+                res.append(s)
+        return res
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def __str__(self):
+        if self.text:
+            return self.text
+        return "\n".join(f"{'  ' * (s.depth or 0)}{s.id} {s.operation} {s.options or ''} {s.object_name or ''}"
+                         f" (cost={s.cost}, rows={s.cardinality})" for s in self.steps)
+
+    def __repr__(self):
+        return f"<ExecutionPlan sql_id={self.sql_id} cost={self.cost} steps={len(self.steps)}>"
+
+
+def explain_plan(curs, sql: str) -> ExecutionPlan:
+    """
+    Pla estimat d'una sentència amb `EXPLAIN PLAN` (no l'executa). Els passos es llegeixen de `PLAN_TABLE` i
+    s'hi esborren després, sense fer commit: la sessió queda amb una transacció oberta (sense canvis) fins al pròxim
+    commit o rollback.
+    """
+    statement_id = f"GABD_{uuid.uuid4().hex[:20].upper()}"
+    curs.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}")
+    try:
+        steps = [PlanStep(*row, None, None, None, None, None)
+                 for row in curs.execute(_PLAN_TABLE_SQL, [statement_id]).fetchall()]
+        text = "\n".join(r[0] for r in curs.execute(
+            "SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :1, 'TYPICAL'))",
+            [statement_id]).fetchall())
+    finally:
+        curs.execute("DELETE FROM plan_table WHERE statement_id = :1", [statement_id])
+    return ExecutionPlan(steps, text=text)
+
+
+def last_statement(curs) -> tuple:
+    """(SQL_ID, número de fill) de la darrera sentència executada a la sessió abans d'aquesta consulta."""
+    return tuple(curs.execute(_LAST_STATEMENT_SQL).fetchone())
+
+
+def cursor_plan(curs, sql_id: str, child_number: int = 0, format: str = 'ALLSTATS LAST') -> ExecutionPlan:
+    """
+    Pla que fa servir el servidor per a un cursor de la memòria compartida, amb les estadístiques reals de la
+    darrera execució si s'han recollit (`gather_plan_statistics` o `statistics_level = ALL`).
+    """
+    rows = curs.execute(_CURSOR_PLAN_SQL, [sql_id, child_number]).fetchall()
+    if not rows:
+        raise ValueError(f"No hi ha cap pla per al SQL_ID {sql_id} (fill {child_number}) a la memòria del servidor")
+    steps = [PlanStep(*row[:15], row[15] / 1e6 if row[15] is not None else None, *row[16:18]) for row in rows]
+    text = "\n".join(r[0] for r in curs.execute(
+        "SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY_CURSOR(:1, :2, :3))",
+        [sql_id, child_number, format]).fetchall())
+    return ExecutionPlan(steps, sql_id=sql_id, plan_hash_value=rows[0][18], text=text)
+
+
+def monitor_report(curs, sql_id: Optional[str] = None, report_type: str = 'TEXT') -> str:
+    """
+    Informe de SQL Monitor (`DBMS_SQLTUNE.REPORT_SQL_MONITOR`) de la darrera execució monitoritzada de `sql_id`, o
+    de la darrera sentència monitoritzada si és None. Cal el Tuning Pack.
+    """
+    row = curs.execute("""SELECT DBMS_SQLTUNE.REPORT_SQL_MONITOR(sql_id => :1, type => :2, report_level => 'ALL')
+                            FROM dual""", [sql_id, report_type], fetch_lobs=False).fetchone()
+    return row[0] or ""
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Perfilat de les sentències executades amb els cursors d'`oracleConnection`. Per a cada sentència, `StatementProfiler`
+anota el SQL_ID, el temps total (execució més lectura de files), les files llegides, una estimació dels viatges
+d'anada i tornada de lectura i, opcionalment, la diferència de les estadístiques de la sessió a `v$mystat` (parse,
+execucions, lectures lògiques, temps de base de dades, viatges i bytes de SQL*Net). Comparar el temps total amb el
+`DB time` del servidor permet separar el temps de xarxa i túnel del temps de SQL.
+
+Els registres s'envien a les funcions registrades amb `add_callback` i s'agreguen per SQL_ID per fer-ne un rànquing
+(`top`). Amb el perfilat desactivat, els cursors no fan cap feina addicional.
+"""
+
+import hashlib
+import logging
+import math
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SERVER_STATISTICS = (
+    'parse count (total)',
+    'parse count (hard)',
+    'execute count',
+    'session logical reads',
+    'physical reads',
+    'DB time',
+    'CPU used by this session',
+    'SQL*Net roundtrips to/from client',
+    'bytes sent via SQL*Net to client',
+    'bytes received via SQL*Net from client',
+)
+
+_SNAPSHOT_SQL = ("SELECT n.name, s.value FROM v$mystat s JOIN v$statname n ON n.statistic# = s.statistic# "
+                 "WHERE n.name IN (" + ", ".join(f"'{name}'" for name in SERVER_STATISTICS) + ")")
+
+_SQL_ID_ALPHABET = "0123456789abcdfghjkmnpqrstuvwxyz"
+
+
+def sql_id(statement: str) -> str:
+    """
+    SQL_ID que Oracle assigna al text de la sentència (el mateix de `v$sql`): els darrers 64 bits de l'MD5 del text
+    acabat en NUL, en base 32.
+    """
+    digest = hashlib.md5(statement.encode("utf-8") + b"\x00").digest()
+    msb, lsb = struct.unpack("<II", digest[8:16])
+    value = (msb << 32) | lsb
+    chars = []
+    for _ in range(13):
+        value, rem = divmod(value, 32)
+        chars.append(_SQL_ID_ALPHABET[rem])
+    return "".join(reversed(chars))
+
+
+class StatementRecord:
+    """
+    Mesures d'una execució.
+
+    Atributs:
+    ----------
+    sql_id, sql : str
+        SQL_ID i text de la sentència.
+    started : float
+        Inici (`time.time()`).
+    elapsed : float
+        Segons entre l'execució i la darrera fila llegida (o el tancament del cursor).
+    execute_time, fetch_time : float
+        Segons dins de `execute` i dins de les crides de lectura.
+    rows : int
+        Files llegides (consultes) o afectades (DML).
+    fetch_round_trips : int
+        Estimació dels viatges de lectura posteriors a l'execució, a partir de `prefetchrows` i `arraysize`.
+    server : dict
+        Diferència de `SERVER_STATISTICS` a `v$mystat`, si s'han demanat. None altrament.
+    error : str
+        Missatge d'error si l'execució ha fallat.
+    """
+
+    __slots__ = ['sql_id', 'sql', 'started', 'elapsed', 'execute_time', 'fetch_time', 'rows', 'fetch_round_trips',
+                 'server', 'error', '_t0', '_prefetchrows', '_arraysize', '_snapshot', '_finished']
+
+    def __init__(self, statement: str, prefetchrows: int, arraysize: int):
+        self.sql_id = sql_id(statement)
+        self.sql = statement
+        self.started = time.time()
+        self.elapsed = 0.0
+        self.execute_time = 0.0
+        self.fetch_time = 0.0
+        self.rows = 0
+        self.fetch_round_trips = 0
+        self.server = None
+        self.error = None
+        self._t0 = time.perf_counter()
+        self._prefetchrows = prefetchrows
+        self._arraysize = arraysize
+        self._snapshot = None
+        self._finished = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith('_')}
+
+    def __repr__(self):
+        return (f"<StatementRecord {self.sql_id} {self.elapsed * 1e3:.1f} ms rows={self.rows} "
+                f"fetch_round_trips={self.fetch_round_trips}>")
+
+
+class StatementProfiler:
+    """
+    Recull els `StatementRecord` dels cursors d'una connexió (segur entre fils).
+    """
+
+    def __init__(self, server_stats: bool = False, max_statements: int = 1000, recent: int = 1000):
+        """
+        Paràmetres:
+        -----------
+        server_stats : bool
+            Si és True, consulta `v$mystat` abans i després de cada sentència (dos viatges més per sentència). Cal
+            poder llegir `v$mystat` i `v$statname`.
+        max_statements : int
+            Nombre màxim de sentències diferents que s'agreguen. En superar-lo s'oblida la menys recent.
+        recent : int
+            Nombre de registres recents que es guarden.
+        """
+        self.server_stats = server_stats
+        self.max_statements = max_statements
+        self.callbacks: List[Callable[[StatementRecord], None]] = []
+        self.recent = deque(maxlen=recent)
+        self._stats: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._baseline: Dict[Any, Dict[str, int]] = {}
+
+    def add_callback(self, callback: Callable[[StatementRecord], None]) -> None:
+        """Registra una funció que rep cada `StatementRecord` en acabar la sentència."""
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[StatementRecord], None]) -> None:
+        self.callbacks.remove(callback)
+
+    # --- Estadístiques del servidor ------------------------------------------------------------------------------
+
+    def _snapshot(self, connection) -> Optional[Dict[str, int]]:
+        try:
+            with connection.cursor() as curs:
+                return {name: int(value) for name, value in curs.execute(_SNAPSHOT_SQL).fetchall()}
+        except Exception as e:
+            logger.warning(f"Could not read v$mystat, server statistics disabled: {e}")
+            self.server_stats = False
+            return None
+
+    def _overhead(self, connection) -> Dict[str, int]:
+        """Estadístiques que genera la mateixa consulta a `v$mystat`, per descomptar-les de les diferències."""
+        key = id(connection)
+        if key not in self._baseline:
+            first = self._snapshot(connection)
+            second = self._snapshot(connection) if first is not None else None
+            self._baseline[key] = {k: second[k] - first[k] for k in first} if second is not None else {}
+        return self._baseline[key]
+
+    # --- Cicle de vida d'un registre -----------------------------------------------------------------------------
+
+    def start(self, cursor, statement: str, connection) -> StatementRecord:
+        record = StatementRecord(statement, cursor.prefetchrows, cursor.arraysize)
+        if self.server_stats:
+            self._overhead(connection)
+            record._snapshot = self._snapshot(connection)
+        return record
+
+    def finish(self, record: StatementRecord, connection) -> None:
+        if record._finished:
+            return
+        record._finished = True
+        record.elapsed = time.perf_counter() - record._t0
+        if record._arraysize and record.rows >= record._prefetchrows and record.fetch_time:
+            record.fetch_round_trips = math.ceil((record.rows - record._prefetchrows + 1) / record._arraysize)
+
+        if record._snapshot is not None and self.server_stats:
+            after = self._snapshot(connection)
+            if after is not None:
+                overhead = self._baseline.get(id(connection), {})
+                record.server = {k: after[k] - record._snapshot[k] - overhead.get(k, 0) for k in after}
+
+        self._aggregate(record)
+        for callback in list(self.callbacks):
+            try:
+                callback(record)
+            except Exception as e:
+                logger.warning(f"Profiler callback {callback!r} failed: {e}")
+
+    def _aggregate(self, record: StatementRecord) -> None:
+        with self._lock:
+            self.recent.append(record)
+            st = self._stats.get(record.sql_id)
+            if st is None:
+                st = {'sql_id': record.sql_id, 'sql': record.sql, 'executions': 0, 'errors': 0, 'elapsed': 0.0,
+                      'max_elapsed': 0.0, 'rows': 0, 'fetch_round_trips': 0, 'server': {}}
+                self._stats[record.sql_id] = st
+                while len(self._stats) > self.max_statements:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(record.sql_id)
+            st['executions'] += 1
+            st['errors'] += record.error is not None
+            st['elapsed'] += record.elapsed
+            st['max_elapsed'] = max(st['max_elapsed'], record.elapsed)
+            st['rows'] += record.rows
+            st['fetch_round_trips'] += record.fetch_round_trips
+            for k, v in (record.server or {}).items():
+                st['server'][k] = st['server'].get(k, 0) + v
+
+    # --- Informes ------------------------------------------------------------------------------------------------
+
+    def top(self, n: int = 10, by: str = 'elapsed') -> List[Dict[str, Any]]:
+        """
+        Les `n` sentències amb més `by`: 'elapsed' (temps total), 'avg_elapsed', 'max_elapsed', 'executions',
+        'rows', 'fetch_round_trips' o el nom d'una estadística del servidor.
+        """
+        with self._lock:
+            stats = [{**st, 'server': dict(st['server'])} for st in self._stats.values()]
+        for st in stats:
+            st['avg_elapsed'] = st['elapsed'] / st['executions']
+
+        def key(st):
+            return st[by] if by in st else st['server'].get(by, 0)
+
+        return sorted(stats, key=key, reverse=True)[:n]
+
+    def report(self, n: int = 10, by: str = 'elapsed') -> str:
+        """Rànquing de `top` en format de taula."""
+        lines = [f"{'sql_id':13}  {'execs':>6}  {'total ms':>10}  {'avg ms':>9}  {'rows':>9}  {'fetch rt':>8}  sql"]
+        for st in self.top(n, by):
+            sql = " ".join(st['sql'].split())
+            lines.append(f"{st['sql_id']:13}  {st['executions']:>6}  {st['elapsed'] * 1e3:>10.1f}  "
+                         f"{st['avg_elapsed'] * 1e3:>9.2f}  {st['rows']:>9}  {st['fetch_round_trips']:>8}  "
+                         f"{sql[:60]}")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.recent.clear()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Instantànies de les estadístiques del servidor abans i després d'un bloc de codi, per saber què ha costat: lectures
+lògiques i físiques, redo, parses, commits, viatges de SQL*Net i esperes. Cada instantània és una sola consulta que
+llegeix alhora `v$mystat` i `v$session_event` (la sessió) i `v$sysstat` i `v$system_event` (tota la instància), o
+només les vistes que els privilegis de l'usuari permeten llegir.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import oracledb
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Consulta de cada font: (font, nom, valor, esperes)
+SOURCES = {
+    'session': """SELECT 'session', n.name, s.value, NULL FROM v$mystat s
+                    JOIN v$statname n ON n.statistic# = s.statistic#""",
+    'session_event': """SELECT 'session_event', event, time_waited_micro, total_waits FROM v$session_event
+                         WHERE sid = sys_context('USERENV', 'SID') AND wait_class <> 'Idle'""",
+    'system': "SELECT 'system', name, value, NULL FROM v$sysstat",
+    'system_event': """SELECT 'system_event', event, time_waited_micro, total_waits FROM v$system_event
+                        WHERE wait_class <> 'Idle'""",
+}
+SCOPES = {
+    'session': ('session', 'session_event'),
+    'system': ('system', 'system_event'),
+    'both': ('session', 'session_event', 'system', 'system_event'),
+}
+
+# Estadístiques que es mostren primer a l'informe
+KEY_STATISTICS = (
+    'DB time',
+    'CPU used by this session',
+    'session logical reads',
+    'physical reads',
+    'redo size',
+    'parse count (total)',
+    'parse count (hard)',
+    'execute count',
+    'user commits',
+    'sorts (disk)',
+    'SQL*Net roundtrips to/from client',
+    'bytes sent via SQL*Net to client',
+    'bytes received via SQL*Net from client',
+)
+
+Snapshot = Dict[str, Dict[str, Tuple[int, Optional[int]]]]
+
+
+def accessible_sources(curs, sources) -> List[str]:
+    """Fonts que l'usuari pot llegir (una consulta buida per font)."""
+    res = []
+    for source in sources:
+        try:
+            curs.execute(f"SELECT * FROM ({SOURCES[source]}) WHERE 1 = 0").fetchall()
+            res.append(source)
+        except oracledb.DatabaseError as e:
+            logger.warning(f"Cannot read {source} statistics: {e}")
+    return res
+
+
+def take_snapshot(curs, sources) -> Snapshot:
+    """Valors actuals de les fonts indicades, amb una sola consulta."""
+    snap: Snapshot = {source: {} for source in sources}
+    if not sources:
+        return snap
+    sql = "\nUNION ALL\n".join(SOURCES[source] for source in sources)
+    for source, name, value, waits in curs.execute(sql).fetchall():
+        snap[source][name] = (int(value or 0), int(waits) if waits is not None else None)
+    return snap
+
+
+class StatsReport:
+    """
+    Diferència entre dues instantànies.
+
+    Atributs:
+    ----------
+    elapsed : float
+        Segons entre les dues instantànies.
+    session, system : dict
+        Diferència de cada estadística de `v$mystat` i `v$sysstat` que ha canviat, pel nom.
+    session_events, system_events : dict
+        Esperes no inactives que han canviat, per esdeveniment: `waits` (nombre) i `time` (segons).
+    sources : list
+        Fonts que s'han pogut llegir.
+    """
+
+    __slots__ = ['elapsed', 'session', 'system', 'session_events', 'system_events', 'sources']
+
+    def __init__(self, before: Optional[Snapshot] = None, after: Optional[Snapshot] = None, elapsed: float = 0.0):
+        self.compute(before, after, elapsed)
+
+    def compute(self, before: Optional[Snapshot], after: Optional[Snapshot], elapsed: float) -> None:
+        """Calcula les diferències entre les instantànies `before` i `after`."""
+        self.elapsed = elapsed
+        self.sources = list(after or {})
+        before, after = before or {}, after or {}
+        self.session = _stat_deltas(before.get('session', {}), after.get('session', {}))
+        self.system = _stat_deltas(before.get('system', {}), after.get('system', {}))
+        self.session_events = _event_deltas(before.get('session_event', {}), after.get('session_event', {}))
+        self.system_events = _event_deltas(before.get('system_event', {}), after.get('system_event', {}))
+
+    def __getitem__(self, name: str) -> int:
+        """Diferència d'una estadística de la sessió o, si no s'ha llegit la sessió, de la instància."""
+        stats = self.session if 'session' in self.sources else self.system
+        return stats.get(name, 0)
+
+    def top(self, n: int = 10, source: str = 'session') -> List[Tuple[str, int]]:
+        """Les `n` estadístiques (o esperes, amb `source='session_events'` o `'system_events'`) que més han crescut."""
+        values = getattr(self, source)
+        if source.endswith('events'):
+            return sorted(((k, v['time']) for k, v in values.items()), key=lambda kv: kv[1], reverse=True)[:n]
+        return sorted(values.items(), key=lambda kv: kv[1], reverse=True)[:n]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __str__(self):
+        lines = [f"Temps: {self.elapsed:.3f} s"]
+        for title, stats in (('Sessió', self.session), ('Instància', self.system)):
+            if not stats:
+                continue
+            lines.append(f"{title}:")
+            keys = [k for k in KEY_STATISTICS if k in stats]
+            keys += [k for k, _ in sorted(stats.items(), key=lambda kv: kv[1], reverse=True) if k not in keys][:10]
+            lines += [f"  {k:45} {stats[k]:>15,}" for k in keys]
+        for title, events in (('Esperes de la sessió', self.session_events),
+                              ('Esperes de la instància', self.system_events)):
+            if not events:
+                continue
+            lines.append(f"{title}:")
+            for event, ev in sorted(events.items(), key=lambda kv: kv[1]['time'], reverse=True)[:10]:
+                lines.append(f"  {event:45} {ev['waits']:>9,} esperes {ev['time']:>10.3f} s")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return (f"<StatsReport {self.elapsed:.3f} s logical_reads={self['session logical reads']} "
+                f"redo={self['redo size']}>")
+
+
+def _stat_deltas(before, after) -> Dict[str, int]:
+    deltas = {}
+    for name, (value, _) in after.items():
+        delta = value - before.get(name, (0, None))[0]
+        if delta:
+            deltas[name] = delta
+    return deltas
+
+
+def _event_deltas(before, after) -> Dict[str, Dict[str, float]]:
+    deltas = {}
+    for event, (micro, waits) in after.items():
+        micro0, waits0 = before.get(event, (0, 0))
+        if waits != waits0 or micro != micro0:
+            deltas[event] = {'waits': (waits or 0) - (waits0 or 0), 'time': (micro - micro0) / 1e6}
+    return deltas
+
+
+class StatsSnapshot:
+    """
+    Context que pren una instantània en entrar i una altra en sortir i deixa la diferència a l'informe que retorna
+    el `with`. S'obté amb `oracleConnection.stats_snapshot()`.
+    """
+
+    def __init__(self, cursor_factory, sources: List[str]):
+        """
+        Paràmetres:
+        -----------
+        cursor_factory : callable
+            Funció que retorna un cursor de la sessió que es vol mesurar.
+        sources : list
+            Fonts de `SOURCES` que es llegeixen.
+        """
+        self._cursor_factory = cursor_factory
+        self.sources = sources
+        self.report = StatsReport()
+        self._before = None
+        self._start = 0.0
+
+    def __enter__(self) -> StatsReport:
+        with self._cursor_factory() as curs:
+            self._before = take_snapshot(curs, self.sources)
+        self._start = time.perf_counter()
+        return self.report
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self._start
+        with self._cursor_factory() as curs:
+            after = take_snapshot(curs, self.sources)
+        self.report.compute(self._before, after, elapsed)
@@ -10,10 +10,14 @@ import socket
 import threading
 import time
 import logging
-from contextlib import closing
-from typing import Tuple, List, Optional, Dict, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from typing import Tuple, List, Optional, Dict, Any, Union
 import paramiko
 
+from .tunnel_capture import TrafficRecorder, CLIENT_TO_SERVER, SERVER_TO_CLIENT
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -37,14 +41,233 @@ def get_free_port(host: str = "localhost") -> int:
         return s.getsockname()[1]
 
 
+def parse_bastions(ssh_host: Union[str, Tuple[str, int], List[Any]], ssh_port: int = 22) -> List[Tuple[str, int]]:
+    """
+    Normalitza la llista de bastions candidats. Cada element pot ser `"host"`, `"host:port"` o `(host, port)`; si
+    no s'indica port es fa servir `ssh_port`.
+
+    :return: llista de tuples (host, port)
+    """
+    if isinstance(ssh_host, str) or (isinstance(ssh_host, tuple) and len(ssh_host) == 2
+                                     and isinstance(ssh_host[1], int)):
+        ssh_host = [ssh_host]
+
+    res = []
+    for h in ssh_host:
+        if isinstance(h, str):
+            host, _, port = h.partition(':')
+            res.append((host, int(port) if port else int(ssh_port)))
+        elif isinstance(h, (tuple, list)) and len(h) == 2:
+            res.append((str(h[0]), int(h[1])))
+        else:
+            raise ValueError(f"Bastió '{h}' no vàlid. Ha de ser 'host', 'host:port' o (host, port)")
+    if not res:
+        raise ValueError("Cal indicar com a mínim un servidor SSH")
+    return res
+
+
+def probe_bastion(host: str, port: int, timeout: float = 5.0) -> float:
+    """
+    Mesura el temps (en segons) de connexió TCP i de recepció del banner SSH d'un bastió.
+
+    :return: temps de resposta o `float('inf')` si no respon
+    """
+    start = time.perf_counter()
+    try:
+        with closing(socket.create_connection((host, port), timeout=timeout)) as s:
+            s.settimeout(timeout)
+            if not s.recv(64).startswith(b"SSH-"):
+                return float('inf')
+    except (OSError, socket.timeout):
+        return float('inf')
+    return time.perf_counter() - start
+
+
+def rank_bastions(bastions: List[Tuple[str, int]], timeout: float = 5.0) -> List[Tuple[Tuple[str, int], float]]:
+    """
+    Mesura en paral·lel tots els bastions i els retorna ordenats del més ràpid al més lent.
+
+    :return: llista de tuples ((host, port), rtt)
+    """
+    with ThreadPoolExecutor(max_workers=min(len(bastions), 8)) as pool:
+        rtts = list(pool.map(lambda b: probe_bastion(b[0], b[1], timeout), bastions))
+    return sorted(zip(bastions, rtts), key=lambda x: x[1])
+
+
+# Classes de prioritat dels forwards
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+# Finestra i mida de paquet dels canals de tipus bulk. Amb una finestra petita el servidor no pot tenir gaires bytes
+# en vol per aquests canals i el trànsit interactiu no queda encuat darrere d'una transferència gran.
+BULK_WINDOW_SIZE = 4 * 2 ** 16
+BULK_MAX_PACKET_SIZE = 2 ** 14
+
+
+class TokenBucket:
+    """
+    Limitador de velocitat (bytes/s) de tipus token bucket, segur entre fils.
+
+    Es permet endeutar-se: `consume` resta els bytes i, si el compte queda en negatiu, dorm el temps necessari per
+    tornar-lo a zero. Així la velocitat mitjana respecta `rate` encara que els blocs siguin més grans que `burst`.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate is None or rate <= 0:
+            raise ValueError(f"La velocitat '{rate}' no és vàlida. Ha de ser un nombre de bytes/s positiu")
+        self.rate = float(rate)
+        self.capacity = float(burst) if burst is not None else max(self.rate / 10, 65536.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes: int) -> float:
+        """Consumeix `nbytes` i bloqueja si cal. Retorna el temps d'espera en segons."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= nbytes
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class TransportScheduler:
+    """
+    Reparteix l'amplada de banda d'un transport SSH entre els seus forwards.
+
+    Els enviaments interactius passen sempre primer: mentre n'hi ha algun en curs, els enviaments bulk esperen (com a
+    molt `bulk_max_wait` segons per no morir de gana). Opcionalment aplica un límit global `max_rate` (bytes/s) al
+    transport sencer.
+
+    S'aplica en tots dos sentits. En la pujada (local -> remot) l'espera és abans d'enviar pel canal; en la baixada
+    (remot -> local) és abans de tornar a llegir del canal, de manera que el servidor no rep l'ajust de finestra i
+    deixa d'enviar-ne més fins que el canal torna a tenir torn.
+    """
+
+    def __init__(self, max_rate: Optional[float] = None, bulk_max_wait: float = 0.05):
+        self._bucket = TokenBucket(max_rate) if max_rate else None
+        self._bulk_max_wait = bulk_max_wait
+        self._interactive = 0
+        self._cond = threading.Condition()
+
+    @property
+    def max_rate(self) -> Optional[float]:
+        return self._bucket.rate if self._bucket is not None else None
+
+    @contextmanager
+    def slot(self, nbytes: int, priority: str = PRIORITY_INTERACTIVE):
+        """
+        Context que delimita un enviament de `nbytes` pel transport. Retorna (via `as`) una llista amb el temps que
+        s'ha esperat abans de poder enviar.
+        """
+        waited = [0.0]
+        start = time.monotonic()
+        if priority == PRIORITY_BULK:
+            with self._cond:
+                deadline = start + self._bulk_max_wait
+                while self._interactive > 0:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+        else:
+            with self._cond:
+                self._interactive += 1
+
+        try:
+            if self._bucket is not None:
+                self._bucket.consume(nbytes)
+            waited[0] = time.monotonic() - start
+            yield waited
+        finally:
+            if priority != PRIORITY_BULK:
+                with self._cond:
+                    self._interactive -= 1
+                    if self._interactive == 0:
+                        self._cond.notify_all()
+
+
+class AdmissionGate:
+    """
+    Semàfor comptador amb cua FIFO i temps d'espera, per limitar les connexions concurrents d'un forward o els canals
+    oberts d'un transport.
+    """
+
+    def __init__(self, limit: int):
+        if limit is None or int(limit) < 1:
+            raise ValueError(f"El límit de connexions '{limit}' no és vàlid. Ha de ser un enter positiu")
+        self.limit = int(limit)
+        self._active = 0
+        self._waiters = deque()
+        self._cond = threading.Condition()
+
+    @property
+    def in_use(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ocupa una plaça. Espera com a molt `timeout` segons (None, indefinidament; 0, sense esperar) respectant
+        l'ordre d'arribada. Retorna False si no s'ha pogut ocupar.
+        """
+        with self._cond:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return True
+            if timeout is not None and timeout <= 0:
+                return False
+
+            ticket = object()
+            self._waiters.append(ticket)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            try:
+                while not (self._waiters[0] is ticket and self._active < self.limit):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                self._active += 1
+                return True
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+
+    def release(self):
+        """Allibera una plaça."""
+        with self._cond:
+            self._active = max(0, self._active - 1)
+            self._cond.notify_all()
+
+
 class TunnelHandler(threading.Thread):
     """Handles data forwarding between local socket and SSH channel."""
 
-    def __init__(self, channel, local_socket):
+    def __init__(self, channel, local_socket, limiter: Optional[TokenBucket] = None,
+                 scheduler: Optional[TransportScheduler] = None, priority: str = PRIORITY_INTERACTIVE,
+                 on_close=None, recorder: Optional[TrafficRecorder] = None, remote: Tuple[str, int] = ("", 0)):
         super().__init__(daemon=True)
         self.channel = channel
         self.local_socket = local_socket
+        self.on_close = on_close  # es crida en acabar, p. ex. per alliberar la plaça d'admissió
+        # Captura opcional del trànsit de la connexió (vegeu `SSHTunnel.start_capture`)
+        self.recorder = recorder
+        self.conn_id = recorder.open_connection(remote) if recorder is not None else None
+        self.limiter = limiter
+        self.scheduler = scheduler
+        self.priority = priority
         self._running = True
+        self.bytes_sent = 0  # local -> remot
+        self.bytes_received = 0  # remot -> local
+        self.throttled = 0.0  # segons esperant el limitador o el planificador
 
     def stop(self):
         self._running = False
@@ -54,36 +277,62 @@ class TunnelHandler(threading.Thread):
             while self._running:
                 # Use select with timeout to allow clean shutdown
                 ready, _, _ = select.select([self.local_socket, self.channel], [], [], 0.5)
-
-                if not ready:
-                    continue
-
-                if self.local_socket in ready:
-                    try:
-                        data = self.local_socket.recv(4096)  # Increased buffer size
-                        if not data:
-                            break
-                        if not self.channel.closed:
-                            self.channel.send(data)
-                    except (OSError, socket.error) as e:
-                        logger.debug(f"Local socket error: {e}")
-                        break
-
-                if self.channel in ready:
-                    try:
-                        data = self.channel.recv(4096)  # Increased buffer size
-                        if not data:
-                            break
-                        self.local_socket.send(data)
-                    except (OSError, socket.error) as e:
-                        logger.debug(f"Channel error: {e}")
-                        break
-
+                if self.local_socket in ready and not self._upload():
+                    break
+                if self.channel in ready and not self._download():
+                    break
         except Exception as e:
             logger.error(f"Handler error: {e}")
         finally:
             self._cleanup()
 
+    def _upload(self) -> bool:
+        """Passa un bloc del socket local al canal. Retorna False si la connexió s'ha acabat."""
+        try:
+            data = self.local_socket.recv(4096)  # Increased buffer size
+            if not data:
+                return False
+            if self.recorder is not None:
+                self.recorder.record(self.conn_id, CLIENT_TO_SERVER, data)
+            if not self.channel.closed:
+                self._transfer(self.channel.sendall, data)
+                self.bytes_sent += len(data)
+            return True
+        except (OSError, socket.error) as e:
+            logger.debug(f"Local socket error: {e}")
+            return False
+
+    def _download(self) -> bool:
+        """Passa un bloc del canal al socket local. Retorna False si la connexió s'ha acabat."""
+        try:
+            data = self.channel.recv(4096)  # Increased buffer size
+            if not data:
+                return False
+            if self.recorder is not None:
+                self.recorder.record(self.conn_id, SERVER_TO_CLIENT, data)
+            # Retardar la lectura del canal retarda l'ajust de finestra i frena el servidor
+            self._transfer(self.local_socket.sendall, data)
+            self.bytes_received += len(data)
+            return True
+        except (OSError, socket.error) as e:
+            logger.debug(f"Channel error: {e}")
+            return False
+
+    def _transfer(self, send, data: bytes):
+        """Envia `data` amb `send` respectant el límit del forward i la prioritat i el límit del transport."""
+        self._shape(len(data))
+        if self.scheduler is None:
+            send(data)
+            return
+        with self.scheduler.slot(len(data), self.priority) as waited:
+            send(data)
+        self.throttled += waited[0]
+
+    def _shape(self, nbytes: int):
+        """Aplica el límit de velocitat del forward, si n'hi ha."""
+        if self.limiter is not None:
+            self.throttled += self.limiter.consume(nbytes)
+
     def _cleanup(self):
         """Clean up resources."""
         try:
@@ -97,19 +346,53 @@ class TunnelHandler(threading.Thread):
         except Exception as e:
             logger.debug(f"Error closing socket: {e}")
 
+        if self.recorder is not None:
+            self.recorder.close_connection(self.conn_id)
+
+        if self.on_close is not None:
+            self.on_close()
+            self.on_close = None
+
 
 class ForwardServer(threading.Thread):
     """Manages a single port forward."""
 
-    def     __init__(self, transport, local_port: int, remote_host: str, remote_port: int):
+    def     __init__(self, transport, local_port: int, remote_host: str, remote_port: int,
+                     rate_limit: Optional[float] = None, priority: str = PRIORITY_INTERACTIVE,
+                     scheduler: Optional[TransportScheduler] = None,
+                     max_connections: Optional[int] = None, queue_size: int = 64, queue_timeout: float = 30.0,
+                     channel_gate: Optional[AdmissionGate] = None):
         super().__init__(daemon=True)
+        if priority not in PRIORITIES:
+            raise ValueError(f"Prioritat '{priority}' no vàlida. Ha de ser una de {PRIORITIES}")
         self.transport = transport
         self.local_port = local_port
         self.remote_host = remote_host
         self.remote_port = remote_port
+        self.priority = priority
+        self.scheduler = scheduler
+        # El límit és per forward: totes les connexions del forward comparteixen el mateix bucket
+        self.limiter = TokenBucket(rate_limit) if rate_limit else None
+        # Control d'admissió: límit de connexions del forward i límit de canals del transport (compartit)
+        self.gate = AdmissionGate(max_connections) if max_connections else None
+        self.channel_gate = channel_gate
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._queued = 0
+        self._max_queued = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._admission_lock = threading.Lock()
+        self.recorder: Optional[TrafficRecorder] = None
         self._running = True
         self._handlers: List[TunnelHandler] = []
         self.server_socket = None
+        self._connections = 0
+        self._bytes_sent_done = 0
+        self._bytes_received_done = 0
+        self._throttled_done = 0.0
 
     def stop(self):
         """Stop the forward server and all handlers."""
@@ -132,7 +415,7 @@ class ForwardServer(threading.Thread):
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.server_socket.settimeout(1.0)  # Set timeout for accept()
             self.server_socket.bind(("localhost", self.local_port))
-            self.server_socket.listen(10)
+            self.server_socket.listen(socket.SOMAXCONN)
 
             logger.info(f"Forward server listening on localhost:{self.local_port}")
 
@@ -143,23 +426,7 @@ class ForwardServer(threading.Thread):
                         client_socket.close()
                         break
 
-                    try:
-                        channel = self.transport.open_channel(
-                            "direct-tcpip",
-                            (self.remote_host, self.remote_port),
-                            addr
-                        )
-
-                        handler = TunnelHandler(channel, client_socket)
-                        self._handlers.append(handler)
-                        handler.start()
-
-                        # Clean up finished handlers
-                        self._handlers = [h for h in self._handlers if h.is_alive()]
-
-                    except Exception as e:
-                        logger.error(f"Error creating channel: {e}")
-                        client_socket.close()
+                    self._admit(client_socket, addr)
 
                 except socket.timeout:
                     continue
@@ -173,6 +440,149 @@ class ForwardServer(threading.Thread):
         finally:
             self._cleanup()
 
+    def _admit(self, client_socket, addr):
+        """
+        Aplica el control d'admissió a una connexió acceptada. Si hi ha places, obre el canal immediatament; si no, la
+        connexió espera a la cua (en un fil propi, per no bloquejar `accept`) o es rebutja si la cua és plena.
+        """
+        if self.gate is None and self.channel_gate is None:
+            self._open_tunnel(client_socket, addr, None)
+            return
+
+        if self._try_acquire(0):
+            self._record_wait(0.0)
+            self._open_tunnel(client_socket, addr, self._release)
+            return
+
+        with self._admission_lock:
+            if self._queued >= self.queue_size:
+                self._rejected += 1
+                reject = True
+            else:
+                self._queued += 1
+                self._max_queued = max(self._max_queued, self._queued)
+                reject = False
+
+        if reject:
+            logger.warning(f"Connexió de {addr} rebutjada al forward {self}: la cua d'espera és plena "
+                           f"({self.queue_size} connexions)")
+            client_socket.close()
+            return
+
+        threading.Thread(target=self._wait_and_open, args=(client_socket, addr), daemon=True).start()
+
+    def _wait_and_open(self, client_socket, addr):
+        """Espera una plaça com a molt `queue_timeout` segons i obre el canal o rebutja la connexió."""
+        start = time.monotonic()
+        admitted = self._try_acquire(self.queue_timeout)
+        waited = time.monotonic() - start
+
+        with self._admission_lock:
+            self._queued -= 1
+            if not admitted:
+                self._rejected += 1
+
+        if not admitted or not self._running:
+            if admitted:
+                self._release()
+            else:
+                logger.warning(f"Connexió de {addr} rebutjada al forward {self}: no hi ha places lliures després "
+                               f"d'esperar {waited:.1f} s")
+            client_socket.close()
+            return
+
+        self._record_wait(waited)
+        self._open_tunnel(client_socket, addr, self._release)
+
+    def _try_acquire(self, timeout: float) -> bool:
+        """Ocupa una plaça del forward i una del transport dins el temps `timeout`."""
+        deadline = time.monotonic() + timeout
+        if self.gate is not None and not self.gate.acquire(timeout):
+            return False
+        if self.channel_gate is not None and \
+                not self.channel_gate.acquire(max(0.0, deadline - time.monotonic())):
+            if self.gate is not None:
+                self.gate.release()
+            return False
+        return True
+
+    def _release(self):
+        if self.channel_gate is not None:
+            self.channel_gate.release()
+        if self.gate is not None:
+            self.gate.release()
+
+    def _record_wait(self, waited: float):
+        with self._admission_lock:
+            self._admitted += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    def _open_tunnel(self, client_socket, addr, release):
+        """Obre el canal SSH cap al destí remot i arrenca el handler que hi bombeja les dades."""
+        try:
+            channel_opts = dict(window_size=BULK_WINDOW_SIZE, max_packet_size=BULK_MAX_PACKET_SIZE) \
+                if self.priority == PRIORITY_BULK else dict()
+            channel = self.transport.open_channel(
+                "direct-tcpip",
+                (self.remote_host, self.remote_port),
+                addr,
+                **channel_opts
+            )
+
+            handler = TunnelHandler(channel, client_socket, limiter=self.limiter,
+                                    scheduler=self.scheduler, priority=self.priority, on_close=release,
+                                    recorder=self.recorder, remote=(self.remote_host, self.remote_port))
+            with self._admission_lock:
+                self._handlers.append(handler)
+                self._connections += 1
+            handler.start()
+
+            # Clean up finished handlers
+            self._prune_handlers()
+
+        except Exception as e:
+            logger.error(f"Error creating channel: {e}")
+            client_socket.close()
+            if release is not None:
+                release()
+
+    def _prune_handlers(self):
+        """Retira els handlers acabats i n'acumula els comptadors de bytes."""
+        with self._admission_lock:
+            alive = []
+            for h in self._handlers:
+                if h.is_alive():
+                    alive.append(h)
+                else:
+                    self._bytes_sent_done += h.bytes_sent
+                    self._bytes_received_done += h.bytes_received
+                    self._throttled_done += h.throttled
+            self._handlers = alive
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna les estadístiques de trànsit d'aquest forward."""
+        handlers = self._handlers[:]
+        return {
+            'local_port': self.local_port,
+            'remote': (self.remote_host, self.remote_port),
+            'alive': self.is_alive(),
+            'connections': self._connections,
+            'active_connections': sum(1 for h in handlers if h.is_alive()),
+            'bytes_sent': self._bytes_sent_done + sum(h.bytes_sent for h in handlers),
+            'bytes_received': self._bytes_received_done + sum(h.bytes_received for h in handlers),
+            'priority': self.priority,
+            'rate_limit': self.limiter.rate if self.limiter is not None else None,
+            'throttled_seconds': self._throttled_done + sum(h.throttled for h in handlers),
+            'max_connections': self.gate.limit if self.gate is not None else None,
+            'queued': self._queued,
+            'max_queued': self._max_queued,
+            'admitted': self._admitted,
+            'rejected': self._rejected,
+            'avg_wait_seconds': self._wait_total / self._admitted if self._admitted else 0.0,
+            'max_wait_seconds': self._wait_max,
+        }
+
     def _cleanup(self):
         """Clean up all resources."""
         for handler in self._handlers:
@@ -195,14 +605,25 @@ class ForwardServer(threading.Thread):
 
 
 class SSHTunnel:
+    """
+    Túnel SSH amb múltiples forwards sobre un únic transport.
 
-    def __init__(self, ssh_host: str, ssh_port: int = 22, ssh_username: Optional[str] = None,
+    `ssh_host` pot ser un sol servidor o una llista de bastions equivalents (vegeu `parse_bastions`). Amb més d'un
+    bastió, el túnel es connecta al que respon més ràpid, els torna a ordenar cada `rerank_interval` segons i, si el
+    transport cau, es reconnecta al següent i hi torna a enganxar tots els forwards. La nova ordenació només decideix
+    a quin bastió es connecta el pròxim failover: el transport actiu no es mou a un bastió més ràpid, perquè es
+    tallarien les connexions obertes pels forwards.
+    """
+
+    def __init__(self, ssh_host: Union[str, List[Any]], ssh_port: int = 22, ssh_username: Optional[str] = None,
                  ssh_password: Optional[str] = None, ssh_pkey: Optional[str] = None,
                  remote_bind_addresses: Optional[List[Tuple[str, int]]] = None,
-                 local_bind_addresses: Optional[List[Tuple[str, int]]] = None):
+                 local_bind_addresses: Optional[List[Tuple[str, int]]] = None,
+                 max_rate: Optional[float] = None, max_channels: Optional[int] = None,
+                 health_interval: float = 5.0, rerank_interval: float = 300.0):
 
-        self.ssh_host = ssh_host
-        self.ssh_port = ssh_port
+        self.bastions = parse_bastions(ssh_host, ssh_port)
+        self.ssh_host, self.ssh_port = self.bastions[0]
         self.ssh_username = ssh_username
         self.ssh_password = ssh_password
         self.ssh_pkey = ssh_pkey
@@ -225,6 +646,20 @@ class SSHTunnel:
         self.transport: Optional[paramiko.SSHClient] = None
         self._forward_servers: Dict[int, ForwardServer] = {}
         self._lock = threading.RLock()
+        # Repartiment de l'amplada de banda del transport entre forwards interactius i bulk
+        self._scheduler = TransportScheduler(max_rate)
+        # Límit de canals oberts al transport (p. ex. per no superar el MaxSessions del servidor SSH)
+        self._channel_gate = AdmissionGate(max_channels) if max_channels else None
+        # Selecció de bastió i failover
+        self.health_interval = health_interval
+        self.rerank_interval = rerank_interval
+        self._ranking: List[Tuple[Tuple[str, int], float]] = [(b, float('nan')) for b in self.bastions]
+        self._ranked_at = 0.0
+        self._failovers = 0
+        self._monitor: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._recorder: Optional[TrafficRecorder] = None
+        self._capture_ports = None
 
     @property
     def local_bind_ports(self) -> List[int]:
@@ -236,11 +671,20 @@ class SSHTunnel:
         return self.local_bind_ports[0] if self.local_bind_ports else None
 
     def add_forward(self, remote_host: str, remote_port: int,
-                    local_host: str = "localhost", local_port: int = 0) -> int:
+                    local_host: str = "localhost", local_port: int = 0,
+                    rate_limit: Optional[float] = None, priority: str = PRIORITY_INTERACTIVE,
+                    max_connections: Optional[int] = None, queue_size: int = 64, queue_timeout: float = 30.0) -> int:
         """
         Afegeix un nou forward al túnel SSH existent.
         remote: (remote_host, remote_port)
         local: (local_host, local_port)
+        rate_limit: límit de velocitat del forward en bytes/s (None, sense límit)
+        priority: classe de prioritat, `PRIORITY_INTERACTIVE` o `PRIORITY_BULK`.
+        max_connections: connexions concurrents màximes del forward (None, sense límit)
+        queue_size: connexions que poden esperar plaça; les que arriben amb la cua plena es rebutgen
+        queue_timeout: segons que una connexió pot esperar a la cua abans de ser rebutjada
+
+        Si el forward ja existia, les opcions s'ignoren.
         """
 
         if not self.transport:
@@ -263,7 +707,10 @@ class SSHTunnel:
                 return local_port  # Ja estava endreçat al mateix remote
 
             else:
-                actual_port = self._start_forward(local_port, remote_host, remote_port)
+                actual_port = self._start_forward(local_port, remote_host, remote_port,
+                                                  rate_limit=rate_limit, priority=priority,
+                                                  max_connections=max_connections, queue_size=queue_size,
+                                                  queue_timeout=queue_timeout)
 
                 # Guardar el mapping
                 self.remote_bind_addresses.append((remote_host, remote_port))
@@ -313,9 +760,47 @@ class SSHTunnel:
 
         logger.info(f"Removed forward for port {local_port}")
 
-    def _start_forward(self, local_port: int, remote_host: str, remote_port: int) -> int:
+    def start_capture(self, path: str, ports: Optional[List[int]] = None):
+        """
+        Comença a capturar el trànsit de les connexions noves cap a `path` (vegeu `tunnel_capture`). Les connexions
+        ja obertes no es capturen.
+
+        :param path: fitxer de captura (comprimit si acaba en `.gz`)
+        :param ports: ports locals dels forwards a capturar. Si és None, tots, inclosos els que s'afegeixin després.
+        """
+        with self._lock:
+            if self._recorder is not None:
+                raise RuntimeError(f"Ja hi ha una captura en curs a {self._recorder.path}")
+            self._recorder = TrafficRecorder(path)
+            self._capture_ports = None if ports is None else set(ports)
+            for port, server in self._forward_servers.items():
+                if self._capture_ports is None or port in self._capture_ports:
+                    server.recorder = self._recorder
+
+    def stop_capture(self) -> Optional[str]:
+        """
+        Atura la captura en curs.
+
+        :return: el camí del fitxer de captura o None si no n'hi havia cap
+        """
+        with self._lock:
+            recorder, self._recorder = self._recorder, None
+            for server in self._forward_servers.values():
+                server.recorder = None
+        if recorder is None:
+            return None
+        recorder.close()
+        return recorder.path
+
+    def _start_forward(self, local_port: int, remote_host: str, remote_port: int,
+                       rate_limit: Optional[float] = None, priority: str = PRIORITY_INTERACTIVE,
+                       **admission) -> int:
         """Start a single forward server."""
-        server = ForwardServer(self.transport, local_port, remote_host, remote_port)
+        server = ForwardServer(self.transport, local_port, remote_host, remote_port,
+                               rate_limit=rate_limit, priority=priority, scheduler=self._scheduler,
+                               channel_gate=self._channel_gate, **admission)
+        if self._recorder is not None and (self._capture_ports is None or local_port in self._capture_ports):
+            server.recorder = self._recorder
         server.start()
 
         self._forward_servers[local_port] = server
@@ -339,23 +824,57 @@ class SSHTunnel:
         return get_free_port("localhost")
 
 
+    def _connect(self, host: str, port: int) -> paramiko.SSHClient:
+        """Obre una connexió SSH autenticada amb un bastió concret."""
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            client.connect(
+                host,
+                port=port,
+                username=self.ssh_username,
+                password=self.ssh_password,
+                key_filename=self.ssh_pkey,
+                timeout=10)
+        except Exception:
+            client.close()
+            raise
+        return client
+
+    def _rerank(self) -> List[Tuple[str, int]]:
+        """Torna a mesurar els bastions i retorna la llista de candidats del més ràpid al més lent."""
+        if len(self.bastions) > 1:
+            self._ranking = rank_bastions(self.bastions)
+            self._ranked_at = time.monotonic()
+            logger.debug(f"Bastion ranking: {self._ranking}")
+        return [b for b, _ in self._ranking]
+
+    def _connect_best(self) -> paramiko.SSHClient:
+        """Es connecta al primer bastió que respongui, per ordre de rapidesa."""
+        last_error = None
+        for host, port in self._rerank():
+            if self._stop_event.is_set():
+                raise RuntimeError("SSH tunnel stopped")
+            try:
+                client = self._connect(host, port)
+            except Exception as e:
+                logger.warning(f"Could not connect to SSH server {host}:{port}: {e}")
+                last_error = e
+                continue
+            self.ssh_host, self.ssh_port = host, port
+            return client
+        raise last_error
+
     def start(self):
         """Start the SSH tunnel."""
         if self.client:
             logger.warning("Tunnel already started")
             return
 
+        # Un túnel aturat (o un `start` que ha fallat) es pot tornar a engegar
+        self._stop_event.clear()
         try:
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self.client.connect(
-                self.ssh_host,
-                port=self.ssh_port,
-                username=self.ssh_username,
-                password=self.ssh_password,
-                key_filename=self.ssh_pkey,
-                timeout=10)
-
+            self.client = self._connect_best()
             self.transport = self.client.get_transport()
             logger.info(f"Connected to SSH server {self.ssh_host}:{self.ssh_port}")
 
@@ -369,14 +888,66 @@ class SSHTunnel:
 
                 self._start_forward(local_port, remote_host, remote_port)
 
+            if len(self.bastions) > 1:
+                self._monitor = threading.Thread(target=self._monitor_bastions, daemon=True,
+                                                 name=f"SSHTunnel-monitor-{self.ssh_username}")
+                self._monitor.start()
+
         except Exception as e:
             logger.error(f"Failed to start SSH tunnel: {e}")
             self.stop()
             raise
 
+    def _monitor_bastions(self):
+        """
+        Vigila el transport: si cau fa failover i, periòdicament, torna a ordenar els bastions (per al pròxim
+        failover; el transport actiu no es canvia).
+        """
+        while not self._stop_event.wait(self.health_interval):
+            transport = self.transport
+            if transport is None or not transport.is_active():
+                self._failover()
+            elif time.monotonic() - self._ranked_at >= self.rerank_interval:
+                self._rerank()
+
+    def _failover(self):
+        """Es reconnecta al millor bastió disponible i hi mou tots els forwards."""
+        logger.warning(f"SSH transport to {self.ssh_host}:{self.ssh_port} is down, failing over")
+        try:
+            client = self._connect_best()
+        except Exception as e:
+            logger.error(f"Failover failed, no SSH server available: {e}")
+            return
+
+        with self._lock:
+            if self._stop_event.is_set():
+                # El túnel s'ha aturat mentre ens reconnectàvem
+                client.close()
+                return
+            old_client = self.client
+            self.client = client
+            self.transport = client.get_transport()
+            # Els forwards (sockets locals) continuen escoltant; les connexions noves faran servir el transport nou
+            for server in self._forward_servers.values():
+                server.transport = self.transport
+            self._failovers += 1
+
+        if old_client is not None:
+            try:
+                old_client.close()
+            except Exception as e:
+                logger.debug(f"Error closing client: {e}")
+        logger.info(f"Failed over to SSH server {self.ssh_host}:{self.ssh_port}")
+
     def stop(self):
         """Stop the SSH tunnel and clean up resources."""
         logger.info("Stopping SSH tunnel...")
+        self._stop_event.set()
+        monitor, self._monitor = self._monitor, None
+        if monitor is not None and monitor is not threading.current_thread():
+            # Si és a mig d'un failover, acaba després de l'intent de connexió en curs
+            monitor.join()
+        self.stop_capture()
 
         with self._lock:
             for server in list(self._forward_servers.values()):
@@ -410,6 +981,28 @@ class SSHTunnel:
     def __exit__(self, exc_type, exc_value, traceback):
         self.stop()
 
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna les estadístiques del túnel i de cadascun dels seus forwards.
+
+        :return: diccionari amb l'estat del transport i un diccionari `forwards` indexat pel port local
+        """
+        with self._lock:
+            servers = list(self._forward_servers.values())
+
+        return {
+            'ssh_host': self.ssh_host,
+            'ssh_port': self.ssh_port,
+            'bastions': [{'host': h, 'port': p, 'rtt': rtt} for (h, p), rtt in self._ranking],
+            'failovers': self._failovers,
+            'transport_active': bool(self.transport is not None and self.transport.is_active()),
+            'max_rate': self._scheduler.max_rate,
+            'max_channels': self._channel_gate.limit if self._channel_gate is not None else None,
+            'channels_in_use': self._channel_gate.in_use if self._channel_gate is not None else None,
+            'channels_queued': self._channel_gate.waiting if self._channel_gate is not None else 0,
+            'forwards': {fw.local_port: fw.stats() for fw in servers},
+        }
+
     def is_active(self, timeout=2):
         if not self.transport or not self.transport.active:
             return False
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Captura i reproducció del trànsit que passa pels túnels SSH.
+
+`TrafficRecorder` desa, per a cada connexió d'un forward, els bytes que van en cada sentit amb la marca de temps en
+què s'han vist. `replay` torna a enviar una captura contra un destí (normalment el port local d'un `SSHTunnel`) o
+contra un embornal local que respon amb els bytes capturats del servidor, i en mesura el rendiment i la latència.
+
+Format del fitxer: la capçalera `MAGIC` seguida de registres `RECORD` (tipus, connexió, temps relatiu en segons i
+longitud) amb la longitud de bytes de càrrega a continuació. Si el nom del fitxer acaba en `.gz` es comprimeix.
+"""
+
+import gzip
+import logging
+import socket
+import struct
+import threading
+import time
+from collections import defaultdict
+from typing import Optional, Tuple, List, Dict, Iterator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GABDCAP1"
+RECORD = struct.Struct("<BIdI")  # tipus, id de connexió, temps (s), longitud
+
+OPEN = 1  # càrrega: "host:port" remot
+CLIENT_TO_SERVER = 2
+SERVER_TO_CLIENT = 3
+CLOSE = 4
+
+
+def _open_file(path: str, mode: str):
+    return gzip.open(path, mode) if str(path).endswith(".gz") else open(path, mode)
+
+
+class TrafficRecorder:
+    """
+    Escriptor (segur entre fils) d'una captura de trànsit. Es pot compartir entre tots els handlers d'un túnel.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = _open_file(path, "wb")
+        self._file.write(MAGIC)
+        self._t0 = time.monotonic()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _write(self, kind: int, conn_id: int, payload: bytes = b""):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(RECORD.pack(kind, conn_id, time.monotonic() - self._t0, len(payload)))
+            if payload:
+                self._file.write(payload)
+
+    def open_connection(self, remote: Tuple[str, int]) -> int:
+        """Registra una connexió nova i en retorna l'identificador."""
+        with self._lock:
+            conn_id = self._next_id
+            self._next_id += 1
+        self._write(OPEN, conn_id, f"{remote[0]}:{remote[1]}".encode())
+        return conn_id
+
+    def record(self, conn_id: int, direction: int, data: bytes):
+        """Registra `data` en el sentit `CLIENT_TO_SERVER` o `SERVER_TO_CLIENT`."""
+        self._write(direction, conn_id, data)
+
+    def close_connection(self, conn_id: int):
+        self._write(CLOSE, conn_id)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_capture(path: str) -> Iterator[Tuple[int, int, float, bytes]]:
+    """
+    Llegeix una captura.
+
+    :return: iterador de tuples (tipus, id de connexió, temps, càrrega)
+    """
+    with _open_file(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"El fitxer {path} no és una captura de GABDConnect")
+        while True:
+            header = f.read(RECORD.size)
+            if not header:
+                break
+            if len(header) < RECORD.size:
+                raise ValueError(f"Captura {path} truncada")
+            kind, conn_id, ts, length = RECORD.unpack(header)
+            yield kind, conn_id, ts, f.read(length) if length else b""
+
+
+def _load_connections(path: str) -> Dict[int, List[Tuple[int, float, bytes]]]:
+    """Agrupa els registres de dades de la captura per connexió, en ordre."""
+    conns = defaultdict(list)
+    for kind, conn_id, ts, payload in read_capture(path):
+        if kind in (CLIENT_TO_SERVER, SERVER_TO_CLIENT):
+            conns[conn_id].append((kind, ts, payload))
+    return dict(conns)
+
+
+def _exchanges(records: List[Tuple[int, float, bytes]]) -> List[Tuple[float, bytes, bytes]]:
+    """
+    Converteix els registres d'una connexió en intercanvis (temps, petició, resposta): cada bloc de dades del client
+    seguit de tots els bytes que el servidor hi ha enviat fins a la petició següent.
+    """
+    res = []
+    pending_ts, request, response = None, bytearray(), bytearray()
+    for kind, ts, payload in records:
+        if kind == CLIENT_TO_SERVER:
+            if response:
+                res.append((pending_ts, bytes(request), bytes(response)))
+                pending_ts, request, response = None, bytearray(), bytearray()
+            if pending_ts is None:
+                pending_ts = ts
+            request += payload
+        elif kind == SERVER_TO_CLIENT:
+            if pending_ts is None:
+                # El servidor parla primer (p. ex. un banner): petició buida
+                pending_ts = ts
+            response += payload
+    if pending_ts is not None:
+        res.append((pending_ts, bytes(request), bytes(response)))
+    return res
+
+
+class _CaptureSink(threading.Thread):
+    """
+    Embornal local per a una connexió capturada: accepta una connexió i, per cada petició rebuda, respon amb els bytes
+    que el servidor havia enviat a la captura.
+    """
+
+    def __init__(self, exchanges: List[Tuple[float, bytes, bytes]]):
+        super().__init__(daemon=True)
+        self.exchanges = exchanges
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("localhost", 0))
+        self.sock.listen(1)
+        self.port = self.sock.getsockname()[1]
+
+    def run(self):
+        try:
+            conn, _ = self.sock.accept()
+            with conn:
+                for _, request, response in self.exchanges:
+                    if not _recv_exactly(conn, len(request)):
+                        break
+                    if response:
+                        conn.sendall(response)
+        except OSError as e:
+            logger.debug(f"Capture sink error: {e}")
+        finally:
+            self.sock.close()
+
+
+def _recv_exactly(sock, nbytes: int) -> bool:
+    """Llegeix exactament `nbytes` bytes. Retorna False si la connexió es tanca abans."""
+    while nbytes > 0:
+        data = sock.recv(min(nbytes, 65536))
+        if not data:
+            return False
+        nbytes -= len(data)
+    return True
+
+
+class ReplayReport:
+    """Resultat d'una reproducció: volum de dades, durada, rendiment i latències de cada intercanvi."""
+
+    def __init__(self):
+        self.connections = 0
+        self.exchanges = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.elapsed = 0.0
+        self.errors: List[str] = []
+        self.latencies: List[float] = []
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per segon (en tots dos sentits)."""
+        return (self.bytes_sent + self.bytes_received) / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Percentil `p` (0-100) de la latència, en segons."""
+        if not self.latencies:
+            return 0.0
+        values = sorted(self.latencies)
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'connections': self.connections,
+            'exchanges': self.exchanges,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'elapsed': self.elapsed,
+            'throughput': self.throughput,
+            'latency_p50': self.percentile(50),
+            'latency_p95': self.percentile(95),
+            'latency_p99': self.percentile(99),
+            'errors': len(self.errors),
+        }
+
+    def __str__(self):
+        d = self.as_dict()
+        return (f"{d['connections']} connexions, {d['exchanges']} intercanvis en {d['elapsed']:.2f} s: "
+                f"{d['throughput'] / 1e6:.2f} MB/s, latència p50={d['latency_p50'] * 1e3:.1f} ms "
+                f"p95={d['latency_p95'] * 1e3:.1f} ms p99={d['latency_p99'] * 1e3:.1f} ms, {d['errors']} errors")
+
+
+def _wait_until(ts: float, speed: Optional[float], start: float):
+    """Amb `speed`, espera fins al moment `ts` de la captura, a escala i comptat des de `start`."""
+    if speed:
+        delay = ts / speed - (time.monotonic() - start)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _replay_connection(exchanges: List[Tuple[float, bytes, bytes]], address: Tuple[str, int],
+                       speed: Optional[float], start: float, timeout: float, report: ReplayReport,
+                       lock: threading.Lock):
+    """Reprodueix els intercanvis d'una connexió contra `address` i n'afegeix el resultat a `report`."""
+    try:
+        with socket.create_connection(address, timeout=timeout) as s:
+            for ts, request, response in exchanges:
+                _wait_until(ts, speed, start)
+                t = time.perf_counter()
+                if request:
+                    s.sendall(request)
+                if response and not _recv_exactly(s, len(response)):
+                    raise ConnectionError("connexió tancada abans de rebre la resposta completa")
+                latency = time.perf_counter() - t
+                with lock:
+                    report.exchanges += 1
+                    report.bytes_sent += len(request)
+                    report.bytes_received += len(response)
+                    if response:
+                        report.latencies.append(latency)
+    except (OSError, ConnectionError) as e:
+        with lock:
+            report.errors.append(f"{address}: {e}")
+
+
+def replay(path: str, target: Optional[Tuple[str, int]] = None, speed: Optional[float] = 1.0,
+           timeout: float = 30.0) -> ReplayReport:
+    """
+    Reprodueix una captura.
+
+    :param path: fitxer de captura
+    :param target: (host, port) on connectar, normalment ('localhost', port local d'un `SSHTunnel`). Si és None, cada
+        connexió es reprodueix contra un embornal local que respon amb els bytes capturats del servidor.
+    :param speed: factor de velocitat respecte a la captura original (1.0, temps original; 10.0, deu vegades més
+        ràpid). None o 0 envia sense esperes.
+    :param timeout: temps màxim d'espera de cada resposta, en segons
+    :return: `ReplayReport`
+    """
+    conns = _load_connections(path)
+    report = ReplayReport()
+    lock = threading.Lock()
+    threads = []
+    sinks = []
+
+    start = time.monotonic()
+
+    for conn_id in sorted(conns):
+        exchanges = _exchanges(conns[conn_id])
+        address = target
+        if target is None:
+            sink = _CaptureSink(exchanges)
+            sink.start()
+            sinks.append(sink)
+            address = ("localhost", sink.port)
+
+        threads.append(threading.Thread(target=_replay_connection, daemon=True,
+                                        args=(exchanges, address, speed, start, timeout, report, lock)))
+        report.connections += 1
+
+    # Totes les connexions s'obren de seguida, en l'ordre de la captura. El que (amb `speed`) espera el moment
+    # capturat és cada enviament, començant pel primer, no l'obertura de la connexió.
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    report.elapsed = time.monotonic() - start
+
+    for sink in sinks:
+        sink.join(timeout=1)
+
+    return report
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+u"""
+Created on Oct 19, 2026
+
+Execució del pla de dades dels túnels SSH (transport paramiko, `ForwardServer` i `TunnelHandler`) en un procés fill.
+
+Els fils que reenvien el trànsit comparteixen el GIL amb el codi de l'aplicació. Quan l'aplicació fa feina intensiva
+de CPU (per exemple, transformacions amb pandas dels resultats d'una consulta) els túnels que l'alimenten s'alenteixen.
+La classe `ProcessSSHTunnel` manté la mateixa API que `SSHTunnel` però delega tota la feina en un procés fill, amb qui
+es comunica a través d'un canal de control (`multiprocessing.Pipe`).
+"""
+
+import logging
+import multiprocessing
+import pickle
+import threading
+from typing import Tuple, List, Optional, Dict, Any, Union
+
+from .ssh_tunnel import SSHTunnel, PRIORITY_INTERACTIVE
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _picklable(exc: BaseException) -> BaseException:
+    """Retorna `exc` si es pot enviar pel canal de control o un `RuntimeError` equivalent si no."""
+    try:
+        pickle.dumps(exc)
+        return exc
+    except Exception:
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+
+
+def _tunnel_process_main(conn, tunnel_kwargs: Dict[str, Any]) -> None:
+    """
+    Punt d'entrada del procés fill. Crea i arrenca un `SSHTunnel` i atén les ordres que arriben pel canal de control
+    fins que rep `stop` o el procés pare tanca el canal.
+    """
+    tunnel = SSHTunnel(**tunnel_kwargs)
+    try:
+        tunnel.start()
+    except Exception as e:
+        conn.send(('error', _picklable(e)))
+        conn.close()
+        return
+    conn.send(('ok', None))
+
+    try:
+        while True:
+            try:
+                method, args, kwargs = conn.recv()
+            except (EOFError, OSError):
+                # El procés pare ha desaparegut
+                break
+
+            if method == 'stop':
+                break
+
+            try:
+                attr = getattr(tunnel, method)
+                result = attr(*args, **kwargs) if callable(attr) else attr
+                conn.send(('ok', result))
+            except Exception as e:
+                conn.send(('error', _picklable(e)))
+    finally:
+        tunnel.stop()
+        try:
+            conn.send(('ok', None))
+        except (OSError, ValueError):
+            pass
+        conn.close()
+
+
+class ProcessSSHTunnel:
+    """
+    Túnel SSH amb el pla de dades en un procés fill.
+
+    Exposa la mateixa API que `SSHTunnel` (`start`, `stop`, `add_forward`, `remove_forward`, `stats`, `is_active`,
+    ...). Cada crida es tradueix en un missatge pel canal de control i la resposta del fill es retorna (o es rellança,
+    si és una excepció) al procés pare.
+    """
+
+    def __init__(self, ssh_host: Union[str, List[Any]], ssh_port: int = 22, ssh_username: Optional[str] = None,
+                 ssh_password: Optional[str] = None, ssh_pkey: Optional[str] = None,
+                 remote_bind_addresses: Optional[List[Tuple[str, int]]] = None,
+                 local_bind_addresses: Optional[List[Tuple[str, int]]] = None,
+                 max_rate: Optional[float] = None, max_channels: Optional[int] = None,
+                 health_interval: float = 5.0, rerank_interval: float = 300.0,
+                 start_method: str = "spawn", start_timeout: float = 30.0):
+
+        self.ssh_host = ssh_host
+        self.ssh_port = ssh_port
+        self.ssh_username = ssh_username
+        self._tunnel_kwargs = dict(ssh_host=ssh_host, ssh_port=ssh_port, ssh_username=ssh_username,
+                                   ssh_password=ssh_password, ssh_pkey=ssh_pkey,
+                                   remote_bind_addresses=remote_bind_addresses,
+                                   local_bind_addresses=local_bind_addresses, max_rate=max_rate,
+                                   max_channels=max_channels, health_interval=health_interval,
+                                   rerank_interval=rerank_interval)
+        # 'spawn' evita heretar fils i locks de paramiko en un estat inconsistent, com passaria amb 'fork'
+        self._ctx = multiprocessing.get_context(start_method)
+        self._start_timeout = start_timeout
+        self._process = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Arrenca el procés fill i hi obre la connexió SSH."""
+        if self._process is not None:
+            logger.warning("Tunnel already started")
+            return
+
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(target=_tunnel_process_main, args=(child_conn, self._tunnel_kwargs),
+                                    name=f"SSHTunnel-{self.ssh_host}:{self.ssh_port}", daemon=True)
+        process.start()
+        child_conn.close()
+
+        if not parent_conn.poll(self._start_timeout):
+            process.terminate()
+            parent_conn.close()
+            raise TimeoutError(f"El procés del túnel SSH a {self.ssh_host}:{self.ssh_port} no ha respost "
+                               f"en {self._start_timeout} s")
+
+        status, value = parent_conn.recv()
+        if status != 'ok':
+            process.join(timeout=5)
+            parent_conn.close()
+            raise value
+
+        self._process = process
+        self._conn = parent_conn
+        logger.info(f"SSH tunnel process {process.pid} connected to {self.ssh_host}:{self.ssh_port}")
+
+    def stop(self):
+        """Atura el túnel i espera que el procés fill acabi."""
+        if self._process is None:
+            return
+
+        with self._lock:
+            try:
+                self._conn.send(('stop', (), {}))
+                if self._conn.poll(10):
+                    self._conn.recv()
+            except (EOFError, OSError, BrokenPipeError):
+                pass
+            finally:
+                self._conn.close()
+
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+
+        self._process = None
+        self._conn = None
+        logger.info("SSH tunnel process stopped")
+
+    def _call(self, method: str, *args, **kwargs):
+        """Envia una ordre al procés fill i en retorna el resultat."""
+        if self._process is None:
+            raise RuntimeError("SSH tunnel not started")
+
+        with self._lock:
+            try:
+                self._conn.send((method, args, kwargs))
+                status, value = self._conn.recv()
+            except (EOFError, OSError) as e:
+                raise RuntimeError(f"El procés del túnel SSH a {self.ssh_host}:{self.ssh_port} no respon") from e
+
+        if status != 'ok':
+            raise value
+        return value
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process is not None else None
+
+    @property
+    def local_bind_ports(self) -> List[int]:
+        return self._call('local_bind_ports') if self._process is not None else []
+
+    @property
+    def local_bind_port(self):
+        ports = self.local_bind_ports
+        return ports[0] if ports else None
+
+    @property
+    def local_bind_addresses(self) -> Dict[Tuple[str, int], int]:
+        return self._call('local_bind_addresses') if self._process is not None else {}
+
+    @property
+    def remote_bind_addresses(self) -> List[Tuple[str, int]]:
+        return self._call('remote_bind_addresses') if self._process is not None else []
+
+    def add_forward(self, remote_host: str, remote_port: int,
+                    local_host: str = "localhost", local_port: int = 0,
+                    rate_limit: Optional[float] = None, priority: str = PRIORITY_INTERACTIVE,
+                    max_connections: Optional[int] = None, queue_size: int = 64, queue_timeout: float = 30.0) -> int:
+        """Afegeix un forward al túnel del procés fill. Vegeu `SSHTunnel.add_forward`."""
+        return self._call('add_forward', remote_host, remote_port, local_host, local_port,
+                          rate_limit=rate_limit, priority=priority, max_connections=max_connections,
+                          queue_size=queue_size, queue_timeout=queue_timeout)
+
+    def remove_forward(self, local_port: int):
+        """Elimina un forward del túnel del procés fill. Vegeu `SSHTunnel.remove_forward`."""
+        return self._call('remove_forward', local_port)
+
+    def start_capture(self, path: str, ports: Optional[List[int]] = None):
+        """Comença una captura de trànsit al procés fill. Vegeu `SSHTunnel.start_capture`."""
+        return self._call('start_capture', path, ports)
+
+    def stop_capture(self) -> Optional[str]:
+        """Atura la captura de trànsit del procés fill. Vegeu `SSHTunnel.stop_capture`."""
+        return self._call('stop_capture')
+
+    def stats(self) -> Dict[str, Any]:
+        """Estadístiques del túnel, amb el pid del procés que el gestiona."""
+        res = self._call('stats')
+        res['pid'] = self.pid
+        return res
+
+    def is_active(self, timeout=2) -> bool:
+        if self._process is None or not self._process.is_alive():
+            return False
+        try:
+            return self._call('is_active', timeout)
+        except RuntimeError:
+            return False
+
+    def is_tunnel_closed(self, port: Optional[int] = None) -> bool:
+        if self._process is None or not self._process.is_alive():
+            return True
+        return self._call('is_tunnel_closed', port)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def __len__(self):
+        """Nombre de forwards actius."""
+        return len(self.local_bind_ports)
+
+    def __str__(self) -> str:
+        base = f"{self.ssh_username}@{self.ssh_host}:{self.ssh_port}"
+        return f"{base} (procés {self.pid})"
+
+    def __repr__(self) -> str:
+        return (f"<ProcessSSHTunnel user={self.ssh_username} host={self.ssh_host} "
+                f"port={self.ssh_port} pid={self.pid}>")
@@ -0,0 +1,47 @@
+import asyncio
+import importlib
+import unittest
+from unittest import mock
+
+from GABDConnect import AsyncOracleConnection
+
+# El paquet exporta la classe amb el mateix nom que el mòdul
+async_module = importlib.import_module('GABDConnect.AsyncOracleConnection')
+
+
+class StandInPool:
+    """Pool asíncron d'un controlador simulat en què obtenir una sessió falla."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def acquire(self):
+        raise ConnectionResetError("connexió tancada pel servidor")
+
+    async def close(self, force=False):
+        self.closed = True
+
+
+class AsyncOpenTestCase(unittest.TestCase):
+    def test_failed_open_cleans_up(self):
+        pool = StandInPool()
+        db = AsyncOracleConnection(user='u', passwd='p', hostname='localhost', ssh_data=None, pool={'max': 4})
+
+        async def open_and_fail():
+            async with db:
+                self.fail("No s'hauria d'entrar al context")
+
+        with mock.patch.object(async_module, 'create_pool_async', return_value=pool), \
+                mock.patch.object(AsyncOracleConnection, 'closetunnel') as closetunnel:
+            db._ssh_data = {'ssh': 'bastio'}  # Com si hi hagués túnel, sense obrir-lo
+            with mock.patch.object(async_module.AbsConnection, 'open', lambda self: setattr(self, '_success', True)):
+                with self.assertRaises(ConnectionResetError):
+                    asyncio.run(open_and_fail())
+
+        self.assertTrue(pool.closed)
+        self.assertIsNone(db.pool)
+        closetunnel.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from unittest import mock
+
+import oracledb
+
+from GABDConnect import oracleConnection
+from GABDConnect.oracle_balancer import ListenerBalancer, connect_descriptor, parse_endpoint
+
+
+class ListenerBalancerTestCase(unittest.TestCase):
+    def test_parse_endpoint(self):
+        self.assertEqual(parse_endpoint("rac1:1521"), ('rac1', 1521))
+        self.assertEqual(parse_endpoint(1522), ('localhost', 1522))
+        self.assertEqual(parse_endpoint(("rac2", "1521")), ('rac2', 1521))
+
+    def test_round_robin(self):
+        balancer = ListenerBalancer(["a:1", "b:1", "c:1"])
+        chosen = [balancer.choose() for _ in range(6)]
+        self.assertEqual(chosen, [('a', 1), ('b', 1), ('c', 1)] * 2)
+
+    def test_least_connections(self):
+        balancer = ListenerBalancer(["a:1", "b:1"], policy='least_connections')
+        balancer.acquired(('a', 1))
+        self.assertEqual(balancer.choose(), ('b', 1))
+        balancer.acquired(('b', 1))
+        balancer.acquired(('b', 1))
+        balancer.released(('a', 1))
+        self.assertEqual(balancer.choose(), ('a', 1))
+
+    def test_failover_and_health(self):
+        closed = {('c', 1)}
+        balancer = ListenerBalancer(["a:1", "b:1", "c:1"], retry_after=60, health=lambda e: e not in closed)
+
+        def factory(endpoint):
+            if endpoint == ('a', 1):
+                raise oracledb.DatabaseError("DPY-6005")
+            return endpoint
+
+        conns = [balancer.connect(factory)[1] for _ in range(4)]
+        self.assertEqual(conns, [('b', 1)] * 4)
+        stats = balancer.stats()['listeners']
+        self.assertTrue(stats['a:1']['down'])
+        self.assertEqual(stats['a:1']['failures'], 1)
+        self.assertEqual(stats['b:1']['active'], 4)
+
+    def test_exhausted_pool_is_not_a_failure(self):
+        balancer = ListenerBalancer(["a:1", "b:1"], retry_after=60)
+        full = {('a', 1)}
+
+        def factory(endpoint):
+            if endpoint in full:
+                # El que llança `ConnectionPool.acquire` amb getmode 'nowait' si no hi ha cap sessió lliure
+                raise oracledb.DatabaseError("DPY-4005: timed out waiting for the connection pool to return a "
+                                             "connection")
+            return endpoint
+
+        self.assertEqual(balancer.connect(factory)[1], ('b', 1))
+        stats = balancer.stats()['listeners']
+        self.assertFalse(stats['a:1']['down'])
+        self.assertEqual(stats['a:1']['failures'], 0)
+
+        full.add(('b', 1))
+        with self.assertRaises(oracledb.DatabaseError):
+            balancer.connect(factory)
+        self.assertEqual(balancer.available(), [('a', 1), ('b', 1)])
+
+    def test_descriptor(self):
+        self.assertEqual(connect_descriptor([('a', 1521), ('b', 1521)], 'orcl'),
+                         "(DESCRIPTION=(LOAD_BALANCE=ON)(FAILOVER=ON)(ADDRESS_LIST="
+                         "(ADDRESS=(PROTOCOL=TCP)(HOST=a)(PORT=1521))(ADDRESS=(PROTOCOL=TCP)(HOST=b)(PORT=1521)))"
+                         "(CONNECT_DATA=(SERVICE_NAME=orcl)))")
+
+
+class BalancedPoolTestCase(unittest.TestCase):
+    SSH = {'ssh': 'bastio', 'user': 'u', 'pwd': 'p'}
+
+    def test_listener_ports_as_strings(self):
+        db = oracleConnection(user='u', passwd='p', hostname='rac1', port=1521, ssh_data=self.SSH, local_port=1522,
+                              multiple_tunnels={1522: ('rac1', '1521'), 1523: ('rac2', '1521')})
+        self.assertEqual(db._listener_endpoints(["rac2:1521", ("rac1", 1521)]), [('localhost', 1523), ('localhost', 1522)])
+        self.assertEqual(db._listener_endpoints(None), [('localhost', 1522), ('localhost', 1523)])
+
+    def test_parallel_pool_split_across_listeners(self):
+        db = oracleConnection(user='u', passwd='p', hostname='localhost', ssh_data=None,
+                              listeners=["a:1521", "b:1521", "c:1521"], load_balance='round_robin')
+        with mock.patch.object(oracleConnection, '_new_pool') as new_pool:
+            with db._chunk_sessions(8):
+                pass
+        self.assertEqual(new_pool.call_args.kwargs['max'], 3)  # 3 pools de 3 sessions com a molt, no de 8
+
+
+if __name__ == '__main__':
+    unittest.main()
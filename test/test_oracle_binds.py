@@ -0,0 +1,74 @@
+import decimal
+import unittest
+
+from GABDConnect.oracle_binds import LiteralNormalizer, lift_literals
+from GABDConnect.oracle_cursor import CursorPool
+
+
+class StandInCursor:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, statement, parameters=None, **kwargs):
+        self.calls.append((statement, parameters, kwargs))
+
+
+class StandInSession:
+    def __init__(self):
+        self.cursor_ = StandInCursor()
+
+    def cursor(self):
+        return self.cursor_
+
+
+class LiftLiteralsTestCase(unittest.TestCase):
+    def test_lift(self):
+        self.assertEqual(lift_literals("SELECT nom, 1 FROM t WHERE id = 42 AND estat = 'it''s' ORDER BY 1"),
+                         ("SELECT nom, 1 FROM t WHERE id = :lit1 AND estat = :lit2 ORDER BY 1",
+                          {'lit1': 42, 'lit2': "it's"}))
+        self.assertEqual(lift_literals("INSERT INTO t (a, b) VALUES (1.5, 'x')"),
+                         ("INSERT INTO t (a, b) VALUES (:lit1, :lit2)", {'lit1': decimal.Decimal('1.5'), 'lit2': 'x'}))
+
+    def test_exclusions(self):
+        for sql in ["BEGIN p(1); END;",
+                    "CREATE TABLE t (a VARCHAR2(10))",
+                    "SELECT * FROM t WHERE d > DATE '2024-01-01' AND to_char(d, 'YYYY') IS NOT NULL",
+                    "SELECT /*+ parallel(4) */ * FROM t SAMPLE (10) -- id = 3",
+                    "SELECT * FROM t WHERE CAST(a AS VARCHAR2(10)) = :x AND b = N'n' AND c = q'[a'b]'",
+                    "SELECT JSON_VALUE(doc, '$.name') FROM t WHERE JSON_EXISTS(doc, '$.tags[0]')",
+                    "SELECT * FROM t WHERE id = :1 FOR UPDATE WAIT 5",
+                    "INSERT INTO t SELECT * FROM s LOG ERRORS REJECT LIMIT 10"]:
+            self.assertEqual(lift_literals(sql), (sql, {}))
+
+    def test_subqueries(self):
+        sql, binds = lift_literals("SELECT * FROM (SELECT a FROM t WHERE b = 3) x WHERE rownum <= 10")
+        self.assertEqual(sql, "SELECT * FROM (SELECT a FROM t WHERE b = :lit1) x WHERE rownum <= :lit2")
+        self.assertEqual(binds, {'lit1': 3, 'lit2': 10})
+
+    def test_normalizer(self):
+        normalizer = LiteralNormalizer()
+        for i in range(50):
+            sql, binds = normalizer.normalize(f"SELECT * FROM t WHERE id = {i} AND estat = :estat", {'estat': 'A'})
+        self.assertEqual(binds, {'estat': 'A', 'lit1': 49})
+        self.assertEqual(normalizer.normalize("SELECT * FROM t WHERE id = :1 AND n = 5", [1]),
+                         ("SELECT * FROM t WHERE id = :1 AND n = 5", [1]))
+        stats = normalizer.stats()
+        self.assertEqual((stats['normalized'], stats['skipped'], stats['forms'], stats['variants']), (50, 1, 1, 50))
+        self.assertEqual(normalizer.top(1)[0]['sql'], "SELECT * FROM t WHERE id = :lit1 AND estat = :estat")
+
+    def test_json_and_wait_keep_literals(self):
+        sql, binds = lift_literals("SELECT * FROM t WHERE JSON_VALUE(doc, '$.id') = 7 FOR UPDATE WAIT 3")
+        self.assertEqual(sql, "SELECT * FROM t WHERE JSON_VALUE(doc, '$.id') = :lit1 FOR UPDATE WAIT 3")
+        self.assertEqual(binds, {'lit1': 7})
+
+    def test_keyword_binds(self):
+        session = StandInSession()
+        pool = CursorPool(session, normalizer=LiteralNormalizer())
+        with pool.get() as curs:
+            curs.execute("SELECT * FROM t WHERE a = :x AND b = 5", x=1, fetch_lobs=False)
+        self.assertEqual(session.cursor_.calls[-1], ("SELECT * FROM t WHERE a = :x AND b = :lit1",
+                                                     {'x': 1, 'lit1': 5}, {'fetch_lobs': False}))
+
+
+if __name__ == '__main__':
+    unittest.main()
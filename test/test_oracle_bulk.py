@@ -0,0 +1,126 @@
+import datetime
+import decimal
+import math
+import unittest
+from collections import namedtuple
+
+import oracledb
+
+from GABDConnect import oracleConnection
+from GABDConnect.oracleConnection import _input_sizes, _iter_batches
+
+BatchError = namedtuple('BatchError', ['offset', 'full_code', 'message'])
+
+
+class StandInCursor:
+    """Cursor d'un controlador simulat que desa els lots i els tipus de `setinputsizes`."""
+
+    def __init__(self, session):
+        self.session = session
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rowfactory = None
+        self.inputtypehandler = None
+        self.outputtypehandler = None
+        self.statement = None
+        self.rowcount = 0
+        self._errors = []
+
+    def setinputsizes(self, *args, **kwargs):
+        self.session.input_sizes.append(args or kwargs)
+
+    def executemany(self, statement, parameters, batcherrors=False):
+        self.statement = statement
+        self.session.batches.append(parameters)
+        # La fila amb id negatiu es rebutja
+        self._errors = [BatchError(i, "ORA-02290", "check constraint violated")
+                        for i, row in enumerate(parameters) if row[0] < 0]
+        self.rowcount = len(parameters) - len(self._errors)
+
+    def getbatcherrors(self):
+        return self._errors
+
+    def close(self):
+        pass
+
+
+class StandInSession:
+    def __init__(self):
+        self.batches = []
+        self.input_sizes = []
+        self.commits = 0
+
+    def cursor(self):
+        return StandInCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+class BatchesTestCase(unittest.TestCase):
+    def test_iter_batches(self):
+        rows = ((i, f"nom {i}") for i in range(25))
+        batches = list(_iter_batches(rows, 10))
+        self.assertEqual([len(b) for b in batches], [10, 10, 5])
+        self.assertEqual(batches[2][0], (20, "nom 20"))
+        self.assertEqual(list(_iter_batches([], 10)), [])
+
+    def test_iter_batches_dataframe(self):
+        try:
+            import pandas as pd
+        except ImportError:
+            self.skipTest("pandas no està instal·lat")
+        df = pd.DataFrame({'id': [1, 2, 3], 'preu': [1.5, math.nan, 3.0],
+                           'dia': [pd.Timestamp('2026-10-19'), pd.NaT, pd.Timestamp('2026-10-20')]})
+        batches = list(_iter_batches(df, 2))
+        self.assertEqual([len(b) for b in batches], [2, 1])
+        self.assertEqual(batches[0][1][1:], (None, None))  # NaN i NaT -> NULL
+
+    def test_input_sizes(self):
+        batch = [(1, "ab", b"x", True, datetime.date(2026, 1, 1), datetime.datetime(2026, 1, 1, 10), None),
+                 (decimal.Decimal("2.5"), "abcde", b"y" * 3000, False, None, None, None)]
+        args, kwargs = _input_sizes(batch)
+        self.assertEqual(args, (oracledb.DB_TYPE_NUMBER, 5, oracledb.DB_TYPE_BLOB, oracledb.DB_TYPE_BOOLEAN,
+                                oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP, None))
+        self.assertEqual(kwargs, {})
+
+        args, kwargs = _input_sizes([{'id': 1, 'nom': "a", 'dades': b"xy"}, {'id': 2, 'nom': "", 'dades': None}])
+        self.assertEqual(args, ())
+        self.assertEqual(kwargs, {'id': oracledb.DB_TYPE_NUMBER, 'nom': 1, 'dades': oracledb.DB_TYPE_RAW})
+
+
+class BulkExecuteTestCase(unittest.TestCase):
+    SQL = "INSERT INTO t (id, nom) VALUES (:1, :2)"
+
+    def connection(self):
+        db = oracleConnection(user='u', passwd='p', hostname='localhost', ssh_data=None)
+        session = StandInSession()
+        db.conn = session
+        return db, session
+
+    def test_batches_errors_and_commits(self):
+        db, session = self.connection()
+        rows = [(i if i != 12 else -1, "x" * (i % 7)) for i in range(25)]
+        res = db.bulk_execute(self.SQL, iter(rows), batch_size=10, commit_every=2)
+
+        self.assertEqual([len(b) for b in session.batches], [10, 10, 5])
+        self.assertEqual((res['rows'], res['rowcount'], res['batches']), (25, 24, 3))
+        self.assertEqual([(e['row'], e['code']) for e in res['errors']], [(12, "ORA-02290")])
+        self.assertEqual(session.commits, 2)  # Després del segon lot i al final
+        # Els tipus es dedueixen de cada lot
+        self.assertEqual(session.input_sizes, [(oracledb.DB_TYPE_NUMBER, 6), (oracledb.DB_TYPE_NUMBER, 6),
+                                               (oracledb.DB_TYPE_NUMBER, 6)])
+
+    def test_fixed_input_sizes(self):
+        db, session = self.connection()
+        db.bulk_execute(self.SQL, [(1, "a"), (2, "b")], batch_size=1, input_sizes=[int, 100])
+        self.assertEqual(session.input_sizes, [(int, 100), (int, 100)])
+
+        db, session = self.connection()
+        db.bulk_execute(self.SQL, [(1, "a")], input_sizes=False)
+        self.assertEqual(session.input_sizes, [])
+        self.assertEqual(session.commits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import time
+import unittest
+
+from GABDConnect.oracle_cache import ResultCache, query_tables, dml_tables
+from GABDConnect.oracle_cursor import CursorPool
+
+
+class StandInCursor:
+    statement = None
+
+    def callproc(self, name, parameters=None, keyword_parameters=None):
+        return list(parameters or [])
+
+    def callfunc(self, name, return_type, parameters=None, keyword_parameters=None):
+        return 1
+
+
+class StandInSession:
+    def cursor(self):
+        return StandInCursor()
+
+
+class ResultCacheTestCase(unittest.TestCase):
+    def test_tables(self):
+        self.assertEqual(query_tables("SELECT * FROM espectacles.recintes r JOIN zones z ON r.id = z.recinte"),
+                         {'RECINTES', 'ZONES'})
+        self.assertEqual(query_tables("select e.nom from espectacles e, recintes r where e.recinte = r.codi"),
+                         {'ESPECTACLES', 'RECINTES'})
+        self.assertEqual(dml_tables("UPDATE espectacles.zones SET capacitat = 10"), {'ZONES'})
+        self.assertEqual(dml_tables("delete recintes where codi = :1"), {'RECINTES'})
+        self.assertEqual(dml_tables("SELECT 1 FROM dual"), set())
+        self.assertIsNone(dml_tables("BEGIN actualitza_preus; END;"))
+
+    def test_hinted_and_commented_dml(self):
+        self.assertEqual(dml_tables("INSERT /*+ APPEND */ INTO zones SELECT * FROM zones_tmp"), {'ZONES'})
+        self.assertEqual(dml_tables("MERGE /*+ x */ INTO recintes r USING dual ON (1 = 0)"), {'RECINTES'})
+        self.assertEqual(dml_tables("/* c */ UPDATE zones SET capacitat = 0"), {'ZONES'})
+        self.assertEqual(dml_tables("-- c\nUPDATE zones SET nom = '--'"), {'ZONES'})
+        self.assertEqual(dml_tables("/* c */ SELECT * FROM zones"), set())
+        self.assertEqual(dml_tables("COMMIT"), set())
+        # Sentències que no se sap quines taules modifiquen
+        self.assertIsNone(dml_tables("ROLLBACK"))
+        self.assertIsNone(dml_tables("/*+ ? */ INSERT FIRST WHEN 1 = 1 THEN INTO zones SELECT * FROM dual"))
+
+    def test_calls_notify_listeners(self):
+        cache = ResultCache()
+        cache.put(ResultCache.key("SELECT * FROM zones"), [(1,)], {'ZONES'})
+
+        def invalidate(statement, parameters, elapsed):
+            tables = dml_tables(statement)
+            cache.invalidate(*(tables or ()))
+
+        pool = CursorPool(StandInSession(), listeners=[invalidate])
+        with pool.get() as curs:
+            self.assertEqual(curs.callproc("actualitza_zones", [1]), [1])
+        self.assertEqual(len(cache), 0)
+
+        cache.put(ResultCache.key("SELECT * FROM zones"), [(1,)], {'ZONES'})
+        with pool.get() as curs:
+            curs.callfunc("compta_zones", int)
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_ttl_invalidation(self):
+        cache = ResultCache(size=2, ttl=0.2)
+        k1, k2, k3 = (ResultCache.key(f"SELECT {i} FROM  zones", [i]) for i in range(3))
+        cache.put(k1, [(1,)], {'ZONES'})
+        cache.put(k2, [(2,)], {'RECINTES'})
+        self.assertEqual(cache.get(k1), (True, [(1,)]))
+        self.assertEqual(ResultCache.key("SELECT 0 FROM zones", [0]), k1)
+
+        cache.put(k3, [(3,)], {'ZONES'})  # Expulsa k2, la menys usada
+        self.assertFalse(cache.get(k2)[0])
+
+        self.assertEqual(cache.invalidate('espectacles.zones'), 2)
+        self.assertEqual(len(cache), 0)
+
+        cache.put(k1, [(1,)], {'ZONES'})
+        time.sleep(0.3)
+        self.assertFalse(cache.get(k1)[0])
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['expirations']), (1, 2, 1, 1))
+
+    def test_key_keeps_literals(self):
+        self.assertEqual(ResultCache.key("SELECT *\n  FROM zones  WHERE nom = 'a b' ;", None),
+                         ResultCache.key("SELECT * FROM zones WHERE nom = 'a b'", None))
+        self.assertNotEqual(ResultCache.key("SELECT * FROM zones WHERE nom = 'a  b'", None),
+                            ResultCache.key("SELECT * FROM zones WHERE nom = 'a b'", None))
+        self.assertNotEqual(ResultCache.key("SELECT * FROM zones WHERE nom = q'[a  b]'", None),
+                            ResultCache.key("SELECT * FROM zones WHERE nom = q'[a b]'", None))
+        self.assertNotEqual(ResultCache.key('SELECT "a  b" FROM zones', None),
+                            ResultCache.key('SELECT "a b" FROM zones', None))
+
+
+if __name__ == '__main__':
+    unittest.main()
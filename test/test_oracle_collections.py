@@ -0,0 +1,86 @@
+import math
+import unittest
+from collections import namedtuple
+
+import oracledb
+
+from GABDConnect.oracle_collections import ArrayBind, TypeCache, array_length, bind_value, chunk_bounds
+
+Attribute = namedtuple('Attribute', ['name'])
+
+
+class FakeObject:
+    def __init__(self, values=None):
+        self.values = list(values) if values is not None else None
+
+
+class FakeObjectType:
+    """Tipus d'objecte o col·lecció amb la interfície de `oracledb.DbObjectType`."""
+
+    def __init__(self, name, element_type=None, attributes=()):
+        self.name = name
+        self.element_type = element_type
+        self.iscollection = element_type is not None
+        self.attributes = [Attribute(a) for a in attributes]
+
+    def newobject(self, values=None):
+        return FakeObject(values)
+
+
+class FakeConnection:
+    def __init__(self, types):
+        self.types = types
+        self.gettype_calls = 0
+
+    def gettype(self, name):
+        self.gettype_calls += 1
+        return self.types[name.upper()]
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.arrayvars = []
+
+    def arrayvar(self, typ, values, size=0):
+        self.arrayvars.append((typ, values, size))
+        return values
+
+
+class CollectionsTestCase(unittest.TestCase):
+    def test_associative_array(self):
+        curs = FakeCursor(FakeConnection({}))
+        noms = ArrayBind(["a", None, "abcd", "ab"])
+        self.assertEqual(bind_value(curs, noms, 1, 4, TypeCache()), [None, "abcd", "ab"])
+        self.assertEqual(curs.arrayvars[-1], (str, [None, "abcd", "ab"], 4))
+
+        bind_value(curs, ArrayBind([1.5, math.nan], oracledb.DB_TYPE_NUMBER), 0, 2, TypeCache())
+        self.assertEqual(curs.arrayvars[-1], (oracledb.DB_TYPE_NUMBER, [1.5, None], 0))
+
+    def test_object_collection_and_type_cache(self):
+        venda = FakeObjectType('VENDA_T', attributes=('ID', 'NOM'))
+        conn = FakeConnection({'VENDES_TAB': FakeObjectType('VENDES_TAB', element_type=venda)})
+        curs = FakeCursor(conn)
+        types = TypeCache()
+        rows = ArrayBind([{'id': 1, 'nom': 'a'}, (2, 'b'), None], 'vendes_tab')
+
+        first = bind_value(curs, rows, 0, 2, types)
+        second = bind_value(curs, rows, 2, 3, types)
+        self.assertEqual([(o.ID, o.NOM) for o in first.values], [(1, 'a'), (2, 'b')])
+        self.assertEqual(second.values, [None])
+        self.assertEqual(conn.gettype_calls, 1)
+        self.assertEqual(types.stats(), {'hits': 1, 'loads': 1, 'types': 1})
+
+        with self.assertRaises(ValueError):
+            bind_value(curs, ArrayBind([{'preu': 3}], 'VENDES_TAB'), 0, 1, types)
+
+    def test_chunks(self):
+        self.assertEqual(list(chunk_bounds(25, 10)), [(0, 10), (10, 20), (20, 25)])
+        self.assertEqual(list(chunk_bounds(0, 10)), [])
+        self.assertEqual(array_length([ArrayBind([1, 2]), ArrayBind("ab")]), 2)
+        with self.assertRaises(ValueError):
+            array_length([ArrayBind([1, 2]), ArrayBind([1])])
+
+
+if __name__ == '__main__':
+    unittest.main()
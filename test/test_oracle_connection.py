@@ -1,6 +1,8 @@
+import asyncio
 import time
 import unittest
 from GABDConnect.oracleConnection import oracleConnection as orcl
+from GABDConnect.AsyncOracleConnection import AsyncOracleConnection
 from GABDConnect.ssh_tunnel import get_free_port
 from typing import Optional, List, Union
 import logging
@@ -108,6 +110,141 @@ class OracleConnectTestCase(unittest.TestCase):
 
         time.sleep(5)
 
+    def test_pool_connection(self):
+        print("\nTest: test_pool_connection")
+        with orcl(hostname=self.hostname, port=self.port, ssh_data=self.ssh_server, user=self.user,
+                  passwd=self.pwd, serviceName=self.serviceName, pool={'min': 1, 'max': 4}) as db:
+            self.assertTrue(db.is_open, f"Should be able to connect to the Oracle database in {db} \
+            through SSH tunnel")
+
+            for _ in range(3):
+                with db.acquire() as conn:
+                    with conn.cursor() as curs:
+                        curs.execute("SELECT 1 FROM dual")
+                        self.assertEqual(curs.fetchone()[0], 1)
+
+            stats = db.pool_stats()
+            self.assertEqual(stats['acquires'], 3)
+            self.assertLessEqual(stats['opened'], 4)
+
+        self.assertIsNone(db.pool, "Pool should be closed after exiting the context")
+
+    def test_async_pool_connection(self):
+        print("\nTest: test_async_pool_connection")
+
+        async def run():
+            async with AsyncOracleConnection(hostname=self.hostname, port=self.port, ssh_data=self.ssh_server,
+                                             user=self.user, passwd=self.pwd, serviceName=self.serviceName,
+                                             pool={'min': 1, 'max': 4}) as db:
+                self.assertTrue(db.is_open)
+                return await asyncio.gather(*(db.fetchone("SELECT :1 FROM dual", [i]) for i in range(10)))
+
+        rows = asyncio.run(run())
+        self.assertEqual([r[0] for r in rows], list(range(10)))
+
+    def test_bulk_insert(self):
+        print("\nTest: test_bulk_insert")
+        with orcl(hostname=self.hostname, port=self.port, ssh_data=self.ssh_server, user=self.user,
+                  passwd=self.pwd, serviceName=self.serviceName) as db:
+            curs = db.cursor()
+            curs.execute("CREATE GLOBAL TEMPORARY TABLE gabd_bulk_test (id NUMBER PRIMARY KEY, nom VARCHAR2(20)) "
+                         "ON COMMIT PRESERVE ROWS")
+            try:
+                rows = [(i, f"fila {i}") for i in range(10000)] + [(0, "duplicada")]
+                res = db.bulk_insert("gabd_bulk_test", rows, columns=["id", "nom"], batch_size=2000)
+                self.assertEqual(res['rows'], 10001)
+                self.assertEqual(res['batches'], 6)
+                self.assertEqual([e['row'] for e in res['errors']], [10000])
+
+                curs.execute("SELECT count(*) FROM gabd_bulk_test")
+                self.assertEqual(curs.fetchone()[0], 10000)
+            finally:
+                db.conn.rollback()
+                curs.execute("TRUNCATE TABLE gabd_bulk_test")
+                curs.execute("DROP TABLE gabd_bulk_test")
+
+    def test_stream(self):
+        print("\nTest: test_stream")
+        with orcl(hostname=self.hostname, port=self.port, ssh_data=self.ssh_server, user=self.user,
+                  passwd=self.pwd, serviceName=self.serviceName) as db:
+            sql = "SELECT level AS n FROM dual CONNECT BY level <= :1"
+            lots = list(db.stream(sql, [2500], batch_size=1000))
+            self.assertEqual([len(lot) for lot in lots], [1000, 1000, 500])
+
+            files = list(db.stream(sql, [3], rowtype='dict', batches=False))
+            self.assertEqual(files, [{'N': 1}, {'N': 2}, {'N': 3}])
+
+    def test_fetch_df(self):
+        print("\nTest: test_fetch_df")
+        with orcl(hostname=self.hostname, port=self.port, ssh_data=self.ssh_server, user=self.user,
+                  passwd=self.pwd, serviceName=self.serviceName) as db:
+            sql = "SELECT level AS n, 'fila ' || level AS nom, sysdate AS dia FROM dual CONNECT BY level <= :1"
+            df = db.fetch_df(sql, [1000], dtypes={'NUMBER': 'int64'}, batch_size=300)
+            self.assertEqual(list(df.columns), ['N', 'NOM', 'DIA'])
+            self.assertEqual(len(df), 1000)
+            self.assertEqual(str(df['N'].dtype), 'int64')
+            self.assertEqual(int(df['N'].sum()), 1000 * 1001 // 2)
+
+            arrays = db.fetch_numpy(sql, [10])
+            self.assertEqual(len(arrays['N']), 10)
+
+    def test_cursor_reuse(self):
+        print("\nTest: test_cursor_reuse")
+        with orcl(hostname=self.hostname, port=self.port, ssh_data=self.ssh_server, user=self.user,
+                  passwd=self.pwd, serviceName=self.serviceName, stmtcachesize=40) as db:
+            self.assertEqual(db.conn.stmtcachesize, 40)
+            for i in range(20):
+                with db.cursor() as curs:
+                    self.assertEqual(curs.execute("SELECT :1 FROM dual", [i]).fetchone()[0], i)
+
+            stats = db.cursor_stats()
+            self.assertLessEqual(stats['created'], 2)
+            self.assertGreaterEqual(stats['reused'], 19)
+
+    def test_is_open_liveness(self):
+        print("\nTest: test_is_open_liveness")
+        with orcl(hostname=self.hostname, port=self.port, ssh_data=self.ssh_server, user=self.user,
+                  passwd=self.pwd, serviceName=self.serviceName, liveness_interval=60) as db:
+            start = time.perf_counter()
+            self.assertTrue(all(db.is_open for _ in range(1000)))
+            # Sense pings, mil lectures no poden trigar com mil viatges pel túnel
+            self.assertLess(time.perf_counter() - start, 1.0)
+            self.assertTrue(db.check_alive())
+
+        self.assertFalse(db.is_open)
+
+    def test_dbms_output_messages(self):
+        print("\nTest: test_dbms_output_messages")
+        with orcl(hostname=self.hostname, port=self.port, ssh_data=self.ssh_server, user=self.user,
+                  passwd=self.pwd, serviceName=self.serviceName) as db:
+            curs = db.cursor()
+            curs.execute("BEGIN FOR i IN 1..2500 LOOP dbms_output.put_line('linia ' || i); END LOOP; END;")
+            missatges = db.get_messages(num_lines=1000)
+            self.assertEqual(len(missatges), 2500)
+            self.assertEqual(missatges[0], 'linia 1')
+            self.assertEqual(missatges[-1], 'linia 2500')
+            self.assertEqual(db.get_messages(), [])
+
+    def test_parallel_chunks(self):
+        print("\nTest: test_parallel_chunks")
+        with orcl(hostname=self.hostname, port=self.port, ssh_data=self.ssh_server, user=self.user,
+                  passwd=self.pwd, serviceName=self.serviceName, pool={'min': 1, 'max': 4}) as db:
+            curs = db.cursor()
+            curs.execute("CREATE TABLE gabd_parallel_test AS SELECT level AS id, 0 AS v FROM dual "
+                         "CONNECT BY level <= 20000")
+            try:
+                estat = db.parallel_execute("UPDATE gabd_parallel_test SET v = 1 "
+                                            "WHERE rowid BETWEEN :start_id AND :end_id",
+                                            table="gabd_parallel_test", chunks=4)
+                self.assertTrue(all(st['error'] is None for st in estat))
+                self.assertEqual(sum(st['rows'] for st in estat), 20000)
+
+                files = db.parallel_query("SELECT id FROM gabd_parallel_test WHERE v = 1 AND id BETWEEN :start_id "
+                                          "AND :end_id", table="gabd_parallel_test", by="id", chunks=4)
+                self.assertEqual(sorted(r[0] for r in files), list(range(1, 20001)))
+            finally:
+                curs.execute("DROP TABLE gabd_parallel_test PURGE")
+
     def test_tunnel_ssh_key(self):
         print("\nTest SSH tunnel with SSH key")
         GRUP = "grup00"
@@ -0,0 +1,165 @@
+import time
+import unittest
+from unittest import mock
+
+from GABDConnect import oracleConnection
+
+
+class StandInCursor:
+    """Cursor d'un controlador simulat que compta els viatges d'anada i tornada de la sessió."""
+
+    def __init__(self, session):
+        self.session = session
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rowfactory = None
+        self.inputtypehandler = None
+        self.outputtypehandler = None
+        self.statement = None
+
+    def execute(self, statement, parameters=None, **kwargs):
+        self.session.round_trips += 1
+        self.statement = statement
+
+    def callproc(self, name, parameters=None, keyword_parameters=None):
+        self.session.round_trips += 1
+        self.session.calls.append(name)
+        if name == "dbms_output.get_lines":
+            lines, num_lines = parameters
+            fetched = self.session.output[:num_lines.getvalue()]
+            del self.session.output[:len(fetched)]
+            lines.setvalue(0, fetched)
+            num_lines.setvalue(0, len(fetched))
+
+    def arrayvar(self, typ, size, item_size=0):
+        return StandInVar([None] * size)
+
+    def var(self, typ):
+        return StandInVar(None)
+
+    def close(self):
+        pass
+
+
+class StandInVar:
+    def __init__(self, value):
+        self.value = value
+
+    def setvalue(self, pos, value):
+        self.value = value
+
+    def getvalue(self):
+        return self.value
+
+
+class StandInSession:
+    def __init__(self):
+        self.round_trips = 0
+        self.cursors = 0
+        self.calls = []
+        self.output = []  # Línies pendents del buffer de DBMS_OUTPUT
+
+    def cursor(self):
+        self.cursors += 1
+        return StandInCursor(self)
+
+    def is_healthy(self):
+        return True
+
+    def ping(self):
+        self.round_trips += 1
+
+
+def connection(**params):
+    db = oracleConnection(user='u', passwd='p', hostname='localhost', ssh_data=None, **params)
+    session = StandInSession()
+    db.conn = session
+    return db, session
+
+
+class CursorPoolTestCase(unittest.TestCase):
+    STATEMENTS = 100
+
+    def run_statements(self, db, reenable=False):
+        for i in range(self.STATEMENTS):
+            if reenable:
+                db.enable_output()  # El que feia cada crida a cursor() abans del pool
+            with db.cursor() as curs:
+                curs.execute("UPDATE t SET n = n + 1 WHERE id = :1", [i])
+
+    def test_round_trips_per_statement(self):
+        db, session = connection()
+        self.run_statements(db)
+        pooled = session.round_trips / self.STATEMENTS
+
+        db_old, session_old = connection(cursor_pool_size=0)
+        self.run_statements(db_old, reenable=True)
+        unpooled = session_old.round_trips / self.STATEMENTS
+
+        # Un DBMS_OUTPUT.ENABLE per sessió en lloc d'un per cursor, i els cursors es reutilitzen (el segon és el
+        # de DBMS_OUTPUT.ENABLE, obtingut mentre el primer és en ús)
+        self.assertEqual(pooled, 1.01)
+        self.assertEqual(unpooled, 2.0)
+        self.assertEqual(session.calls, ["dbms_output.enable"])
+        self.assertEqual(session.cursors, 2)
+        self.assertEqual(session_old.cursors, 2 * self.STATEMENTS)
+        self.assertEqual(db.cursor_stats()['reused'], self.STATEMENTS - 1)
+
+    def test_reset_on_return(self):
+        db, session = connection(dbms_output=False)
+        handler = object()
+        with db.cursor() as curs:
+            curs.arraysize = 5000
+            curs.inputtypehandler = handler
+            curs.outputtypehandler = handler
+        with db.cursor() as curs:
+            raw = curs.cursor
+            self.assertEqual(session.cursors, 1)
+            self.assertIsNone(raw.inputtypehandler)
+            self.assertIsNone(raw.outputtypehandler)
+            self.assertNotEqual(raw.arraysize, 5000)
+        self.assertEqual(session.round_trips, 0)
+
+
+class OutputTestCase(unittest.TestCase):
+    def test_messages_in_batches(self):
+        db, session = connection(dbms_output=False)
+        session.output = [f"línia {i}" for i in range(25)] + [None]
+
+        messages = db.iter_messages(num_lines=10)
+        self.assertEqual(next(messages), "línia 0")
+        self.assertEqual(session.round_trips, 1)  # Les 10 primeres línies en una sola crida
+        rest = list(messages)
+        self.assertEqual(rest[-2:], ["línia 24", ""])  # Les línies buides arriben com a NULL
+        self.assertEqual(len(rest), 25)
+        self.assertEqual(session.calls, ["dbms_output.get_lines"] * 3)
+
+        session.output = [f"línia {i}" for i in range(20)]
+        self.assertEqual(len(db.get_messages(num_lines=10)), 20)
+        # Dos lots plens i un de buit, que indica que no en queden més
+        self.assertEqual(session.calls[3:], ["dbms_output.get_lines"] * 3)
+
+
+class LivenessTestCase(unittest.TestCase):
+    def test_ping_only_after_liveness_interval(self):
+        db, session = connection(liveness_interval=30.0, dbms_output=False)
+        with db.cursor() as curs:
+            curs.execute("UPDATE t SET n = n + 1")
+        self.assertEqual(session.round_trips, 1)
+        used = time.monotonic()
+
+        with mock.patch('time.monotonic', return_value=used + 29):
+            self.assertTrue(db.is_open)
+        self.assertEqual(session.round_trips, 1)  # El servidor ha respost fa menys de 30 s: cap ping
+
+        with mock.patch('time.monotonic', return_value=used + 31):
+            self.assertTrue(db.is_open)
+        self.assertEqual(session.round_trips, 2)
+
+        with mock.patch('time.monotonic', return_value=used + 50):
+            self.assertTrue(db.is_open)  # El ping de fa 19 s compta com a resposta
+        self.assertEqual(session.round_trips, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
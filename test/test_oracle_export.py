@@ -0,0 +1,99 @@
+import csv
+import gzip
+import os
+import tempfile
+import unittest
+from collections import namedtuple
+
+import oracledb
+
+from GABDConnect.oracle_export import CsvBatchWriter, ParquetBatchWriter, read_lobs, write_batches
+
+Column = namedtuple('Column', ['name', 'type', 'precision', 'scale'])
+
+DESCRIPTION = [Column('ID', oracledb.DB_TYPE_NUMBER, 10, 0), Column('NOM', oracledb.DB_TYPE_VARCHAR, None, None),
+               Column('DADES', oracledb.DB_TYPE_RAW, None, None)]
+ROWS = [(i, f"nom {i}", bytes([i % 256])) for i in range(1000)]
+
+
+def batches(rows, size):
+    return (rows[i:i + size] for i in range(0, len(rows), size))
+
+
+class StandInLob:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+class FailingWriter:
+    def __init__(self):
+        self.writes = 0
+
+    def write(self, rows):
+        self.writes += 1
+        raise OSError("disc ple")
+
+
+class ExportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_csv_gzip(self):
+        path = os.path.join(self.dir.name, "sortida.csv.gz")
+        writer = CsvBatchWriter(path, DESCRIPTION)
+        stats = write_batches(batches(ROWS, 64), writer)
+        writer.close()
+
+        self.assertEqual((stats['rows'], stats['batches']), (1000, 16))
+        with gzip.open(path, 'rt', newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['ID', 'NOM', 'DADES'])
+        self.assertEqual(rows[2], ['1', 'nom 1', '01'])
+        self.assertEqual(len(rows), 1001)
+
+    def test_writer_error_stops_reading(self):
+        read = []
+
+        def source():
+            for rows in batches(ROWS, 10):
+                read.append(rows)
+                yield rows
+
+        writer = FailingWriter()
+        with self.assertRaises(OSError):
+            write_batches(source(), writer, queue_size=2)
+        self.assertEqual(writer.writes, 1)
+        self.assertLess(len(read), 10)
+
+    def test_read_lobs(self):
+        description = [Column('ID', oracledb.DB_TYPE_NUMBER, 10, 0), Column('TEXT', oracledb.DB_TYPE_CLOB, None, None)]
+        batches = [[(1, StandInLob("a" * 10)), (2, None)], [(3, "inline")]]
+        self.assertEqual(list(read_lobs(batches, description)),
+                         [[[1, "a" * 10], [2, None]], [[3, "inline"]]])
+
+    def test_parquet_row_groups(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow no està instal·lat")
+        path = os.path.join(self.dir.name, "sortida.parquet")
+        writer = ParquetBatchWriter(path, DESCRIPTION, row_group_size=300)
+        write_batches(batches(ROWS, 64), writer, threaded=False)
+        writer.close()
+
+        metadata = pq.ParquetFile(path).metadata
+        self.assertEqual([metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)],
+                         [300, 300, 300, 100])
+        table = pq.read_table(path)
+        self.assertEqual(str(table.schema.field('ID').type), 'int64')
+        self.assertEqual(table.column('NOM')[999].as_py(), "nom 999")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import io
+import unittest
+
+import oracledb
+
+from GABDConnect.oracle_lob import LobReader, aligned_chunk_size, write_lob
+
+
+class FakeLob:
+    """LOB en memòria amb la interfície síncrona d'`oracledb.LOB`."""
+
+    type = oracledb.DB_TYPE_BLOB
+
+    def __init__(self, data=b"", chunk_size=8):
+        self.data = bytearray(data)
+        self.chunk_size = chunk_size
+        self.reads = []
+        self.writes = 0
+        self.is_open = False
+
+    def getchunksize(self):
+        return self.chunk_size
+
+    def size(self):
+        return len(self.data)
+
+    def read(self, offset=1, amount=None):
+        self.reads.append(amount)
+        return bytes(self.data[offset - 1:offset - 1 + amount])
+
+    def write(self, data, offset=1):
+        self.data[offset - 1:offset - 1 + len(data)] = data
+        self.writes += 1
+
+    def open(self):
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
+
+class LobTestCase(unittest.TestCase):
+    def test_aligned_chunk_size(self):
+        self.assertEqual(aligned_chunk_size(8), 128)
+        self.assertEqual(aligned_chunk_size(8, 20), 24)
+        self.assertEqual(aligned_chunk_size(8, 1), 8)
+
+    def test_reader(self):
+        data = bytes(range(256)) * 4
+        lob = FakeLob(data)
+        with LobReader(lob, chunk_size=100) as f:
+            chunks = list(f)
+        self.assertEqual(b"".join(chunks), data)
+        self.assertTrue(all(n == 104 for n in lob.reads))
+
+        f = LobReader(lob)
+        f.seek(-10, 2)
+        self.assertEqual(f.read(), data[-10:])
+        self.assertEqual(f.read(5), b"")
+        f.seek(3)
+        self.assertEqual(f.read(4), data[3:7])
+        self.assertEqual(f.tell(), 7)
+
+    def test_write(self):
+        data = b"x" * 1000
+        lob = FakeLob()
+        self.assertEqual(write_lob(lob, io.BytesIO(data), chunk_size=256), 1000)
+        self.assertEqual(bytes(lob.data), data)
+        self.assertEqual(lob.writes, 4)
+        self.assertFalse(lob.is_open)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+
+import oracledb
+
+from GABDConnect.oracle_metadata import MetadataCache, input_size, split_name
+
+# Files de la consulta del diccionari de dades per a l'esquema GABD
+ROWS = [
+    ('RECINTES', 'CODI', 'NUMBER', 22, 0, 10, 0, 'N', 1, 'PK_RECINTES', 'P', 1, None, None),
+    ('RECINTES', 'NOM', 'VARCHAR2', 200, 50, None, None, 'Y', 2, 'UK_RECINTES', 'U', 1, None, None),
+    ('ZONES', 'RECINTE', 'NUMBER', 22, 0, 10, 0, 'N', 1, 'FK_ZONES', 'R', 1, 'GABD', 'RECINTES'),
+    ('ZONES', 'RECINTE', 'NUMBER', 22, 0, 10, 0, 'N', 1, 'PK_ZONES', 'P', 1, None, None),
+    ('ZONES', 'ZONA', 'VARCHAR2', 20, 20, None, None, 'N', 2, 'PK_ZONES', 'P', 2, None, None),
+    ('ZONES', 'CREADA', 'TIMESTAMP(6)', 11, 0, None, 6, 'Y', 3, None, None, None, None, None),
+]
+
+
+class FakeCursor:
+    def __init__(self, log, schema='GABD'):
+        self.log = log
+        self.schema = schema
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.log.append(sql if 'sys_context' in sql else params['owner'])
+        self._rows = [(self.schema,)] if 'sys_context' in sql else ROWS
+        return self
+
+    def fetchone(self):
+        return self._rows[0]
+
+    def fetchall(self):
+        return self._rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class MetadataCacheTestCase(unittest.TestCase):
+    def test_split_name(self):
+        self.assertEqual(split_name("gabd.recintes"), ('GABD', 'RECINTES'))
+        self.assertEqual(split_name('"Gabd"."Zones x"'), ('Gabd', 'Zones x'))
+        self.assertEqual(split_name("zones"), (None, 'ZONES'))
+
+    def test_lookup_and_invalidation(self):
+        log = []
+        cache = MetadataCache(ttl=None)
+
+        def factory():
+            return FakeCursor(log)
+
+        zones = cache.table(factory, "zones")
+        self.assertEqual(zones.column_names, ['RECINTE', 'ZONA', 'CREADA'])
+        self.assertEqual(zones.primary_key, ['RECINTE', 'ZONA'])
+        self.assertEqual(zones.foreign_keys['FK_ZONES'], {'columns': ['RECINTE'], 'ref_owner': 'GABD',
+                                                          'ref_table': 'RECINTES'})
+        self.assertFalse(zones['zona'].nullable)
+        self.assertEqual(input_size(zones['ZONA']), 20)
+        self.assertIs(input_size(zones['CREADA']), oracledb.DB_TYPE_TIMESTAMP)
+
+        recintes = cache.table(factory, "GABD.recintes")
+        self.assertEqual(recintes.unique_keys, {'UK_RECINTES': ['NOM']})
+        self.assertIsNone(cache.table(factory, "no_existeix"))
+        self.assertEqual(len(log), 2)  # sys_context i una consulta per a tot l'esquema
+
+        cache.invalidate_ddl("SELECT * FROM zones")
+        cache.table(factory, "zones")
+        self.assertEqual(len(log), 2)
+
+        cache.invalidate_ddl("ALTER TABLE zones ADD (preu NUMBER)")
+        cache.table(factory, "zones")
+        self.assertEqual(len(log), 3)
+        self.assertEqual(cache.stats()['loads'], 2)
+
+    def test_alter_session_resets_default_owner(self):
+        log = []
+        cache = MetadataCache(ttl=None)
+        session = {'schema': 'GABD'}
+        locked = []
+
+        def factory():
+            locked.append(cache._lock.locked())  # La càrrega es fa sense el bloqueig
+            return FakeCursor(log, session['schema'])
+
+        cache.table(factory, "zones")
+        self.assertEqual(cache.default_owner, 'GABD')
+
+        session['schema'] = 'ALTRE'
+        cache.invalidate_ddl("ALTER SESSION SET CURRENT_SCHEMA = altre")
+        self.assertIsNone(cache.default_owner)
+        cache.table(factory, "zones")
+        self.assertEqual(cache.default_owner, 'ALTRE')
+        self.assertEqual(log[-1], 'ALTRE')
+        self.assertEqual(cache.stats()['schemas'], 2)  # L'esquema GABD no s'ha invalidat
+        self.assertEqual(locked, [False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from GABDConnect.oracle_parallel import run_chunks
+
+
+class StandInCursor:
+    rowcount = 10
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, statement, parameters=None):
+        pass
+
+
+class StandInSession:
+    def __init__(self, log):
+        self.log = log
+
+    def cursor(self):
+        return StandInCursor()
+
+    def commit(self):
+        self.log.append('commit')
+
+    def rollback(self):
+        self.log.append('rollback')
+
+
+class RunChunksTestCase(unittest.TestCase):
+    SQL = "UPDATE vendes SET iva = import * 0.21 WHERE rowid BETWEEN :start_id AND :end_id"
+
+    def run_chunks(self, commit):
+        log = []
+        status = run_chunks(lambda: StandInSession(log), lambda conn: log.append('release'), self.SQL,
+                            [(1, 10), (11, 20)], workers=1, commit=commit)
+        return status, log
+
+    def test_commit(self):
+        status, log = self.run_chunks(commit=True)
+        self.assertEqual([st['rows'] for st in status], [10, 10])
+        self.assertEqual(log, ['commit', 'release'] * 2)
+
+    def test_dry_run_rolls_back(self):
+        # Sense commit, cada rang desfà els canvis abans de tornar la sessió
+        status, log = self.run_chunks(commit=False)
+        self.assertEqual([st['rows'] for st in status], [10, 10])
+        self.assertEqual(log, ['rollback', 'release'] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+
+import oracledb
+
+from GABDConnect.oracle_pipeline import StatementPipeline, _rename_binds
+
+
+class StandInVar:
+    def __init__(self):
+        self.value = None
+
+    def getvalue(self):
+        return self.value
+
+
+class StandInCursor:
+    """Cursor d'un controlador simulat: compta els viatges i falla amb les sentències que contenen 'FALLA'."""
+
+    def __init__(self, session):
+        self.session = session
+        self.rowcount = 0
+        self.arraysize = 100
+        self.prefetchrows = 2
+
+    def execute(self, statement, parameters=None):
+        self.session.round_trips += 1
+        if "FALLA" in statement:
+            raise oracledb.DatabaseError("ORA-00942: table or view does not exist")
+        self.session.statements.append((statement, parameters))
+        if statement.startswith("BEGIN"):
+            for name, value in parameters.items():
+                if isinstance(value, StandInVar):
+                    value.value = 1
+        self.rowcount = 1
+        return self
+
+    def fetchall(self):
+        return [(1,), (2,)]
+
+    def fetchone(self):
+        return (1,)
+
+    def var(self, typ):
+        return StandInVar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class StandInSession:
+    def __init__(self):
+        self.round_trips = 0
+        self.statements = []
+        self.commits = 0
+
+    def cursor(self):
+        return StandInCursor(self)
+
+    def commit(self):
+        self.round_trips += 1
+        self.commits += 1
+
+
+class PipelineFallbackTestCase(unittest.TestCase):
+    def test_rename_binds(self):
+        sql, binds = _rename_binds("UPDATE t SET a = :1, b = ':2' WHERE c = :1 -- :3", [10, 20], "p0_")
+        self.assertEqual(sql, "UPDATE t SET a = :p0_0, b = ':2' WHERE c = :p0_1 -- :3")
+        self.assertEqual(binds, {'p0_0': 10, 'p0_1': 20})
+
+        sql, binds = _rename_binds("DELETE FROM t WHERE id = :id", {'id': 5}, "p1_")
+        self.assertEqual((sql, binds), ("DELETE FROM t WHERE id = :p1_id", {'p1_id': 5}))
+
+        sql, binds = _rename_binds("DELETE FROM t WHERE id = :ID", {'id': None}, "p2_")
+        self.assertEqual(binds, {'p2_ID': None})
+        with self.assertRaisesRegex(KeyError, ":nom"):
+            _rename_binds("UPDATE t SET nom = :nom WHERE id = :id", {'id': 5}, "p3_")
+
+    def test_round_trips(self):
+        session = StandInSession()
+        p = StatementPipeline()
+        inserts = [p.execute("INSERT INTO log (id) VALUES (:1)", [i]) for i in range(50)]
+        p.commit()
+        rows = p.fetchall("SELECT id FROM log")
+        p.run_fallback(session.cursor, session.commit)
+
+        # 50 INSERT + commit en un sol bloc PL/SQL i la consulta: 2 viatges en lloc de 52
+        self.assertEqual(session.round_trips, 2)
+        self.assertEqual(p.round_trips, 2)
+        self.assertTrue(session.statements[0][0].startswith("BEGIN"))
+        self.assertIn("COMMIT;", session.statements[0][0])
+        self.assertEqual([r.rowcount for r in inserts], [1] * 50)
+        self.assertEqual(rows.rows, [(1,), (2,)])
+
+    def test_block_error_falls_back(self):
+        session = StandInSession()
+        p = StatementPipeline(continue_on_error=True)
+        ok = p.execute("INSERT INTO log (id) VALUES (:1)", [1])
+        ko = p.execute("INSERT INTO FALLA (id) VALUES (:1)", [2])
+        p.commit()
+        p.run_fallback(session.cursor, session.commit)
+
+        self.assertIsNone(ok.error)
+        self.assertIsInstance(ko.error, oracledb.DatabaseError)
+        self.assertEqual(session.commits, 1)
+
+    def test_commit_splits_blocks(self):
+        session = StandInSession()
+        p = StatementPipeline(continue_on_error=True)
+        first = p.execute("INSERT INTO log (id) VALUES (:1)", [1])
+        p.commit()
+        ko = p.execute("INSERT INTO FALLA (id) VALUES (:1)", [2])
+        p.run_fallback(session.cursor, session.commit)
+
+        # El primer INSERT ja és confirmat quan falla el segon: no es pot tornar a executar
+        executed = [s for s, _ in session.statements if "INSERT INTO log" in s]
+        self.assertEqual(len(executed), 1)
+        self.assertTrue(executed[0].rstrip().endswith("COMMIT;\nEND;"))
+        self.assertEqual(first.rowcount, 1)
+        self.assertIsInstance(ko.error, oracledb.DatabaseError)
+
+
+if __name__ == '__main__':
+    unittest.main()
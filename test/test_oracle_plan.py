@@ -0,0 +1,120 @@
+import unittest
+
+from GABDConnect import oracleConnection
+from GABDConnect.oracle_plan import _CURSOR_PLAN_SQL, _LAST_STATEMENT_SQL, ExecutionPlan, PlanStep, add_hint
+
+
+def step(id, parent, depth, operation, options, name, cost, card, starts=None, actual=None):
+    return PlanStep(id, parent, depth, operation, options, None, name, cost, card, None, None, None, None,
+                    starts, actual, None, None, None)
+
+
+class ExecutionPlanTestCase(unittest.TestCase):
+    def test_add_hint(self):
+        self.assertEqual(add_hint("SELECT * FROM t", "gather_plan_statistics"),
+                         "SELECT /*+ gather_plan_statistics */ * FROM t")
+        self.assertEqual(add_hint("select /*+ full(t) */ * from t", "gather_plan_statistics"),
+                         "select /*+ gather_plan_statistics full(t) */ * from t")
+        with self.assertRaises(ValueError):
+            add_hint("BEGIN NULL; END;", "monitor")
+
+    def test_plan(self):
+        plan = ExecutionPlan([
+            step(0, None, 0, 'SELECT STATEMENT', None, None, 12, 100, 1, 5000),
+            step(1, 0, 1, 'HASH JOIN', None, None, 12, 100, 1, 5000),
+            step(2, 1, 2, 'TABLE ACCESS', 'FULL', 'ZONES', 3, 10, 1, 12),
+            step(3, 1, 2, 'INDEX', 'RANGE SCAN', 'RECINTES_IX', 2, 50, 1, 40),
+        ])
+        self.assertEqual(plan.cost, 12)
+        self.assertEqual(plan.access_paths(), ['TABLE ACCESS FULL ZONES', 'INDEX RANGE SCAN RECINTES_IX'])
+        self.assertEqual([s.id for s in plan.full_scans()], [2])
+        self.assertEqual(plan.full_scans('recintes_ix'), [])
+        self.assertEqual([s.id for s in plan.find('index')], [3])
+        self.assertEqual([s.id for s in plan.misestimates(10)], [0, 1])
+
+
+class StandInCursor:
+    """Cursor d'un controlador simulat: el SQL_ID de cada sentència és el seu text."""
+
+    def __init__(self, session):
+        self.session = session
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rowfactory = None
+        self.inputtypehandler = None
+        self.outputtypehandler = None
+        self.statement = None
+        self.description = None
+        self.rowcount = 0
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def execute(self, statement, parameters=None, **kwargs):
+        self.statement = statement
+        self.description = [('X',)]
+        if statement == _LAST_STATEMENT_SQL:
+            self._rows = [(self.session.prev_sql_id, 0)]
+            return self
+        if statement == _CURSOR_PLAN_SQL:
+            sql_id = parameters[0]
+            self._rows = [(0, None, 0, 'SELECT STATEMENT', None, None, None, 2, 1, None, None, None, None,
+                           1, 1, 10, 3, 0, 42)] if sql_id == self.session.statement else []
+        elif 'DBMS_XPLAN' in statement:
+            self._rows = [("Plan hash value: 42",)]
+        elif 'v$mystat' in statement:
+            self._rows = [('session logical reads', 10)]
+        else:
+            self._rows = [(1,)]
+        self.session.prev_sql_id = statement
+        return self
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size=None):
+        return self.fetchall()
+
+    def close(self):
+        pass
+
+
+class StandInSession:
+    def __init__(self, statement):
+        self.statement = statement
+        self.prev_sql_id = None
+
+    def cursor(self):
+        return StandInCursor(self)
+
+
+class ProfiledPlanTestCase(unittest.TestCase):
+    def connection(self, statement):
+        db = oracleConnection(user='u', passwd='p', hostname='localhost', ssh_data=None,
+                              profile={'server_stats': True})
+        db.conn = StandInSession(statement)
+        return db
+
+    def test_plan_statistics_with_server_stats(self):
+        # Amb el perfilat, el cursor del pool consulta v$mystat després de cada sentència: el pla ha de ser el de
+        # la sentència, no el d'aquesta consulta
+        executed = "SELECT /*+ gather_plan_statistics */ * FROM t WHERE id = :1"
+        plan = self.connection(executed).plan_statistics("SELECT * FROM t WHERE id = :1", [1])
+        self.assertEqual((plan.sql_id, plan.plan_hash_value), (executed, 42))
+
+    def test_explain_binds_with_server_stats(self):
+        sql = "SELECT * FROM t WHERE id = :1"
+        plan = self.connection(sql).explain(sql, [1])
+        self.assertEqual(plan.sql_id, sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
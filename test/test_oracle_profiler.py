@@ -0,0 +1,126 @@
+import time
+import unittest
+from types import SimpleNamespace
+
+from GABDConnect.oracle_cursor import CursorPool
+from GABDConnect.oracle_profiler import StatementProfiler, sql_id
+
+
+class StandInCursor:
+    """Cursor d'un controlador simulat: les consultes retornen `rows` files i cada lectura tarda 1 ms."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.arraysize = 2
+        self.prefetchrows = 2
+        self.rowfactory = None
+        self.inputtypehandler = None
+        self.outputtypehandler = None
+        self.statement = None
+        self.description = None
+        self.rowcount = 0
+        self._pending = []
+
+    def execute(self, statement, parameters=None, **kwargs):
+        self.statement = statement
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.description = [("ID",)]
+            self._pending = [(i,) for i in range(self.rows)]
+        else:
+            self.description = None
+            self.rowcount = 3
+
+    def fetchone(self):
+        time.sleep(0.001)
+        return self._pending.pop(0) if self._pending else None
+
+    def fetchmany(self, size=None):
+        time.sleep(0.001)
+        size = size or self.arraysize
+        rows, self._pending = self._pending[:size], self._pending[size:]
+        return rows
+
+    def fetchall(self):
+        time.sleep(0.001)
+        rows, self._pending = self._pending, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class StandInSession:
+    def cursor(self):
+        return StandInCursor(rows=5)
+
+
+class StatementProfilerTestCase(unittest.TestCase):
+    def test_sql_id(self):
+        # El mateix SQL_ID que Oracle mostra a v$sql
+        self.assertEqual(sql_id("select * from dual"), "a5ks9fhw2v9s1")
+
+    def test_top_and_callbacks(self):
+        profiler = StatementProfiler()
+        records = []
+        profiler.add_callback(records.append)
+        cursor = SimpleNamespace(prefetchrows=2, arraysize=100)
+
+        for sql, rows, times in (("SELECT * FROM recintes", 1000, 3), ("SELECT * FROM zones", 10, 1)):
+            for _ in range(times):
+                record = profiler.start(cursor, sql, connection=None)
+                record.rows = rows
+                record.fetch_time = 0.001
+                profiler.finish(record, connection=None)
+
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[0].fetch_round_trips, 10)
+        top = profiler.top(1, by='executions')
+        self.assertEqual((top[0]['sql'], top[0]['executions'], top[0]['rows']), ("SELECT * FROM recintes", 3, 3000))
+        self.assertIn(sql_id("SELECT * FROM zones"), profiler.report())
+
+
+class ProfiledCursorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.profiler = StatementProfiler()
+        self.records = []
+        self.profiler.add_callback(self.records.append)
+        self.pool = CursorPool(StandInSession(), profiler=self.profiler)
+
+    def test_rows_and_fetch_time(self):
+        with self.pool.get() as curs:
+            curs.execute("SELECT id FROM recintes")
+            self.assertEqual(len(curs.fetchmany()), 2)
+            self.assertEqual(self.records, [])  # Encara queden files per llegir
+            self.assertEqual(len(curs.fetchall()), 3)
+            self.assertEqual(len(self.records), 1)
+
+            curs.execute("UPDATE recintes SET actiu = 1")
+        self.assertEqual(len(self.records), 2)
+
+        query, dml = self.records
+        self.assertEqual((query.sql, query.rows), ("SELECT id FROM recintes", 5))
+        self.assertGreaterEqual(query.fetch_time, 0.002)
+        self.assertEqual(query.fetch_round_trips, 2)
+        self.assertEqual((dml.rows, dml.fetch_time), (3, 0.0))
+        self.assertEqual(self.profiler.top(1, by='rows')[0]['rows'], 5)
+
+    def test_partial_fetch_recorded_on_close_or_reuse(self):
+        curs = self.pool.get()
+        curs.execute("SELECT id FROM recintes")
+        curs.fetchone()
+        # Reutilitzar el cursor tanca la mesura de la consulta anterior
+        curs.execute("SELECT id FROM zones")
+        self.assertEqual([(r.sql, r.rows) for r in self.records], [("SELECT id FROM recintes", 1)])
+
+        rows = iter(curs)
+        self.assertEqual((next(rows), next(rows)), ((0,), (1,)))
+        curs.close()
+        self.assertEqual([(r.sql, r.rows) for r in self.records][1:], [("SELECT id FROM zones", 2)])
+        self.assertGreater(self.records[1].fetch_time, 0)
+
+        curs.close()  # Tancar-lo dues vegades no el torna a anotar
+        self.assertEqual(len(self.records), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from GABDConnect.oracle_stats import StatsSnapshot
+
+
+class FakeCursor:
+    """Retorna una instantània diferent a cada consulta."""
+
+    def __init__(self, snapshots, log):
+        self.snapshots = snapshots
+        self.log = log
+
+    def execute(self, sql, params=None):
+        self.log.append(sql)
+        return self
+
+    def fetchall(self):
+        return self.snapshots[len(self.log) - 1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class StatsSnapshotTestCase(unittest.TestCase):
+    def test_deltas(self):
+        before = [('session', 'session logical reads', 100, None), ('session', 'redo size', 0, None),
+                  ('session', 'user commits', 3, None),
+                  ('session_event', 'db file sequential read', 1000, 2)]
+        after = [('session', 'session logical reads', 1600, None), ('session', 'redo size', 5120, None),
+                 ('session', 'user commits', 3, None),
+                 ('session_event', 'db file sequential read', 501000, 12),
+                 ('session_event', 'log file sync', 2000, 1)]
+        log = []
+        snapshot = StatsSnapshot(lambda: FakeCursor([before, after], log), ['session', 'session_event'])
+        with snapshot as report:
+            pass
+
+        self.assertEqual(len(log), 2)
+        self.assertIn("UNION ALL", log[0])
+        self.assertEqual(report.session, {'session logical reads': 1500, 'redo size': 5120})
+        self.assertEqual(report['redo size'], 5120)
+        self.assertEqual(report['user commits'], 0)
+        self.assertEqual(report.session_events['db file sequential read'], {'waits': 10, 'time': 0.5})
+        self.assertEqual(report.top(1, 'session_events'), [('db file sequential read', 0.5)])
+        self.assertIn('session logical reads', str(report))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import socket
+import tempfile
+import unittest
+
+from GABDConnect.tunnel_capture import TrafficRecorder, read_capture, replay, CLIENT_TO_SERVER, SERVER_TO_CLIENT, \
+    OPEN, CLOSE
+
+
+class TunnelCaptureTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "capture.bin.gz")
+
+        # Dues connexions amb tres peticions/respostes cadascuna
+        with TrafficRecorder(self.path) as rec:
+            for _ in range(2):
+                conn_id = rec.open_connection(("oracle-1.grup00.gabd", 1521))
+                for i in range(3):
+                    rec.record(conn_id, CLIENT_TO_SERVER, b"select %d" % i)
+                    rec.record(conn_id, SERVER_TO_CLIENT, b"row" * (i + 1))
+                rec.close_connection(conn_id)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_read_capture(self):
+        kinds = [kind for kind, _, _, _ in read_capture(self.path)]
+        self.assertEqual(kinds.count(OPEN), 2)
+        self.assertEqual(kinds.count(CLOSE), 2)
+        self.assertEqual(kinds.count(CLIENT_TO_SERVER), 6)
+        self.assertEqual(kinds.count(SERVER_TO_CLIENT), 6)
+
+    def test_replay_local_sink(self):
+        report = replay(self.path, target=None, speed=None)
+        self.assertEqual(report.connections, 2)
+        self.assertEqual(report.exchanges, 6)
+        self.assertEqual(report.bytes_received, 2 * len(b"row" * 6))
+        self.assertEqual(report.errors, [])
+        self.assertEqual(len(report.latencies), 6)
+
+    def test_replay_unreachable_target(self):
+        with socket.socket() as s:
+            s.bind(("localhost", 0))
+            port = s.getsockname()[1]  # Port lliure on no escolta ningú
+        report = replay(self.path, target=("localhost", port), speed=None, timeout=1)
+        self.assertEqual(report.connections, 2)
+        self.assertEqual(report.exchanges, 0)
+        self.assertEqual(len(report.errors), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
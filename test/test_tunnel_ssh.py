@@ -1,6 +1,16 @@
+import multiprocessing
+import socket
+import tempfile
+import threading
+import time
 import unittest
+from contextlib import contextmanager
+from unittest import mock
 from GABDConnect import GABDSSHTunnel
-from GABDConnect.ssh_tunnel import get_free_port
+from GABDConnect import ssh_tunnel, tunnel_process
+from GABDConnect.ssh_tunnel import PRIORITY_BULK, AdmissionGate, ForwardServer, SSHTunnel, TransportScheduler, \
+    TunnelHandler, get_free_port
+from GABDConnect.tunnel_process import ProcessSSHTunnel
 import os
 
 USED_PORTS = set()
@@ -87,6 +97,30 @@ class GABDSSHTunnelTestCase(unittest.TestCase):
             f"SSH tunnel to {self.hostname}:{self.port} via {self.ssh_server['ssh']} closed."
         )
 
+    def test_ssh_tunnel_process(self):
+        """
+        Test SSH tunnel amb el pla de dades en un procés fill
+        """
+        ssh_server = dict(self.ssh_server, process=True)
+        with GABDSSHTunnel(hostname=self.hostname, port=self.port, local_port=self.local_port,
+                           ssh_data=ssh_server) as server:
+            self.assertTrue(server.is_active())
+            stats = server.get_tunnel().stats()
+            self.assertIn(self.local_port, stats['forwards'])
+            self.assertIsNotNone(stats['pid'])
+
+    def test_ssh_tunnel_forward_options(self):
+        """
+        Test forward amb prioritat bulk i límit de velocitat
+        """
+        forward_options = {self.local_port: {'priority': 'bulk', 'rate_limit': 1e6}}
+        with GABDSSHTunnel(hostname=self.hostname, port=self.port, local_port=self.local_port,
+                           ssh_data=self.ssh_server, forward_options=forward_options) as server:
+            self.assertTrue(server.is_active())
+            stats = server.get_tunnel().stats()['forwards'][self.local_port]
+            self.assertEqual(stats['priority'], 'bulk')
+            self.assertEqual(stats['rate_limit'], 1e6)
+
     def test_multiple_tunnels(self):
         """
         Test multiple SSH tunnels.
@@ -120,6 +154,306 @@ class GABDSSHTunnelTestCase(unittest.TestCase):
             self.assertTrue(t.closetunnel())
 
 
+class StandInTransport:
+    def __init__(self):
+        self.active = True
+        self.servers = []  # Extrem "remot" de cada canal obert
+
+    def is_active(self):
+        return self.active
+
+    def close(self):
+        self.active = False
+
+    def open_channel(self, kind, dest, src, **kwargs):
+        server, channel_end = socket.socketpair()
+        self.servers.append(server)
+        return StandInChannel(channel_end)
+
+
+class StandInClient:
+    def __init__(self, host):
+        self.host = host
+        self.transport = StandInTransport()
+
+    def get_transport(self):
+        return self.transport
+
+    def close(self):
+        self.transport.close()
+
+
+class BastionMonitorTestCase(unittest.TestCase):
+    def test_stop_joins_monitor_after_failover(self):
+        ranking = [(("a", 22), 0.01), (("b", 22), 0.02)]
+        with mock.patch.object(ssh_tunnel, 'rank_bastions', return_value=ranking), \
+                mock.patch.object(SSHTunnel, '_connect', lambda self, host, port: StandInClient(host)):
+            tunnel = SSHTunnel(["a", "b"], ssh_username="u", health_interval=0.01)
+            tunnel.start()
+            monitor = tunnel._monitor
+            self.assertTrue(monitor.is_alive())
+
+            tunnel.transport.close()  # El transport cau: el monitor es reconnecta
+            for _ in range(500):
+                if tunnel.stats()['failovers']:
+                    break
+                monitor.join(0.01)
+            self.assertEqual(tunnel.stats()['failovers'], 1)
+
+            tunnel.stop()
+            self.assertFalse(monitor.is_alive())
+            self.assertIsNone(tunnel.client)
+
+    def test_restart_after_stop(self):
+        ranking = [(("a", 22), 0.01), (("b", 22), 0.02)]
+        with mock.patch.object(ssh_tunnel, 'rank_bastions', return_value=ranking), \
+                mock.patch.object(SSHTunnel, '_connect', lambda self, host, port: StandInClient(host)):
+            tunnel = SSHTunnel(["a", "b"], ssh_username="u", health_interval=0.01)
+            tunnel.start()
+            tunnel.stop()
+            tunnel.start()
+            try:
+                self.assertEqual(tunnel.client.host, "a")
+                self.assertTrue(tunnel._monitor.is_alive())
+            finally:
+                tunnel.stop()
+
+
+class StandInChannel:
+    """Canal SSH simulat sobre un socket: el que s'hi envia arriba a l'altre extrem del parell."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.closed = False
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def recv(self, n):
+        return self.sock.recv(n)
+
+    def sendall(self, data):
+        self.sock.sendall(data)
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+
+class RecordingScheduler(TransportScheduler):
+    def __init__(self):
+        super().__init__()
+        self.slots = []
+
+    @contextmanager
+    def slot(self, nbytes, priority='interactive'):
+        self.slots.append((nbytes, priority))
+        with super().slot(nbytes, priority) as waited:
+            yield waited
+
+
+class TunnelHandlerTestCase(unittest.TestCase):
+    def test_scheduler_in_both_directions(self):
+        client, local_end = socket.socketpair()
+        server, channel_end = socket.socketpair()
+        scheduler = RecordingScheduler()
+        handler = TunnelHandler(StandInChannel(channel_end), local_end, scheduler=scheduler, priority=PRIORITY_BULK)
+        handler.start()
+        try:
+            client.sendall(b"select 1")
+            self.assertEqual(server.recv(100), b"select 1")
+            server.sendall(b"fila")
+            self.assertEqual(client.recv(100), b"fila")
+        finally:
+            client.close()
+            handler.join(2)
+            server.close()
+
+        self.assertEqual(scheduler.slots, [(8, PRIORITY_BULK), (4, PRIORITY_BULK)])
+        self.assertEqual((handler.bytes_sent, handler.bytes_received), (8, 4))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("La condició no s'ha complert a temps")
+        time.sleep(0.005)
+
+
+def closed_by_peer(sock):
+    sock.settimeout(2)
+    return sock.recv(1) == b""
+
+
+class AdmissionGateTestCase(unittest.TestCase):
+    def test_fifo_and_timeout(self):
+        gate = AdmissionGate(1)
+        self.assertTrue(gate.acquire(0))
+        self.assertFalse(gate.acquire(0))
+        self.assertFalse(gate.acquire(0.05))
+
+        order = []
+
+        def waiter(i):
+            gate.acquire()
+            order.append(i)
+            gate.release()
+
+        threads = []
+        for i in range(3):
+            threads.append(threading.Thread(target=waiter, args=(i,)))
+            threads[-1].start()
+            wait_for(lambda: gate.waiting == i + 1)  # S'encuen en aquest ordre
+        gate.release()
+        for th in threads:
+            th.join(2)
+        self.assertEqual(order, [0, 1, 2])
+        self.assertEqual((gate.in_use, gate.waiting), (0, 0))
+
+
+class ForwardAdmissionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.sockets = []
+
+    def tearDown(self):
+        for sock in self.sockets:
+            sock.close()
+
+    def connect(self, forward):
+        """Connexió d'un client al forward: se n'admet l'extrem local i es retorna el del client."""
+        client, local_end = socket.socketpair()
+        self.sockets.append(client)
+        forward._admit(local_end, ("127.0.0.1", 40000 + len(self.sockets)))
+        return client
+
+    def test_queue_rejection_and_stats(self):
+        transport = StandInTransport()
+        forward = ForwardServer(transport, 0, "db", 1521, max_connections=1, queue_size=1, queue_timeout=5)
+
+        first = self.connect(forward)
+        second = self.connect(forward)  # A la cua
+        third = self.connect(forward)  # Cua plena: es rebutja
+        self.assertEqual(len(transport.servers), 1)
+        self.assertTrue(closed_by_peer(third))
+        stats = forward.stats()
+        self.assertEqual((stats['queued'], stats['max_queued'], stats['admitted'], stats['rejected']), (1, 1, 1, 1))
+
+        time.sleep(0.05)
+        first.close()  # En acabar la primera connexió, la de la cua obté la plaça
+        wait_for(lambda: len(transport.servers) == 2)
+        second.sendall(b"select 1")
+        self.assertEqual(transport.servers[1].recv(100), b"select 1")
+
+        stats = forward.stats()
+        self.assertEqual((stats['queued'], stats['admitted'], stats['rejected']), (0, 2, 1))
+        self.assertGreaterEqual(stats['max_wait_seconds'], 0.05)
+        self.assertAlmostEqual(stats['avg_wait_seconds'], stats['max_wait_seconds'] / 2)
+        forward.stop()
+
+    def test_queue_timeout(self):
+        transport = StandInTransport()
+        forward = ForwardServer(transport, 0, "db", 1521, max_connections=1, queue_timeout=0.05)
+        self.connect(forward)
+        waiting = self.connect(forward)
+        self.assertTrue(closed_by_peer(waiting))  # No s'ha alliberat cap plaça a temps
+        wait_for(lambda: forward.stats()['rejected'] == 1)
+        self.assertEqual(forward.stats()['queued'], 0)
+        self.assertEqual(len(transport.servers), 1)
+        forward.stop()
+
+    def test_max_channels_shared_by_forwards(self):
+        transport = StandInTransport()
+        channels = AdmissionGate(1)  # El `max_channels` del transport
+        oracle = ForwardServer(transport, 0, "db", 1521, channel_gate=channels, queue_timeout=5)
+        ssh = ForwardServer(transport, 0, "db", 22, channel_gate=channels, queue_timeout=5)
+
+        first = self.connect(oracle)
+        self.connect(ssh)  # Espera un canal lliure, encara que el forward no té límit propi
+        self.assertEqual(len(transport.servers), 1)
+        self.assertEqual(ssh.stats()['queued'], 1)
+
+        first.close()
+        wait_for(lambda: len(transport.servers) == 2)
+        self.assertEqual(channels.in_use, 1)
+        oracle.stop()
+        ssh.stop()
+
+
+class StandInTunnel:
+    """`SSHTunnel` simulat per al procés fill: no obre cap connexió i deixa constància de l'aturada a `ssh_pkey`."""
+
+    def __init__(self, ssh_host, ssh_pkey=None, **kwargs):
+        self.ssh_host = ssh_host
+        self.ssh_pkey = ssh_pkey
+        self.local_bind_ports = [10001]
+
+    def start(self):
+        if self.ssh_host == 'inabastable':
+            raise ConnectionRefusedError(f"No es pot connectar a {self.ssh_host}")
+
+    def stop(self):
+        with open(self.ssh_pkey, 'w') as f:
+            f.write('stopped')
+
+    def stats(self):
+        return {'forwards': {10001: {'active_connections': 0}}}
+
+    def add_forward(self, remote_host, remote_port, *args, **kwargs):
+        raise ValueError(f"Prioritat desconeguda per a {remote_host}:{remote_port}")
+
+    def remove_forward(self, local_port):
+        # El socket no es pot enviar pel canal de control
+        raise socket.error(socket.socket(), "no es pot serialitzar")
+
+
+@unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), "Cal el mètode d'arrencada 'fork'")
+class ProcessTunnelTestCase(unittest.TestCase):
+    """Canal de control de `ProcessSSHTunnel` amb un túnel simulat al procés fill (heretat amb 'fork')."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.marker = os.path.join(tmp.name, 'stopped')
+        patcher = mock.patch.object(tunnel_process, 'SSHTunnel', StandInTunnel)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tunnel(self, ssh_host='bastio'):
+        return ProcessSSHTunnel(ssh_host=ssh_host, ssh_pkey=self.marker, start_method='fork', start_timeout=10)
+
+    def test_start_calls_and_stop(self):
+        tunnel = self.tunnel()
+        tunnel.start()
+        process = tunnel._process
+        self.assertIsNotNone(tunnel.pid)
+        self.assertNotEqual(tunnel.pid, os.getpid())
+
+        stats = tunnel.stats()
+        self.assertEqual(stats['forwards'], {10001: {'active_connections': 0}})
+        self.assertEqual(stats['pid'], tunnel.pid)
+        self.assertEqual(tunnel.local_bind_port, 10001)
+        # Les excepcions del fill es rellancen al pare i el canal continua operatiu
+        with self.assertRaisesRegex(ValueError, "Prioritat desconeguda per a db:1521"):
+            tunnel.add_forward('db', 1521)
+        with self.assertRaisesRegex(RuntimeError, "no es pot serialitzar"):
+            tunnel.remove_forward(10001)
+        self.assertEqual(tunnel.local_bind_ports, [10001])
+
+        tunnel.stop()
+        self.assertIsNone(tunnel.pid)
+        self.assertEqual(process.exitcode, 0)
+        with open(self.marker) as f:
+            self.assertEqual(f.read(), 'stopped')
+        with self.assertRaises(RuntimeError):
+            tunnel.stats()
+
+    def test_start_failure(self):
+        tunnel = self.tunnel('inabastable')
+        with self.assertRaisesRegex(ConnectionRefusedError, "inabastable"):
+            tunnel.start()
+        self.assertIsNone(tunnel.pid)
+        self.assertFalse(os.path.exists(self.marker))
 
 
 if __name__ == '__main__':